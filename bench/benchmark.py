@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+TBA Transfer Benchmarks
+
+Runs server-config.py's world and deployment commands end to end against
+local stand-ins for the Bloom.host SFTP server and Pterodactyl API (see
+standins.py), with optional latency and bandwidth shaping, and reports wall
+time, files/s, MB/s and round trips. Results are saved as JSON so runs can be
+compared between versions of the script.
+
+Usage:
+    python bench/benchmark.py                           # All scenarios, unshaped link
+    python bench/benchmark.py world_upload world_download
+    python bench/benchmark.py --latency 40 --bandwidth 20   # 40 ms round trip, 20 MB/s
+    python bench/benchmark.py --compare bench/results/<earlier>.json
+
+Options:
+    --latency MS          Round-trip time added to the SFTP link and each API request
+    --bandwidth MBPS      Link speed in MB/s, each direction (0 = unlimited)
+    --workers N           SFTP_WORKERS for the run (default: .env / script default)
+    --seed N              Fixture world seed (default 1)
+    --regions, --chunks, --players, --tiles, --dh-mb
+                          Fixture world layout, as for worldgen.py
+    --output PATH         Results file (default bench/results/<date>-<commit>.json)
+    --compare PATH        Show the change against an earlier results file
+    --keep                Keep the scratch directory
+    -v, --verbose         Show server-config.py's own output
+
+Connection settings are pointed at the stand-ins; other .env settings (upload
+mode, transport profile, ...) apply as they would to a real run.
+"""
+
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from standins import Stats, SFTPStandIn, PterodactylStandIn, count_client_round_trips  # noqa: E402
+from worldgen import generate_world, layout_from_args, WORLD_LAYOUT  # noqa: E402
+
+console = Console()
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+SCRIPT_PATH = os.path.join(REPO_DIR, "server-config.py")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+SCENARIOS = ["world_upload", "world_download", "backup_restore", "deploy_configs", "regenerate_world"]
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def build_configs(path, count=150):
+    """Write a config tree shaped like the modpack's config/ directory"""
+    for i in range(count):
+        rel_path = f"mod{i % 40}/{'sub/' if i % 3 == 0 else ''}settings{i}.{('toml', 'json', 'json5')[i % 3]}"
+        full_path = os.path.join(path, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            for line in range(10 + i * 37 % 190):
+                f.write(f"option_{line} = {line * i % 1000 / 7:.6f}\n")
+
+
+def tree_sizes(path):
+    """{relative path: size} for every file under `path`"""
+    sizes = {}
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in filenames:
+            full_path = os.path.join(dirpath, name)
+            sizes[os.path.relpath(full_path, path).replace(os.sep, "/")] = os.path.getsize(full_path)
+    return sizes
+
+
+def same_tree(expected, actual):
+    return os.path.isdir(actual) and tree_sizes(expected) == tree_sizes(actual)
+
+
+def reset_dir(path, source=None):
+    shutil.rmtree(path, ignore_errors=True)
+    if source:
+        shutil.copytree(source, path)
+    else:
+        os.makedirs(path)
+
+
+# =============================================================================
+# Benchmark Run
+# =============================================================================
+
+class Bench:
+    """Stand-in servers, scratch directories and the loaded server-config module"""
+    def __init__(self, workdir, latency=0.0, bandwidth=0, workers=None, verbose=False):
+        self.workdir = workdir
+        self.remote = os.path.join(workdir, "server")
+        self.local = os.path.join(workdir, "LocalServer")
+        self.fixture = os.path.join(workdir, "fixture")
+        self.stats = Stats()
+        count_client_round_trips(self.stats)
+        os.makedirs(self.remote)
+        os.makedirs(self.local)
+
+        self.sftp_server = SFTPStandIn(self.remote, self.stats, latency, bandwidth)
+        self.api = PterodactylStandIn(self.remote, self.stats, latency)
+        sftp_port = self.sftp_server.start()
+        api_url = self.api.start()
+
+        os.environ.update({
+            "SFTP_HOST": "127.0.0.1",
+            "SFTP_PORT": str(sftp_port),
+            "SFTP_USERNAME": "bench",
+            "SFTP_PASSWORD": "bench",
+            "PTERODACTYL_API_URL": api_url,
+            "PTERODACTYL_API_KEY": PterodactylStandIn.API_KEY,
+            "PTERODACTYL_SERVER_ID": PterodactylStandIn.SERVER_ID,
+        })
+        if workers:
+            os.environ["SFTP_WORKERS"] = str(workers)
+
+        spec = importlib.util.spec_from_file_location("server_config", SCRIPT_PATH)
+        self.sc = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.sc)
+        self.sc.LOCALSERVER_DIR = self.local
+        self.sc.CONFIG_DIR = os.path.join(self.fixture, "config")
+        if not verbose:
+            self.sc.console = Console(file=io.StringIO(), width=120)
+
+    def stop(self):
+        self.sc.ssh_sessions.close_all()
+        self.sftp_server.stop()
+        self.api.stop()
+
+    def fixture_world(self):
+        return os.path.join(self.fixture, "world")
+
+    def reset_remote(self, world=True):
+        reset_dir(self.remote)
+        with open(os.path.join(self.remote, "server.properties"), 'w') as f:
+            f.write("level-name=world\nlevel-seed=\nlevel-type=minecraft\\:normal\ngenerator-settings={}\n")
+        if world:
+            shutil.copytree(self.fixture_world(), os.path.join(self.remote, "world"))
+
+    def run(self, name):
+        """Set up, run and check one scenario; returns its result dict"""
+        setup = globals()[f"setup_{name}"]
+        call, files, check = setup(self)
+
+        # Every scenario starts cold, like a fresh invocation of the script
+        self.sc.ssh_sessions.close_all()
+        self.sc.pterodactyl.close()
+        self.stats.reset()
+
+        started = time.perf_counter()
+        try:
+            ok = bool(call())
+        except Exception as e:
+            console.print(f"[red]{name} raised {type(e).__name__}: {e}[/red]")
+            ok = False
+        wall = time.perf_counter() - started
+        counts = self.stats.snapshot()
+
+        moved = counts['bytes_read'] + counts['bytes_written']
+        return {
+            'ok': ok,
+            'verified': ok and check(),
+            'wall_s': round(wall, 3),
+            'files': files,
+            'bytes': moved,
+            'files_per_s': round(files / wall, 1) if files else None,
+            'mb_per_s': round(moved / wall / (1024 * 1024), 2) if moved else None,
+            **counts,
+        }
+
+
+def setup_world_upload(bench):
+    bench.reset_remote(world=False)
+    bench.api.state = "running"
+    reset_dir(os.path.join(bench.local, "world-production"), bench.fixture_world())
+    return (lambda: bench.sc.world_upload(auto_confirm=True),
+            len(tree_sizes(bench.fixture_world())),
+            lambda: same_tree(bench.fixture_world(), os.path.join(bench.remote, "world")))
+
+
+def setup_world_download(bench):
+    # An existing local copy, so the backup step is part of the measurement
+    bench.reset_remote()
+    bench.api.state = "running"
+    for name in os.listdir(bench.local):
+        shutil.rmtree(os.path.join(bench.local, name), ignore_errors=True)
+    shutil.copytree(bench.fixture_world(), os.path.join(bench.local, "world-production"))
+    return (lambda: bench.sc.world_download(auto_confirm=True),
+            len(tree_sizes(bench.fixture_world())),
+            lambda: same_tree(bench.fixture_world(), os.path.join(bench.local, "world-production")))
+
+
+def setup_backup_restore(bench):
+    bench.reset_remote(world=False)
+    bench.api.state = "running"
+    zips = os.path.join(bench.remote, "backups", "world", "zips")
+    os.makedirs(zips)
+    with zipfile.ZipFile(os.path.join(zips, "backup-bench.zip"), 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for rel_path in sorted(tree_sizes(bench.fixture_world())):
+            zf.write(os.path.join(bench.fixture_world(), rel_path), rel_path)
+    return (lambda: bench.sc.backup_restore(1, auto_confirm=True, local=True),
+            len(tree_sizes(bench.fixture_world())),
+            lambda: same_tree(bench.fixture_world(), os.path.join(bench.remote, "world")))
+
+
+def setup_deploy_configs(bench):
+    bench.reset_remote(world=False)
+    return (bench.sc.deploy_configs,
+            len(tree_sizes(bench.sc.CONFIG_DIR)),
+            lambda: same_tree(bench.sc.CONFIG_DIR, os.path.join(bench.remote, "config")))
+
+
+def setup_regenerate_world(bench):
+    bench.reset_remote()
+    bench.api.state = "running"
+
+    def check():
+        with open(os.path.join(bench.remote, "server.properties")) as f:
+            seeded = "level-seed=4242" in f.read().splitlines()
+        return seeded and not os.path.exists(os.path.join(bench.remote, "world"))
+
+    return lambda: bench.sc.regenerate_world("normal", "4242", auto_confirm=True), 0, check
+
+
+# =============================================================================
+# Results
+# =============================================================================
+
+def git_version():
+    """Short commit of the checkout, with "-dirty" if server-config.py has local edits"""
+    try:
+        commit = subprocess.run(["git", "-C", REPO_DIR, "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "-C", REPO_DIR, "diff", "--quiet", "HEAD", "--", "server-config.py"]).returncode
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def show_results(report, previous=None):
+    table = Table(title=f"Benchmark {report['version']} "
+                        f"({report['link']['latency_ms']} ms, "
+                        f"{report['link']['bandwidth_mbps'] or 'unlimited'} MB/s)", box=box.ROUNDED)
+    table.add_column("Scenario", style="cyan")
+    table.add_column("Result")
+    table.add_column("Wall", justify="right")
+    table.add_column("Files/s", justify="right")
+    table.add_column("MB/s", justify="right")
+    table.add_column("Round trips", justify="right")
+    table.add_column("SFTP / API", justify="right")
+    table.add_column("Sessions", justify="right")
+    if previous:
+        table.add_column(f"vs {previous['version']}", justify="right")
+
+    for name, result in report['scenarios'].items():
+        status = "[green]ok[/green]" if result['verified'] else \
+            "[yellow]unverified[/yellow]" if result['ok'] else "[red]failed[/red]"
+        row = [name, status, f"{result['wall_s']:.2f}s",
+               str(result['files_per_s'] or "-"), str(result['mb_per_s'] or "-"),
+               str(result['round_trips']), f"{result['sftp_requests']} / {result['api_requests']}",
+               str(result['ssh_sessions'])]
+        if previous:
+            before = previous['scenarios'].get(name)
+            if before:
+                change = (result['wall_s'] - before['wall_s']) / before['wall_s'] * 100
+                color = "green" if change < -5 else "red" if change > 5 else "white"
+                row.append(f"[{color}]{change:+.0f}% wall, {result['round_trips'] - before['round_trips']:+d} RT[/{color}]")
+            else:
+                row.append("-")
+        table.add_row(*row)
+    console.print(table)
+
+
+def main(args):
+    def option(*names, default=None, cast=str):
+        for i, arg in enumerate(args):
+            for name in names:
+                if arg == name and i + 1 < len(args):
+                    return cast(args[i + 1])
+                if arg.startswith(name + "="):
+                    return cast(arg.split("=", 1)[1])
+        return default
+
+    if "-h" in args or "--help" in args:
+        console.print(__doc__)
+        return 0
+
+    latency_ms = option("--latency", default=0.0, cast=float)
+    bandwidth = option("--bandwidth", default=0.0, cast=float)
+    workers = option("--workers", cast=int)
+    seed = option("--seed", default=1, cast=int)
+    layout = {**WORLD_LAYOUT, **layout_from_args(args)}
+    compare_path = option("--compare")
+    verbose = "-v" in args or "--verbose" in args
+    keep = "--keep" in args
+
+    value_options = {"--latency", "--bandwidth", "--workers", "--seed", "--regions", "--chunks", "--players",
+                     "--tiles", "--dh-mb", "--output", "--compare"}
+    names = [arg for i, arg in enumerate(args)
+             if not arg.startswith("-") and (i == 0 or args[i - 1] not in value_options)]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        console.print(f"[red]Unknown scenario(s): {', '.join(unknown)}[/red]")
+        console.print(f"[yellow]Available: {', '.join(SCENARIOS)}[/yellow]")
+        return 1
+    names = names or SCENARIOS
+
+    previous = None
+    if compare_path:
+        with open(compare_path) as f:
+            previous = json.load(f)
+
+    version = git_version()
+    output = option("--output") or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{version}.json")
+
+    workdir = tempfile.mkdtemp(prefix="tba-bench-")
+    bench = None
+    try:
+        console.print("[cyan]Building fixtures...[/cyan]")
+        fixture = generate_world(os.path.join(workdir, "fixture", "world"), seed, layout)
+        build_configs(os.path.join(workdir, "fixture", "config"))
+
+        bench = Bench(workdir, latency_ms / 1000, bandwidth * 1024 * 1024, workers, verbose)
+        report = {
+            'version': version,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'link': {'latency_ms': latency_ms, 'bandwidth_mbps': bandwidth},
+            'settings': {'workers': bench.sc.SFTP_WORKERS, 'upload_mode': bench.sc.UPLOAD_MODE,
+                         'transport': bench.sc.TRANSPORT_PROFILE},
+            'fixture': {'seed': seed, 'layout': layout, **fixture},
+            'scenarios': {},
+        }
+
+        for name in names:
+            console.print(f"[cyan]Running {name}...[/cyan]")
+            report['scenarios'][name] = bench.run(name)
+    finally:
+        if bench:
+            bench.stop()
+        if keep:
+            console.print(f"[dim]Scratch directory kept: {workdir}[/dim]")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    show_results(report, previous)
+    console.print(f"[dim]Saved {output}[/dim]")
+    return 0 if all(result['verified'] for result in report['scenarios'].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,614 @@
+"""
+Local stand-ins for the Bloom.host SFTP server and Pterodactyl API
+
+Both serve a plain directory on 127.0.0.1 and count what the client asks of
+them, so benchmark.py can run server-config.py's commands end to end without
+touching production. Latency and bandwidth can be shaped to approximate the
+real link.
+"""
+
+import base64
+import datetime
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import socket
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import paramiko
+from paramiko.sftp import CMD_NAMES
+
+# Clients closing their sessions is routine here, not worth a traceback
+logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+
+
+class Stats:
+    """Request counters shared by the stand-ins (thread safe)"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.sftp_requests = Counter()  # SFTP request type -> count
+            self.api_requests = Counter()  # "METHOD /endpoint" -> count
+            self.round_trips = 0
+            self.ssh_sessions = 0
+            self.bytes_read = 0  # by the client, from the server's files
+            self.bytes_written = 0
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def count(self, kind, name):
+        with self.lock:
+            getattr(self, kind)[name] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'round_trips': self.round_trips,
+                'sftp_requests': sum(self.sftp_requests.values()),
+                'api_requests': sum(self.api_requests.values()),
+                'ssh_sessions': self.ssh_sessions,
+                'bytes_read': self.bytes_read,
+                'bytes_written': self.bytes_written,
+                'sftp_by_type': dict(self.sftp_requests.most_common()),
+                'api_by_endpoint': dict(self.api_requests.most_common()),
+            }
+
+
+# =============================================================================
+# Link Shaping
+# =============================================================================
+
+class ShapedSocket:
+    """Server-side socket wrapper that adds latency and a bandwidth limit.
+
+    The whole round-trip `latency` is added to data the server sends, through
+    a delay line so replies stay pipelined the way they would on a long link.
+    `bandwidth` (bytes/s, 0 = unlimited) is applied to each direction
+    separately: outgoing data is serialized onto the simulated link, incoming
+    data is paced as it is read, which backs the client off through TCP.
+    """
+    def __init__(self, sock, latency=0.0, bandwidth=0):
+        self.sock = sock
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.send_free = 0.0  # when the outgoing link is next idle
+        self.recv_free = 0.0
+        self.outbox = queue.Queue()
+        self.sender = threading.Thread(target=self._send_loop, daemon=True)
+        self.sender.start()
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+    def send(self, data):
+        now = time.monotonic()
+        deliver_at = now
+        if self.bandwidth:
+            self.send_free = max(now, self.send_free) + len(data) / self.bandwidth
+            deliver_at = self.send_free
+        self.outbox.put((deliver_at + self.latency, bytes(data)))
+        return len(data)
+
+    def sendall(self, data):
+        self.send(data)
+
+    def _send_loop(self):
+        while True:
+            deliver_at, data = self.outbox.get()
+            if data is None:
+                return
+            delay = deliver_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                return
+
+    def recv(self, size):
+        data = self.sock.recv(size)
+        if self.bandwidth and data:
+            now = time.monotonic()
+            self.recv_free = max(now, self.recv_free) + len(data) / self.bandwidth
+            if self.recv_free > now:
+                time.sleep(self.recv_free - now)
+        return data
+
+    def close(self):
+        self.outbox.put((0, None))
+        self.sender.join(timeout=5)
+        self.sock.close()
+
+
+# =============================================================================
+# SFTP Server
+# =============================================================================
+
+def convert_errno(e):
+    return paramiko.SFTPServer.convert_errno(e.errno)
+
+
+def set_attributes(path, attr):
+    if attr._flags & attr.FLAG_SIZE:
+        os.truncate(path, attr.st_size)
+    if attr._flags & attr.FLAG_PERMISSIONS:
+        os.chmod(path, attr.st_mode)
+    if attr._flags & attr.FLAG_AMTIME:
+        os.utime(path, (attr.st_atime, attr.st_mtime))
+
+
+class CountingSFTPServer(paramiko.SFTPServer):
+    """SFTP subsystem that counts requests by type"""
+    def __init__(self, channel, name, server, sftp_si, *args, **kwargs):
+        super().__init__(channel, name, server, sftp_si, *args, **kwargs)
+        self.stats = kwargs['stats']
+
+    def _process(self, t, request_number, msg):
+        self.stats.count('sftp_requests', CMD_NAMES.get(t, str(t)))
+        super()._process(t, request_number, msg)
+
+
+def count_client_round_trips(stats):
+    """Count SFTP round trips on the client side (paramiko, in this process).
+
+    A request is a round trip when the client has no other request in flight
+    as it sends it, so it will sit waiting for the reply; requests pipelined
+    behind others aren't. Counting it here rather than at the server keeps
+    the number independent of timing and link shaping.
+    """
+    send_request = paramiko.SFTPClient._async_request
+
+    def _async_request(client, fileobj, t, *args):
+        if not client._expecting:
+            stats.add(round_trips=1)
+        return send_request(client, fileobj, t, *args)
+
+    paramiko.SFTPClient._async_request = _async_request
+
+
+class StandInHandle(paramiko.SFTPHandle):
+    def __init__(self, path, file, flags, stats):
+        super().__init__(flags)
+        self.filename = path
+        self.readfile = self.writefile = file
+        self.stats = stats
+
+    def read(self, offset, length):
+        data = super().read(offset, length)
+        if isinstance(data, bytes):
+            self.stats.add(bytes_read=len(data))
+        return data
+
+    def write(self, offset, data):
+        self.stats.add(bytes_written=len(data))
+        return super().write(offset, data)
+
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as e:
+            return convert_errno(e)
+
+    def chattr(self, attr):
+        try:
+            self.writefile.flush()
+            set_attributes(self.filename, attr)
+            return paramiko.SFTP_OK
+        except OSError as e:
+            return convert_errno(e)
+
+
+class StandInSFTP(paramiko.SFTPServerInterface):
+    """Serves `root` as the server's filesystem root"""
+    def __init__(self, server, *args, root=None, stats=None, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.root = root
+        self.stats = stats
+
+    def _local(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip("/"))
+
+    def list_folder(self, path):
+        path = self._local(path)
+        try:
+            entries = []
+            for name in os.listdir(path):
+                attr = paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(path, name)))
+                attr.filename = name
+                entries.append(attr)
+            return entries
+        except OSError as e:
+            return convert_errno(e)
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._local(path)))
+        except OSError as e:
+            return convert_errno(e)
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        path = self._local(path)
+        try:
+            fd = os.open(path, flags, 0o644)
+        except OSError as e:
+            return convert_errno(e)
+        if flags & os.O_WRONLY:
+            mode = 'ab' if flags & os.O_APPEND else 'wb'
+        elif flags & os.O_RDWR:
+            mode = 'a+b' if flags & os.O_APPEND else 'r+b'
+        else:
+            mode = 'rb'
+        return StandInHandle(path, os.fdopen(fd, mode), flags, self.stats)
+
+    def remove(self, path):
+        try:
+            os.remove(self._local(path))
+        except OSError as e:
+            return convert_errno(e)
+        return paramiko.SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        try:
+            os.rename(self._local(oldpath), self._local(newpath))
+        except OSError as e:
+            return convert_errno(e)
+        return paramiko.SFTP_OK
+
+    posix_rename = rename
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._local(path))
+        except OSError as e:
+            return convert_errno(e)
+        return paramiko.SFTP_OK
+
+    def rmdir(self, path):
+        try:
+            os.rmdir(self._local(path))
+        except OSError as e:
+            return convert_errno(e)
+        return paramiko.SFTP_OK
+
+    def chattr(self, path, attr):
+        try:
+            set_attributes(self._local(path), attr)
+        except OSError as e:
+            return convert_errno(e)
+        return paramiko.SFTP_OK
+
+
+class PasswordServer(paramiko.ServerInterface):
+    """Accepts any password and the sftp subsystem"""
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+
+class SFTPStandIn:
+    """paramiko SFTP server on 127.0.0.1 serving `root`.
+
+    Call start() for the port; every accepted connection gets its own
+    transport thread, shaped per `latency` (seconds) and `bandwidth` (bytes/s).
+    """
+    def __init__(self, root, stats, latency=0.0, bandwidth=0):
+        self.root = root
+        self.stats = stats
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.transports = []
+
+    def start(self):
+        self.listener = socket.socket()
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(64)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.listener.getsockname()[1]
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.latency or self.bandwidth:
+                conn = ShapedSocket(conn, self.latency, self.bandwidth)
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler("sftp", CountingSFTPServer, StandInSFTP,
+                                            root=self.root, stats=self.stats)
+            transport.start_server(server=PasswordServer())
+            self.stats.add(ssh_sessions=1)
+            self.transports.append(transport)
+
+    def stop(self):
+        self.listener.close()
+        for transport in self.transports:
+            transport.close()
+
+
+# =============================================================================
+# Pterodactyl API
+# =============================================================================
+
+class ConsoleSocket:
+    """Console websocket: authenticates clients and broadcasts events to them.
+
+    `state` is a callable giving the server state sent to each new client.
+    """
+    def __init__(self, token, state):
+        self.token = token
+        self.state = state
+        self.clients = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(16)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.listener.getsockname()[1]
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("websocket closed")
+            data += chunk
+        return data
+
+    def _recv_frame(self, conn):
+        head = self._recv_exact(conn, 2)
+        length = head[1] & 0x7f
+        if length == 126:
+            length = struct.unpack(">H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if head[1] & 0x80 else b"\0\0\0\0"
+        payload = self._recv_exact(conn, length)
+        return head[0] & 0x0f, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+    @staticmethod
+    def _frame(opcode, payload):
+        size = len(payload)
+        if size < 126:
+            header = bytes([0x80 | opcode, size])
+        elif size < 65536:
+            header = bytes([0x80 | opcode, 126]) + struct.pack(">H", size)
+        else:
+            header = bytes([0x80 | opcode, 127]) + struct.pack(">Q", size)
+        return header + payload
+
+    def _send(self, conn, event, *args):
+        conn.sendall(self._frame(1, json.dumps({"event": event, "args": list(args)}).encode()))
+
+    def broadcast(self, event, *args):
+        with self.lock:
+            clients = list(self.clients)
+        for conn in clients:
+            try:
+                self._send(conn, event, *args)
+            except OSError:
+                with self.lock:
+                    self.clients.remove(conn)
+
+    def _serve(self, conn):
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                chunk = conn.recv(1024)
+                if not chunk:
+                    return
+                request += chunk
+            headers = {}
+            for line in request.decode().split("\r\n")[1:]:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+            accept = base64.b64encode(hashlib.sha1(
+                (headers["sec-websocket-key"] + "258EAFA5-E914-47DA-95CA-C5AB0DC85B11").encode()).digest()).decode()
+            conn.sendall("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+            while True:
+                opcode, payload = self._recv_frame(conn)
+                if opcode == 8:
+                    conn.sendall(self._frame(8, payload))
+                    return
+                if opcode != 1:
+                    continue
+                message = json.loads(payload)
+                if message["event"] == "auth":
+                    if message["args"][0] != self.token:
+                        self._send(conn, "jwt error", "invalid token")
+                        continue
+                    self._send(conn, "auth success")
+                    self._send(conn, "status", self.state())
+                    with self.lock:
+                        self.clients.append(conn)
+        except (ConnectionError, OSError, ValueError, KeyError):
+            pass
+        finally:
+            with self.lock:
+                if conn in self.clients:
+                    self.clients.remove(conn)
+            conn.close()
+
+
+class PterodactylStandIn:
+    """Pterodactyl client API for one server whose files live in `root`.
+
+    Implements the endpoints server-config.py uses: resources, power (with
+    state changes and a "Done" console line announced on the websocket),
+    command, websocket, and files delete/rename/compress/decompress. Each
+    request is delayed by `latency` seconds.
+    """
+    SERVER_ID = "bench"
+    API_KEY = "bench-key"
+
+    def __init__(self, root, stats, latency=0.0, power_delay=0.2):
+        self.root = root
+        self.stats = stats
+        self.latency = latency
+        self.power_delay = power_delay
+        self.state = "offline"
+        self.console = ConsoleSocket("bench-token", lambda: self.state)
+
+    def start(self):
+        self.ws_port = self.console.start()
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                standin.handle(self, "GET")
+
+            def do_POST(self):
+                standin.handle(self, "POST")
+
+            def do_PUT(self):
+                standin.handle(self, "PUT")
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.console.listener.close()
+
+    def _local(self, *parts):
+        path = os.path.normpath(os.path.join(self.root, *(part.lstrip("/") for part in parts)))
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise ValueError(f"path escapes the server root: {'/'.join(parts)}")
+        return path
+
+    def set_state(self, state):
+        self.state = state
+        self.console.broadcast("status", state)
+
+    def _power(self, signal):
+        if signal in ("stop", "kill", "restart"):
+            self.set_state("stopping")
+            time.sleep(self.power_delay)
+            self.set_state("offline")
+        if signal in ("start", "restart"):
+            self.set_state("starting")
+            time.sleep(self.power_delay)
+            self.console.broadcast("console output",
+                                   '[12:00:00] [Server thread/INFO]: Done (1.234s)! For help, type "help"')
+            self.set_state("running")
+
+    def handle(self, request, method):
+        prefix = f"/api/client/servers/{self.SERVER_ID}"
+        endpoint = request.path[len(prefix):] if request.path.startswith(prefix) else request.path
+        length = int(request.headers.get("Content-Length") or 0)
+        body = json.loads(request.rfile.read(length) or b"{}")
+        self.stats.count('api_requests', f"{method} {endpoint.split('?')[0]}")
+        self.stats.add(round_trips=1)
+        if self.latency:
+            time.sleep(self.latency)
+
+        if request.headers.get("Authorization") != f"Bearer {self.API_KEY}":
+            return self._reply(request, 401)
+        try:
+            result = self._dispatch(endpoint, body)
+        except (OSError, ValueError, KeyError, tarfile.TarError, zipfile.BadZipFile) as e:
+            return self._reply(request, 500, {"errors": [{"detail": str(e)}]})
+        if result is None:
+            return self._reply(request, 404)
+        self._reply(request, 200 if result else 204, result or None)
+
+    def _dispatch(self, endpoint, body):
+        if endpoint == "/resources":
+            return {"attributes": {"current_state": self.state}}
+        if endpoint == "/websocket":
+            return {"data": {"token": self.console.token,
+                             "socket": f"ws://127.0.0.1:{self.ws_port}/api/servers/{self.SERVER_ID}/ws"}}
+        if endpoint == "/power":
+            threading.Thread(target=self._power, args=(body["signal"],), daemon=True).start()
+            return {}
+        if endpoint == "/command":
+            self.console.broadcast("console output", f"> {body['command']}")
+            return {}
+        if endpoint == "/files/delete":
+            for name in body["files"]:
+                path = self._local(body["root"], name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                elif os.path.exists(path):
+                    os.remove(path)
+            return {}
+        if endpoint == "/files/rename":
+            for rename in body["files"]:
+                target = self._local(body["root"], rename["to"])
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.rename(self._local(body["root"], rename["from"]), target)
+            return {}
+        if endpoint == "/files/compress":
+            directory = self._local(body["root"])
+            name = f"archive-{datetime.datetime.now().strftime('%Y-%m-%d_%H%M%S%f')}.tar.gz"
+            with tarfile.open(os.path.join(directory, name), "w:gz", compresslevel=1) as tar:
+                for item in body["files"]:
+                    tar.add(os.path.join(directory, item), arcname=item)
+            size = os.path.getsize(os.path.join(directory, name))
+            return {"object": "file_object", "attributes": {"name": name, "size": size, "is_file": True}}
+        if endpoint == "/files/decompress":
+            directory = self._local(body["root"])
+            archive = self._local(body["root"], body["file"])
+            if archive.endswith(".zip"):
+                with zipfile.ZipFile(archive) as zf:
+                    zf.extractall(directory)
+            else:
+                with tarfile.open(archive) as tar:
+                    tar.extractall(directory, filter="data")
+            return {}
+        return None
+
+    @staticmethod
+    def _reply(request, status, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else b""
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
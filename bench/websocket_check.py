@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Console Websocket Check
+
+Runs server-config.py's WebSocket client and ServerEvents against a loopback
+websocket stand-in that checks the protocol from the server side: the opening
+handshake, masking of client frames (including 16- and 64-bit lengths),
+ping/pong, fragmented messages with a ping between the fragments, and the
+close handshake in both directions. It also checks that waiting for a server
+state falls back to polling /resources when the socket drops partway, when
+Wings reports an error, and when the socket goes quiet without closing.
+
+Usage:
+    python bench/websocket_check.py
+
+Prints one line per check and exits non-zero if any fails.
+"""
+
+import base64
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+from rich.console import Console
+
+console = Console()
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_PATH = os.path.join(os.path.dirname(BENCH_DIR), "server-config.py")
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class LoopbackSocket:
+    """One-connection-at-a-time websocket server on 127.0.0.1.
+
+    Each accepted connection is handed, after the handshake, to the next
+    script from `scripts`: a callable(server, conn) that talks to the client
+    with send_frame()/recv_frame(). Problems it finds are added to `errors`.
+    """
+    def __init__(self, accept_key=None):
+        self.accept_key = accept_key  # Overrides Sec-WebSocket-Accept, to test rejection
+        self.scripts = []
+        self.errors = []
+        self.request_headers = {}
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(4)
+        self.url = f"ws://127.0.0.1:{self.listener.getsockname()[1]}/api/servers/check/ws"
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def stop(self):
+        self.listener.close()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                chunk = conn.recv(1024)
+                if not chunk:
+                    return
+                request += chunk
+            lines = request.split(b"\r\n\r\n", 1)[0].decode().split("\r\n")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            self.request_headers = headers
+            self.expect(lines[0].startswith("GET /api/servers/check/ws "), f"request line: {lines[0]}")
+            self.expect(headers.get("upgrade", "").lower() == "websocket", "Upgrade header")
+            self.expect(headers.get("sec-websocket-version") == "13", "Sec-WebSocket-Version")
+            key = headers.get("sec-websocket-key", "")
+            self.expect(len(base64.b64decode(key)) == 16, "Sec-WebSocket-Key is 16 random bytes")
+            accept = self.accept_key or base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+            conn.sendall("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+            if self.scripts:
+                self.scripts.pop(0)(self, conn)
+        except (OSError, ValueError) as e:
+            self.errors.append(f"stand-in: {e}")
+        finally:
+            conn.close()
+
+    def expect(self, condition, what):
+        if not condition:
+            self.errors.append(what)
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client closed the connection")
+            data += chunk
+        return data
+
+    def recv_frame(self, conn):
+        """Read one client frame; returns (fin, opcode, unmasked payload) and checks it was masked"""
+        head = self._recv_exact(conn, 2)
+        length = head[1] & 0x7f
+        if length == 126:
+            length = struct.unpack(">H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self._recv_exact(conn, 8))[0]
+        self.expect(head[1] & 0x80, "client frames are masked")
+        mask = self._recv_exact(conn, 4) if head[1] & 0x80 else b"\0\0\0\0"
+        payload = self._recv_exact(conn, length)
+        return bool(head[0] & 0x80), head[0] & 0x0f, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+    @staticmethod
+    def send_frame(conn, opcode, payload=b"", fin=True):
+        """Send one unmasked server frame"""
+        size = len(payload)
+        first = (0x80 if fin else 0) | opcode
+        if size < 126:
+            header = bytes([first, size])
+        elif size < 65536:
+            header = bytes([first, 126]) + struct.pack(">H", size)
+        else:
+            header = bytes([first, 127]) + struct.pack(">Q", size)
+        conn.sendall(header + payload)
+
+    def send_event(self, conn, event, *args):
+        self.send_frame(conn, 0x1, json.dumps({"event": event, "args": list(args)}).encode())
+
+
+# =============================================================================
+# Scripts run by the stand-in for each connection
+# =============================================================================
+
+def echo_messages(server, conn):
+    """Echo three client messages of different length classes back unmasked"""
+    for _ in range(3):
+        fin, opcode, payload = server.recv_frame(conn)
+        server.expect(fin and opcode == 0x1, f"client text frame (fin={fin}, opcode={opcode})")
+        server.send_frame(conn, 0x1, payload)
+    server.recv_frame(conn)  # The client's close
+
+
+def ping_then_message(server, conn):
+    server.send_frame(conn, 0x9, b"are you there")
+    fin, opcode, payload = server.recv_frame(conn)
+    server.expect(opcode == 0xA and payload == b"are you there", "pong echoes the ping payload")
+    server.send_frame(conn, 0x1, b"after ping")
+    server.recv_frame(conn)
+
+
+def fragmented_message(server, conn):
+    server.send_frame(conn, 0x1, b"Hel", fin=False)
+    server.send_frame(conn, 0x9, b"mid")  # Control frames may come between fragments
+    server.send_frame(conn, 0x0, b"lo, ", fin=False)
+    server.send_frame(conn, 0x0, "wörld".encode(), fin=True)
+    fin, opcode, payload = server.recv_frame(conn)
+    server.expect(opcode == 0xA and payload == b"mid", "pong between fragments")
+    server.recv_frame(conn)
+
+
+def server_closes(server, conn):
+    server.send_frame(conn, 0x8, struct.pack(">H", 1001) + b"going away")
+    fin, opcode, payload = server.recv_frame(conn)
+    server.expect(opcode == 0x8 and payload == struct.pack(">H", 1001), "client echoes the close code")
+
+
+def client_closes(server, conn):
+    fin, opcode, payload = server.recv_frame(conn)
+    server.expect(opcode == 0x8 and payload == struct.pack(">H", 1000), "client sends close 1000")
+    server.send_frame(conn, 0x8, payload)
+
+
+def wings(then):
+    """Authenticate like Wings, report the server running, then run `then`"""
+    def script(server, conn):
+        fin, opcode, payload = server.recv_frame(conn)
+        message = json.loads(payload)
+        server.expect(message == {"event": "auth", "args": ["check-token"]}, "auth event with the token")
+        server.send_event(conn, "auth success")
+        server.send_event(conn, "status", "running")
+        then(server, conn)
+    return script
+
+
+def drop_after(delay):
+    def then(server, conn):
+        time.sleep(delay)
+        conn.shutdown(socket.SHUT_RDWR)
+    return then
+
+
+def error_after(delay):
+    def then(server, conn):
+        time.sleep(delay)
+        server.send_event(conn, "token expired")
+        time.sleep(5)
+    return then
+
+
+def go_quiet(server, conn):
+    time.sleep(5)  # Connection stays open, nothing more is sent
+
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+class FakeClient:
+    """Stands in for PterodactylClient.websocket()"""
+    def __init__(self, url):
+        self.url = url
+
+    def websocket(self):
+        return {"token": "check-token", "socket": self.url}
+
+
+def check_handshake(sc, server):
+    ws = sc.WebSocket(server.url, headers={"Origin": "https://panel.example"})
+    ws.close()
+    time.sleep(0.1)
+    assert server.request_headers.get("origin") == "https://panel.example", "extra headers are sent"
+
+    bad = LoopbackSocket(accept_key=base64.b64encode(b"x" * 20).decode())
+    try:
+        sc.WebSocket(bad.url)
+    except ConnectionError as e:
+        assert "Sec-WebSocket-Accept" in str(e), e
+    else:
+        raise AssertionError("a wrong Sec-WebSocket-Accept was accepted")
+    finally:
+        bad.stop()
+
+
+def check_masking(sc, server):
+    server.scripts.append(echo_messages)
+    ws = sc.WebSocket(server.url)
+    for text in ("short", "m" * 300, "l" * 70000):
+        ws.send(text)
+        assert ws.recv() == text, f"{len(text)}-byte message round trip"
+    ws.close()
+
+
+def check_ping(sc, server):
+    server.scripts.append(ping_then_message)
+    ws = sc.WebSocket(server.url)
+    assert ws.recv() == "after ping", "ping is answered, not returned"
+    ws.close()
+
+
+def check_fragments(sc, server):
+    server.scripts.append(fragmented_message)
+    ws = sc.WebSocket(server.url)
+    assert ws.recv() == "Hello, wörld", "fragments are joined"
+    ws.close()
+
+
+def check_close(sc, server):
+    server.scripts.append(server_closes)
+    ws = sc.WebSocket(server.url)
+    assert ws.recv() is None, "recv() returns None on close"
+    ws.close()
+
+    server.scripts.append(client_closes)
+    ws = sc.WebSocket(server.url)
+    ws.close()
+    time.sleep(0.2)
+
+
+def check_fallback(sc, server, then, label):
+    """wait_for_server_state() must still see "offline" once the socket stops helping"""
+    server.scripts.append(wings(then))
+    sc.get_server_status = lambda: "offline"
+    events = sc.ServerEvents(FakeClient(server.url))
+    events.connect(timeout=5)
+    try:
+        started = time.time()
+        assert sc.wait_for_server_state("offline", timeout=10, events=events), f"{label}: state seen"
+        assert time.time() - started < 3, f"{label}: took {time.time() - started:.1f}s"
+    finally:
+        events.close()
+
+
+def main():
+    spec = importlib.util.spec_from_file_location("server_config", SCRIPT_PATH)
+    sc = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(sc)
+    sc.console = Console(file=io.StringIO())
+    sc.SERVER_EVENTS_CHECK_INTERVAL = 1
+
+    server = LoopbackSocket()
+    checks = [
+        ("Handshake", lambda: check_handshake(sc, server)),
+        ("Masked frames, 7/16/64-bit lengths", lambda: check_masking(sc, server)),
+        ("Ping/pong", lambda: check_ping(sc, server)),
+        ("Fragmented message", lambda: check_fragments(sc, server)),
+        ("Close handshake", lambda: check_close(sc, server)),
+        ("Polling after the socket drops", lambda: check_fallback(sc, server, drop_after(0.3), "drop")),
+        ("Polling after a Wings error", lambda: check_fallback(sc, server, error_after(0.3), "error")),
+        ("Polling while the socket is quiet", lambda: check_fallback(sc, server, go_quiet, "quiet")),
+    ]
+    failures = 0
+    for name, check in checks:
+        server.errors.clear()
+        try:
+            check()
+            time.sleep(0.1)  # Let the stand-in finish its side
+            if server.errors:
+                raise AssertionError("; ".join(server.errors))
+            console.print(f"[green]✓[/green] {name}")
+        except Exception as e:
+            failures += 1
+            console.print(f"[red]✗ {name}: {e}[/red]")
+    server.stop()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
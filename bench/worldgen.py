@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Synthetic Minecraft World Generator
+
+Writes a throwaway world folder shaped like the production /world that
+world_download pulls, without any real player data: Anvil region files with
+valid headers and zlib-compressed chunk NBT in region/, DIM-1/region and
+DIM1/region, level.dat, playerdata/stats/advancements per player, a BlueMap
+tile tree and a large DistantHorizons.sqlite (a real SQLite database). File
+counts and size ranges come from WORLD_LAYOUT, and the output - contents and
+modification times - is the same for the same seed.
+
+Usage:
+    python bench/worldgen.py <output dir>                   # Default layout, seed 1
+    python bench/worldgen.py <output dir> --seed 7 --regions 96,32,16 --players 200 --dh-mb 512
+
+Options:
+    --seed N              Seed for contents, sizes and mtimes (default 1)
+    --regions O,N,E       Region files in the overworld, nether and end (default 24,8,4)
+    --chunks MIN,MAX      Chunks stored per region file (default 32,320)
+    --players N           Players with playerdata, stats and advancements (default 40)
+    --tiles N             BlueMap tiles (default 500)
+    --dh-mb N             Size of DistantHorizons.sqlite in MB, 0 to skip (default 64)
+"""
+
+import gzip
+import json
+import math
+import os
+import random
+import sqlite3
+import struct
+import sys
+import uuid
+import zlib
+
+# File counts and (min, max) size ranges of a generated world. Sizes are drawn
+# log-uniformly from their range, so most files sit near the small end.
+WORLD_LAYOUT = {
+    'regions': {"region": 24, "DIM-1/region": 8, "DIM1/region": 4},
+    'chunks_per_region': (32, 320),
+    'chunk_nbt_size': (2 * 1024, 24 * 1024),  # before zlib, which takes about a third off
+    'players': 40,
+    'playerdata_size': (2 * 1024, 16 * 1024),
+    'bluemap_tiles': 500,
+    'bluemap_tile_size': (512, 32 * 1024),
+    'distant_horizons_mb': 64,
+}
+
+DATA_VERSION = 3955  # 1.21.1
+BASE_MTIME = 1_700_000_000
+REGION_SECTOR_SIZE = 4096
+DH_ROW_SIZE = 64 * 1024
+
+TAG_BYTE, TAG_INT, TAG_LONG, TAG_BYTE_ARRAY, TAG_STRING, TAG_COMPOUND = 1, 3, 4, 7, 8, 10
+
+
+# =============================================================================
+# NBT
+# =============================================================================
+
+def nbt_name(name):
+    encoded = name.encode('utf-8')
+    return struct.pack(">H", len(encoded)) + encoded
+
+
+def nbt_compound(fields, name=""):
+    """Encode a compound tag from (tag type, name, value) fields.
+
+    Values are ints for byte/int/long tags, bytes for byte arrays, str for
+    strings and a list of fields for nested compounds.
+    """
+    out = bytearray([TAG_COMPOUND]) + nbt_name(name)
+    for tag, field_name, value in fields:
+        if tag == TAG_COMPOUND:
+            out += nbt_compound(value, field_name)
+            continue
+        out += bytes([tag]) + nbt_name(field_name)
+        if tag == TAG_BYTE:
+            out += struct.pack(">b", value)
+        elif tag == TAG_INT:
+            out += struct.pack(">i", value)
+        elif tag == TAG_LONG:
+            out += struct.pack(">q", value)
+        elif tag == TAG_BYTE_ARRAY:
+            out += struct.pack(">i", len(value)) + value
+        elif tag == TAG_STRING:
+            out += nbt_name(value)
+    out.append(0)  # TAG_End
+    return bytes(out)
+
+
+# =============================================================================
+# World Files
+# =============================================================================
+
+def log_uniform(rng, size_range):
+    low, high = size_range
+    return int(math.exp(rng.uniform(math.log(low), math.log(high))))
+
+
+def block_data(rng, size):
+    """Bytes that compress about as well as chunk data (a third noise, the rest runs)"""
+    noise = size // 3
+    return rng.randbytes(noise) + bytes([rng.randrange(16)]) * (size - noise)
+
+
+def region_file(rng, region_x, region_z, layout):
+    """Encode one .mca file: location and timestamp tables, then sector-aligned chunks"""
+    slots = rng.sample(range(1024), rng.randint(*layout['chunks_per_region']))
+    locations = [0] * 1024
+    timestamps = [0] * 1024
+    sectors = bytearray()
+    for index in sorted(slots):
+        chunk_x = region_x * 32 + index % 32
+        chunk_z = region_z * 32 + index // 32
+        nbt = nbt_compound([
+            (TAG_INT, "DataVersion", DATA_VERSION),
+            (TAG_INT, "xPos", chunk_x),
+            (TAG_INT, "yPos", -4),
+            (TAG_INT, "zPos", chunk_z),
+            (TAG_STRING, "Status", "minecraft:full"),
+            (TAG_LONG, "LastUpdate", rng.randrange(1, 10_000_000)),
+            (TAG_LONG, "InhabitedTime", rng.randrange(0, 1_000_000)),
+            (TAG_BYTE_ARRAY, "sections", block_data(rng, log_uniform(rng, layout['chunk_nbt_size']))),
+        ])
+        payload = zlib.compress(nbt, 6)
+        chunk = struct.pack(">IB", len(payload) + 1, 2) + payload  # 2 = zlib
+        count = -(-len(chunk) // REGION_SECTOR_SIZE)
+        locations[index] = ((2 + len(sectors) // REGION_SECTOR_SIZE) << 8) | count
+        timestamps[index] = BASE_MTIME - rng.randrange(0, 90 * 86400)
+        sectors += chunk + bytes(count * REGION_SECTOR_SIZE - len(chunk))
+    return struct.pack(">1024I", *locations) + struct.pack(">1024I", *timestamps) + bytes(sectors)
+
+
+def player_files(rng, layout):
+    """Yield (relative path, bytes) for each player's playerdata, stats and advancements"""
+    for i in range(layout['players']):
+        player = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        nbt = nbt_compound([
+            (TAG_INT, "DataVersion", DATA_VERSION),
+            (TAG_STRING, "Dimension", rng.choice(["minecraft:overworld", "minecraft:the_nether", "minecraft:the_end"])),
+            (TAG_INT, "XpLevel", rng.randrange(0, 60)),
+            (TAG_BYTE, "OnGround", 1),
+            (TAG_BYTE_ARRAY, "Inventory", block_data(rng, log_uniform(rng, layout['playerdata_size']))),
+        ])
+        yield f"playerdata/{player}.dat", gzip.compress(nbt, mtime=0)
+
+        stats = {"stats": {
+            "minecraft:mined": {f"minecraft:block_{n}": rng.randrange(1, 5000) for n in range(rng.randrange(5, 80))},
+            "minecraft:custom": {f"minecraft:stat_{n}": rng.randrange(1, 10 ** 6) for n in range(rng.randrange(10, 60))},
+        }, "DataVersion": DATA_VERSION}
+        yield f"stats/{player}.json", json.dumps(stats).encode()
+
+        advancements = {f"minecraft:story/step_{n}": {"criteria": {"done": "2024-01-01 00:00:00 +0000"}, "done": True}
+                        for n in range(rng.randrange(3, 40))}
+        advancements["DataVersion"] = DATA_VERSION
+        yield f"advancements/{player}.json", json.dumps(advancements, indent=2).encode()
+
+
+def bluemap_tiles(rng, layout):
+    """Yield (relative path, bytes) for BlueMap's hires (.prbm.gz) and lowres (.png) tiles"""
+    side = max(1, int(math.sqrt(layout['bluemap_tiles'])))
+    for i in range(layout['bluemap_tiles']):
+        x, z = i % side - side // 2, i // side - side // 2
+        size = log_uniform(rng, layout['bluemap_tile_size'])
+        if i % 4:
+            yield f"bluemap/web/maps/world/tiles/0/x{x}/z{z}.prbm.gz", gzip.compress(block_data(rng, size), mtime=0)
+        else:
+            yield f"bluemap/web/maps/world/tiles/1/x{x}/z{z}.png", b"\x89PNG\r\n\x1a\n" + rng.randbytes(size)
+
+
+def write_distant_horizons(path, rng, size_mb):
+    """Build a DistantHorizons.sqlite of about `size_mb` MB with LOD-like blob rows"""
+    db = sqlite3.connect(path)
+    try:
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.execute("CREATE TABLE FullData (DhSectionPos TEXT PRIMARY KEY, DataDetailLevel INTEGER, Data BLOB)")
+        for row in range(size_mb * 1024 * 1024 // DH_ROW_SIZE):
+            db.execute("INSERT INTO FullData VALUES (?, ?, ?)",
+                       (f"[6,{row % 256},{row // 256}]", 6, block_data(rng, DH_ROW_SIZE - 64)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def generate_world(path, seed=1, layout=None):
+    """Write a synthetic world into `path` (created if needed).
+
+    Args:
+        seed: Same seed, same files, bytes and mtimes
+        layout: Overrides for WORLD_LAYOUT entries
+
+    Returns:
+        Dict with the number of files and total bytes written.
+    """
+    layout = {**WORLD_LAYOUT, **(layout or {})}
+    rng = random.Random(seed)
+    summary = {'files': 0, 'bytes': 0}
+
+    def write(rel_path, data):
+        full_path = os.path.join(path, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(data)
+        mtime = BASE_MTIME - rng.randrange(0, 30 * 86400)
+        os.utime(full_path, (mtime, mtime))
+        summary['files'] += 1
+        summary['bytes'] += len(data)
+
+    level = nbt_compound([(TAG_COMPOUND, "Data", [
+        (TAG_INT, "DataVersion", DATA_VERSION),
+        (TAG_STRING, "LevelName", "world"),
+        (TAG_LONG, "RandomSeed", rng.getrandbits(63)),
+        (TAG_LONG, "Time", rng.randrange(10 ** 6, 10 ** 8)),
+    ])])
+    write("level.dat", gzip.compress(level, mtime=0))
+
+    for folder, count in layout['regions'].items():
+        side = max(1, math.ceil(math.sqrt(count)))
+        for i in range(count):
+            region_x, region_z = i % side - side // 2, i // side - side // 2
+            write(f"{folder}/r.{region_x}.{region_z}.mca", region_file(rng, region_x, region_z, layout))
+
+    for rel_path, data in player_files(rng, layout):
+        write(rel_path, data)
+    for rel_path, data in bluemap_tiles(rng, layout):
+        write(rel_path, data)
+
+    if layout['distant_horizons_mb']:
+        dh_path = os.path.join(path, "DistantHorizons.sqlite")
+        write_distant_horizons(dh_path, random.Random(rng.getrandbits(64)), layout['distant_horizons_mb'])
+        mtime = BASE_MTIME - rng.randrange(0, 86400)
+        os.utime(dh_path, (mtime, mtime))
+        summary['files'] += 1
+        summary['bytes'] += os.path.getsize(dh_path)
+
+    return summary
+
+
+def layout_from_args(args):
+    """WORLD_LAYOUT overrides from --regions, --chunks, --players, --tiles and --dh-mb"""
+    def option(name):
+        for i, arg in enumerate(args):
+            if arg == name and i + 1 < len(args):
+                return args[i + 1]
+            if arg.startswith(name + "="):
+                return arg.split("=", 1)[1]
+        return None
+
+    layout = {}
+    if option("--regions"):
+        counts = [int(n) for n in option("--regions").split(",")]
+        counts += [0] * (3 - len(counts))
+        layout['regions'] = dict(zip(WORLD_LAYOUT['regions'], counts))
+    if option("--chunks"):
+        low, high = (int(n) for n in option("--chunks").split(","))
+        layout['chunks_per_region'] = (low, high)
+    for name, key in (("--players", 'players'), ("--tiles", 'bluemap_tiles'), ("--dh-mb", 'distant_horizons_mb')):
+        if option(name) is not None:
+            layout[key] = int(option(name))
+    return layout
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0].startswith("-"):
+        print(__doc__)
+        sys.exit(1)
+    seed = 1
+    for i, arg in enumerate(args):
+        if arg == "--seed" and i + 1 < len(args):
+            seed = int(args[i + 1])
+        elif arg.startswith("--seed="):
+            seed = int(arg.split("=", 1)[1])
+    summary = generate_world(args[0], seed, layout_from_args(args))
+    print(f"Wrote {summary['files']} files ({summary['bytes'] / (1024 * 1024):.1f} MB) to {args[0]}")
@@ -11,10 +11,32 @@ Usage:
 """
 
 import paramiko
+import atexit
+import base64
+import bisect
+import gzip
+import hashlib
+import http.client
+import io
+import itertools
 import os
+import posixpath
 import sys
 import json
+import queue
+import re
+import select
+import socket
+import ssl
+import struct
+import tarfile
+import threading
+import time
+import urllib.parse
 import urllib.request
+import zipfile
+import zlib
+from array import array
 from datetime import datetime
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeRemainingColumn, TransferSpeedColumn, FileSizeColumn
@@ -22,6 +44,11 @@ from rich.table import Table
 from rich.panel import Panel
 from rich import box
 
+try:
+    import zstandard  # Optional: local world snapshots fall back to zlib without it
+except ImportError:
+    zstandard = None
+
 # Initialize rich console
 console = Console()
 
@@ -58,6 +85,50 @@ PTERODACTYL_API_URL = os.environ.get("PTERODACTYL_API_URL", "https://mc.bloom.ho
 PTERODACTYL_API_KEY = os.environ.get("PTERODACTYL_API_KEY", "")
 PTERODACTYL_SERVER_ID = os.environ.get("PTERODACTYL_SERVER_ID", "")
 
+# Parallel transfer settings (number of SFTP connections used for bulk transfers)
+SFTP_WORKERS = int(os.environ.get("SFTP_WORKERS", "4"))
+SFTP_RETRIES = int(os.environ.get("SFTP_RETRIES", "3"))  # attempts per file when a connection drops
+SSH_KEEPALIVE = int(os.environ.get("SSH_KEEPALIVE", "30"))  # seconds between keepalives on idle sessions
+
+# Remote deletes: "delete" removes folders server-side in one API call, "trash"
+# renames them into TRASH_DIR and purges them in the background
+REMOTE_DELETE_MODE = os.environ.get("REMOTE_DELETE_MODE", "delete")
+TRASH_DIR = "/.trash"
+
+# Uploads: "auto" bundles many small files into one tar.gz that the server
+# unpacks (/files/decompress), "archive" bundles everything, "files" never does
+UPLOAD_MODE = os.environ.get("UPLOAD_MODE", "auto")
+ARCHIVE_MIN_FILES = 200  # auto mode: fewer small files than this go one by one
+ARCHIVE_MAX_FILE_SIZE = 1024 * 1024  # auto mode: larger files go one by one
+
+# Local backup before world-download: "snapshot" moves the old world aside
+# instead of copying it (delta downloads move the files they replace and clone
+# the rest), "link" hard-links unchanged files instead of cloning them, "copy"
+# copies everything, "store" saves it into the deduplicated snapshot store
+WORLD_BACKUP_MODE = os.environ.get("WORLD_BACKUP_MODE", "snapshot")
+
+# Local world snapshot store (`world-snapshots`): where it lives (default
+# LocalServer/.world-snapshots) and how many snapshots `prune` keeps - the
+# newest SNAPSHOT_KEEP_LAST, plus the newest of each of the last
+# SNAPSHOT_KEEP_DAILY days and SNAPSHOT_KEEP_WEEKLY weeks that have one
+WORLD_SNAPSHOT_DIR = os.environ.get("WORLD_SNAPSHOT_DIR", "")
+SNAPSHOT_KEEP_LAST = int(os.environ.get("SNAPSHOT_KEEP_LAST", "3"))
+SNAPSHOT_KEEP_DAILY = int(os.environ.get("SNAPSHOT_KEEP_DAILY", "7"))
+SNAPSHOT_KEEP_WEEKLY = int(os.environ.get("SNAPSHOT_KEEP_WEEKLY", "4"))
+
+# SSH transport profile (the `calibrate` command measures alternatives and saves
+# the fastest). Window and packet size apply to SFTP channels (calibrate leaves
+# the packet size alone, as SFTP requests never exceed 32 KiB), SFTP_PREFETCH
+# caps outstanding read requests per download (0 = no cap), and SFTP_CIPHERS
+# limits the ciphers offered (comma-separated, empty = paramiko's defaults)
+TRANSPORT_PROFILE = {
+    'window': int(os.environ.get("SFTP_WINDOW_SIZE", str(paramiko.common.DEFAULT_WINDOW_SIZE))),
+    'packet': int(os.environ.get("SFTP_PACKET_SIZE", str(paramiko.common.DEFAULT_MAX_PACKET_SIZE))),
+    'prefetch': int(os.environ.get("SFTP_PREFETCH", "0")) or None,
+    'compress': os.environ.get("SFTP_COMPRESS", "false").lower() in ("1", "true", "yes"),
+    'ciphers': [cipher.strip() for cipher in os.environ.get("SFTP_CIPHERS", "").split(",") if cipher.strip()],
+}
+
 # Local paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_DIR = os.path.join(SCRIPT_DIR, "config")
@@ -65,7 +136,12 @@ LOCALSERVER_DIR = os.path.join(SCRIPT_DIR, "..", "LocalServer")
 
 
 class RichProgressTracker:
-    """Tracks upload progress using Rich"""
+    """Tracks upload progress using Rich
+
+    Safe to share between transfer worker threads: start_file() returns a task
+    id that update() and file_complete() accept. Without one they act on the
+    most recently started file, which is all the single-stream callers need.
+    """
     def __init__(self, total_files=1, total_size=0):
         self.total_files = total_files
         self.total_size = total_size
@@ -73,7 +149,8 @@ class RichProgressTracker:
         self.files_succeeded = 0
         self.files_failed = 0
         self.total_bytes_transferred = 0
-        self.previous_file_transferred = 0
+        self.file_transferred = {}  # task_id -> bytes reported so far
+        self.lock = threading.RLock()
 
         self.progress = Progress(
             SpinnerColumn(),
@@ -106,79 +183,97 @@ class RichProgressTracker:
         self.progress.__exit__(exc_type, exc_val, exc_tb)
 
     def start_file(self, filename, file_size):
-        self.current_file += 1
-        self.previous_file_transferred = 0
-
         display_name = filename
         if len(display_name) > 60:
             display_name = "..." + display_name[-57:]
 
-        if self.current_file_task_id is not None:
-            self.progress.remove_task(self.current_file_task_id)
+        with self.lock:
+            self.current_file += 1
+            self.current_file_task_id = self.progress.add_task(
+                f"[green]{display_name}",
+                total=file_size
+            )
+            self.file_transferred[self.current_file_task_id] = 0
+            return self.current_file_task_id
 
-        self.current_file_task_id = self.progress.add_task(
-            f"[green]{display_name}",
-            total=file_size
-        )
+    def update(self, transferred, total, task_id=None):
+        with self.lock:
+            if task_id is None:
+                task_id = self.current_file_task_id
+            if task_id is None:
+                return
 
-    def update(self, transferred, total):
-        if self.current_file_task_id is not None:
-            self.progress.update(self.current_file_task_id, completed=transferred)
+            self.progress.update(task_id, completed=transferred)
 
-        if self.overall_task_id is not None:
-            delta = transferred - self.previous_file_transferred
+            delta = transferred - self.file_transferred.get(task_id, 0)
             if delta > 0:
                 self.total_bytes_transferred += delta
-                self.previous_file_transferred = transferred
-                self.progress.update(
-                    self.overall_task_id,
-                    completed=min(self.total_bytes_transferred, self.total_size),
-                    description=f"[cyan]Overall Progress ({self.files_succeeded + self.files_failed}/{self.total_files} files)"
-                )
-
-    def file_complete(self, success=True):
-        if success:
-            self.files_succeeded += 1
-            if self.current_file_task_id is not None:
-                # Access task by ID using internal dict (not list index)
-                task = self.progress._tasks.get(self.current_file_task_id)
-                if task and task.completed < task.total:
-                    remaining = task.total - task.completed
-                    self.total_bytes_transferred += remaining
-                if task:
-                    self.progress.update(self.current_file_task_id, completed=task.total)
-                self.progress.remove_task(self.current_file_task_id)
-                self.current_file_task_id = None
+                self.file_transferred[task_id] = transferred
+                self._update_overall()
 
-            if self.overall_task_id is not None:
-                self.progress.update(
-                    self.overall_task_id,
-                    completed=min(self.total_bytes_transferred, self.total_size),
-                    description=f"[cyan]Overall Progress ({self.files_succeeded + self.files_failed}/{self.total_files} files)"
-                )
-        else:
-            self.files_failed += 1
-            if self.current_file_task_id is not None:
-                # Update overall progress to account for skipped file size
-                task = self.progress._tasks.get(self.current_file_task_id)
+    def file_complete(self, success=True, task_id=None, count=1):
+        """Finish a task; `count` is how many files it covered (e.g. an archive)"""
+        with self.lock:
+            if task_id is None:
+                task_id = self.current_file_task_id
+
+            if success:
+                self.files_succeeded += count
+            else:
+                self.files_failed += count
+
+            if task_id is not None:
+                # Access task by ID using internal dict (not list index)
+                task = self.progress._tasks.get(task_id)
                 if task:
-                    self.total_bytes_transferred += task.total  # Count as "done" for progress
-                self.progress.remove_task(self.current_file_task_id)
+                    # Count the rest of the file as done, even on failure, so
+                    # the overall bar still reaches 100%
+                    remaining = task.total - self.file_transferred.get(task_id, 0)
+                    if remaining > 0:
+                        self.total_bytes_transferred += remaining
+                    if success:
+                        self.progress.update(task_id, completed=task.total)
+                self.progress.remove_task(task_id)
+                self.file_transferred.pop(task_id, None)
+                if task_id == self.current_file_task_id:
+                    self.current_file_task_id = None
+
+            self._update_overall()
+
+    def discard(self, task_id):
+        """Drop a task without counting it, e.g. when its files will be re-sent one by one"""
+        with self.lock:
+            self.total_bytes_transferred -= self.file_transferred.pop(task_id, 0)
+            if task_id in self.progress._tasks:
+                self.progress.remove_task(task_id)
+            if task_id == self.current_file_task_id:
                 self.current_file_task_id = None
-
-            # Update overall progress bar even on failure
-            if self.overall_task_id is not None:
-                self.progress.update(
-                    self.overall_task_id,
-                    completed=min(self.total_bytes_transferred, self.total_size),
-                    description=f"[cyan]Overall Progress ({self.files_succeeded + self.files_failed}/{self.total_files} files)"
-                )
+            self._update_overall()
+
+    def set_totals(self, total_files, total_size):
+        """Replace the expected totals, e.g. as a scan running alongside the transfer finds more files"""
+        with self.lock:
+            self.total_files = total_files
+            self.total_size = total_size
+            if self.overall_task_id is None and total_files > 1:
+                self.overall_task_id = self.progress.add_task("", total=total_size)
+            elif self.overall_task_id is not None:
+                self.progress.update(self.overall_task_id, total=total_size)
+            self._update_overall()
+
+    def _update_overall(self):
+        if self.overall_task_id is not None:
+            self.progress.update(
+                self.overall_task_id,
+                completed=min(self.total_bytes_transferred, self.total_size),
+                description=f"[cyan]Overall Progress ({self.files_succeeded + self.files_failed}/{self.total_files} files)"
+            )
 
 
-def progress_callback(tracker):
+def progress_callback(tracker, task_id=None):
     """Create a callback function for paramiko"""
     def callback(transferred, total):
-        tracker.update(transferred, total)
+        tracker.update(transferred, total, task_id)
     return callback
 
 
@@ -197,6 +292,325 @@ def check_credentials():
     return True
 
 
+# =============================================================================
+# SSH Sessions
+# =============================================================================
+
+class SSHSessionPool:
+    """Keeps SSH/SFTP sessions open between operations.
+
+    Every handshake and login costs a second or two over our link, so released
+    sessions are parked and handed out again by acquire(). Transports send
+    keepalives to survive idle NAT timeouts, and a session that sat idle for a
+    while is checked with one cheap SFTP round trip first; dead ones are
+    dropped and replaced transparently. Idle sessions are closed at exit.
+    """
+    def __init__(self, max_idle=None, keepalive=None):
+        self.max_idle = max_idle or SFTP_WORKERS + 2
+        self.keepalive = keepalive or SSH_KEEPALIVE
+        self.idle = []  # (ssh, sftp, released_at)
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        return open_ssh_session(keepalive=self.keepalive)
+
+    def _alive(self, ssh, sftp, idle_for):
+        transport = ssh.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        if idle_for > 10:
+            try:
+                sftp.normalize(".")
+            except Exception:
+                return False
+        return True
+
+    def acquire(self, announce=False):
+        """Return (ssh, sftp), reusing an idle session when one is still alive"""
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                ssh, sftp, released_at = self.idle.pop()
+            if self._alive(ssh, sftp, time.time() - released_at):
+                return ssh, sftp
+            ssh.close()
+
+        if announce:
+            console.print(f"[cyan]Connecting to {hostname}:{port}...[/cyan]")
+        ssh, sftp = self._connect()
+        if announce:
+            console.print("[green]Connected![/green]")
+        return ssh, sftp
+
+    def release(self, ssh, sftp):
+        """Hand a session back for reuse (closed instead if dead or the pool is full)"""
+        transport = ssh.get_transport()
+        if transport is not None and transport.is_active():
+            with self.lock:
+                if len(self.idle) < self.max_idle:
+                    self.idle.append((ssh, sftp, time.time()))
+                    return
+        sftp.close()
+        ssh.close()
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for ssh, sftp, released_at in idle:
+            sftp.close()
+            ssh.close()
+
+
+ssh_sessions = SSHSessionPool()
+atexit.register(ssh_sessions.close_all)
+
+
+def get_sftp_connection(announce=False):
+    """Get an SFTP connection from the session pool.
+
+    Hand it back with release_sftp_connection() when done. With `announce`,
+    prints progress when a new connection actually has to be made.
+    """
+    if not check_credentials():
+        return None, None
+    return ssh_sessions.acquire(announce)
+
+
+def release_sftp_connection(ssh, sftp):
+    """Return a connection from get_sftp_connection() to the session pool"""
+    ssh_sessions.release(ssh, sftp)
+
+
+def open_ssh_session(profile=None, keepalive=None):
+    """Open a new SSH connection and SFTP channel using a transport profile.
+
+    Args:
+        profile: Dict like TRANSPORT_PROFILE (defaults to it)
+        keepalive: Seconds between SSH keepalives, if any
+    """
+    profile = profile or TRANSPORT_PROFILE
+    disabled = {}
+    if profile['ciphers']:
+        disabled['ciphers'] = [cipher for cipher in paramiko.Transport._preferred_ciphers
+                               if cipher not in profile['ciphers']]
+
+    ssh = paramiko.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    ssh.connect(hostname, port=port, username=username, password=password,
+                compress=profile['compress'], disabled_algorithms=disabled or None)
+    transport = ssh.get_transport()
+    if keepalive:
+        transport.set_keepalive(keepalive)
+    sftp = paramiko.SFTPClient.from_transport(transport, window_size=profile['window'],
+                                              max_packet_size=profile['packet'])
+    return ssh, sftp
+
+
+# Values calibrate_transport() tries for each profile setting, one setting at a time.
+# Packet size isn't tried: paramiko never sends an SFTP read or write larger than
+# 32 KiB (MAX_REQUEST_SIZE), so a bigger channel packet carries no more data
+CALIBRATION_CANDIDATES = [
+    ('window', [2 * 1024 * 1024, 8 * 1024 * 1024, 32 * 1024 * 1024]),
+    ('prefetch', [None, 64, 256]),
+    ('compress', [False, True]),
+    ('ciphers', [[], ['aes128-ctr'], ['aes128-gcm@openssh.com'], ['aes256-gcm@openssh.com']]),
+]
+
+# Runs per profile during calibrate; the median is compared, so one slow or
+# fast run doesn't decide a setting
+CALIBRATION_RUNS = 3
+
+PROFILE_ENV_KEYS = {
+    'window': "SFTP_WINDOW_SIZE",
+    'packet': "SFTP_PACKET_SIZE",
+    'prefetch': "SFTP_PREFETCH",
+    'compress': "SFTP_COMPRESS",
+    'ciphers': "SFTP_CIPHERS",
+}
+
+
+def describe_profile_value(setting, value):
+    if setting in ('window', 'packet'):
+        return format_size(value)
+    if setting == 'prefetch':
+        return str(value) if value else "no cap"
+    if setting == 'compress':
+        return "on" if value else "off"
+    return ",".join(value) if value else "default"
+
+
+def calibration_payload(size):
+    """Test data for calibrate: the start of the local world (so compression is
+    judged on real data), topped up with random bytes if there isn't enough.
+    """
+    payload = bytearray()
+    world_path = os.path.join(LOCALSERVER_DIR, "world-production")
+    for root, dirs, files in os.walk(world_path):
+        dirs.sort()
+        for name in sorted(files):
+            if len(payload) >= size:
+                break
+            try:
+                with open(os.path.join(root, name), 'rb') as f:
+                    payload += f.read(size - len(payload))
+            except OSError:
+                continue
+    payload += os.urandom(size - len(payload))
+    return bytes(payload)
+
+
+def measure_transport(profile, payload, remote_path, runs=CALIBRATION_RUNS):
+    """Upload and download `payload` `runs` times with `profile`, each time over
+    a fresh session.
+
+    Returns:
+        Median throughput in bytes per second over both directions
+    """
+    rates = sorted(measure_transport_once(profile, payload, remote_path) for _ in range(runs))
+    return rates[len(rates) // 2]
+
+
+def measure_transport_once(profile, payload, remote_path):
+    """Upload and download `payload` over a fresh session with `profile`.
+
+    Returns:
+        Throughput in bytes per second over both directions
+    """
+    ssh, sftp = open_ssh_session(profile)
+    try:
+        started = time.time()
+        with sftp.open(remote_path, 'wb') as f:
+            f.set_pipelined(True)
+            for offset in range(0, len(payload), 32768):
+                f.write(payload[offset:offset + 32768])
+        with sftp.open(remote_path, 'rb') as f:
+            f.prefetch(len(payload), profile['prefetch'])
+            received = f.read(len(payload))
+        elapsed = time.time() - started
+    finally:
+        sftp.close()
+        ssh.close()
+    if received != payload:
+        raise IOError("data read back doesn't match what was written")
+    return 2 * len(payload) / elapsed
+
+
+def save_env_settings(settings):
+    """Set KEY=value lines in .env, replacing existing ones and appending the rest."""
+    env_path = os.path.join(SCRIPT_DIR, '.env')
+    lines = []
+    if os.path.exists(env_path):
+        with open(env_path, 'r') as f:
+            lines = f.read().splitlines()
+
+    remaining = dict(settings)
+    for i, line in enumerate(lines):
+        key = line.split('=', 1)[0].strip()
+        if not line.lstrip().startswith('#') and '=' in line and key in remaining:
+            lines[i] = f"{key}={remaining.pop(key)}"
+    if remaining:
+        lines += ["", "# Transport profile (saved by calibrate)"]
+        lines += [f"{key}={value}" for key, value in remaining.items()]
+
+    with open(env_path + ".tmp", 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(env_path + ".tmp", env_path)
+
+
+def calibrate_transport(size_mb=16, auto_confirm=False):
+    """Measure SFTP throughput for different transport settings and save the fastest.
+
+    Starting from the current profile, each setting in CALIBRATION_CANDIDATES
+    is varied in turn while the others keep their best value so far, so the
+    number of runs grows with the number of candidates rather than their
+    combinations. Every run uploads and downloads the same test file over a new
+    connection, and each profile is judged on the median of CALIBRATION_RUNS
+    runs. The winning profile is written to .env.
+    """
+    from rich.prompt import Confirm
+
+    if not check_credentials():
+        return False
+
+    size = size_mb * 1024 * 1024
+    payload = calibration_payload(size)
+    remote_path = f"/.calibrate-{datetime.now().strftime('%Y%m%d_%H%M%S')}.bin"
+
+    console.print(Panel(
+        "[bold]Transport Calibration[/bold]\n\n"
+        f"Each run uploads and downloads {format_size(size)} to {remote_path}\n"
+        f"over a new connection with one setting changed, {CALIBRATION_RUNS} times per setting.",
+        title="[cyan]Calibrate[/cyan]",
+        border_style="cyan"
+    ))
+
+    table = Table(title="Calibration Runs", box=box.ROUNDED)
+    table.add_column("Setting", style="cyan")
+    table.add_column("Value", style="white")
+    table.add_column("Throughput (median)", style="green", justify="right")
+
+    best = dict(TRANSPORT_PROFILE)
+    try:
+        console.print("\n[cyan]Measuring the current profile...[/cyan]")
+        best_rate = measure_transport(best, payload, remote_path)
+        table.add_row("current", "", f"{format_size(best_rate)}/s")
+
+        for setting, values in CALIBRATION_CANDIDATES:
+            for value in values:
+                if value == best[setting]:
+                    continue
+                candidate = dict(best, **{setting: value})
+                label = describe_profile_value(setting, value)
+                console.print(f"[cyan]Trying {setting} = {label}...[/cyan]")
+                try:
+                    rate = measure_transport(candidate, payload, remote_path)
+                except Exception as e:
+                    console.print(f"[yellow]  {setting} = {label} failed: {e}[/yellow]")
+                    table.add_row(setting, label, "[red]failed[/red]")
+                    continue
+                table.add_row(setting, label, f"{format_size(rate)}/s")
+                # Needs a clear win, so noise doesn't flip settings back and forth
+                if rate > best_rate * 1.05:
+                    best, best_rate = candidate, rate
+    except Exception as e:
+        console.print(f"[red]Calibration failed: {e}[/red]")
+        return False
+    finally:
+        ssh, sftp = get_sftp_connection()
+        if sftp:
+            try:
+                sftp.remove(remote_path)
+            except IOError:
+                pass
+            release_sftp_connection(ssh, sftp)
+
+    console.print()
+    console.print(table)
+    console.print(f"\n[bold]Fastest profile ({format_size(best_rate)}/s):[/bold]")
+    for setting, env_key in PROFILE_ENV_KEYS.items():
+        console.print(f"  {env_key} = {describe_profile_value(setting, best[setting])}")
+
+    if best == TRANSPORT_PROFILE:
+        console.print("\n[green]✓ The current profile is already the fastest[/green]")
+        return True
+
+    if not auto_confirm and not Confirm.ask("\nSave this profile to .env?"):
+        console.print("[yellow]Not saved.[/yellow]")
+        return True
+
+    save_env_settings({
+        "SFTP_WINDOW_SIZE": best['window'],
+        "SFTP_PACKET_SIZE": best['packet'],
+        "SFTP_PREFETCH": best['prefetch'] or 0,
+        "SFTP_COMPRESS": "true" if best['compress'] else "false",
+        "SFTP_CIPHERS": ",".join(best['ciphers']),
+    })
+    TRANSPORT_PROFILE.update(best)
+    console.print("[green]✓ Saved to .env[/green]")
+    return True
+
+
 def upload_file(local_path, remote_path):
     """Upload a single file to the server"""
     if not os.path.exists(local_path):
@@ -206,36 +620,25 @@ def upload_file(local_path, remote_path):
     if not check_credentials():
         return False
 
-    console.print(f"[cyan]Connecting to {hostname}:{port}...[/cyan]")
-
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        console.print("[green]Connected![/green]")
-
-        sftp = ssh.open_sftp()
+        # The pool's first worker picks this session back up
+        ssh, sftp = get_sftp_connection(announce=True)
+        release_sftp_connection(ssh, sftp)
 
         file_size = os.path.getsize(local_path)
         filename = os.path.basename(local_path)
         console.print(f"\n[bold]Uploading {filename} ({file_size / (1024*1024):.1f} MB)...[/bold]\n")
 
+        # Only a file big enough to be split into ranges needs more than one connection
+        workers = None if file_size >= RANGE_SPLIT_MIN_SIZE else 1
         with RichProgressTracker(total_files=1, total_size=file_size) as tracker:
-            tracker.start_file(filename, file_size)
-
-            try:
-                callback = progress_callback(tracker)
-                sftp.put(local_path, remote_path, callback=callback)
-                tracker.file_complete(success=True)
-                console.print(f"\n[green]✓ Upload complete![/green]")
-            except Exception as e:
-                tracker.file_complete(success=False)
-                console.print(f"\n[red]✗ Upload failed: {e}[/red]")
-                return False
+            with SFTPTransferPool(tracker, workers=workers) as pool:
+                pool.put(local_path, remote_path, filename, file_size)
 
-        sftp.close()
-        ssh.close()
+        if pool.failed:
+            console.print(f"\n[red]✗ Upload failed[/red]")
+            return False
+        console.print(f"\n[green]✓ Upload complete![/green]")
         return True
 
     except Exception as e:
@@ -252,231 +655,1365 @@ def upload_directory(local_dir, remote_dir):
     if not check_credentials():
         return False
 
-    console.print(f"[cyan]Connecting to {hostname}:{port}...[/cyan]")
-
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
+    ssh = sftp = None
     try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        console.print("[green]Connected![/green]")
+        ssh, sftp = get_sftp_connection(announce=True)
 
-        sftp = ssh.open_sftp()
-
-        # Count files and total size
-        file_count = 0
-        total_size = 0
-        for root, dirs, files in os.walk(local_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_count += 1
-                total_size += os.path.getsize(file_path)
+        plan = TransferPlan(local_dir)
+        file_count = len(plan)
+        total_size = plan.size()
 
         console.print(f"\n[bold]Uploading {file_count} files ({total_size / (1024*1024):.1f} MB)...[/bold]\n")
 
-        with RichProgressTracker(total_files=file_count, total_size=total_size) as tracker:
-            def upload_recursive(local_path, remote_path):
-                for item in os.listdir(local_path):
-                    local_item = os.path.join(local_path, item)
-                    remote_item = remote_path + "/" + item
-
-                    if os.path.isfile(local_item):
-                        try:
-                            file_size = os.path.getsize(local_item)
-                            rel_path = os.path.relpath(local_item, local_dir)
-                            tracker.start_file(rel_path, file_size)
-                            callback = progress_callback(tracker)
-                            sftp.put(local_item, remote_item, callback=callback)
-                            tracker.file_complete(success=True)
-                        except Exception as e:
-                            tracker.file_complete(success=False)
-                            console.print(f"[red]Error uploading {item}: {e}[/red]")
-                    elif os.path.isdir(local_item):
-                        try:
-                            sftp.mkdir(remote_item)
-                        except IOError:
-                            pass  # Directory exists
-                        upload_recursive(local_item, remote_item)
-
-            # Ensure remote directory exists
-            try:
-                sftp.mkdir(remote_dir)
-            except IOError:
-                pass
+        try:
+            sftp.mkdir(remote_dir)
+        except IOError:
+            pass
 
-            upload_recursive(local_dir, remote_dir)
+        with RichProgressTracker(total_files=file_count, total_size=total_size) as tracker:
+            with SFTPTransferPool(tracker) as pool:
+                upload_file_list(sftp, pool, local_dir, remote_dir, list(plan.files), plan.files, {})
 
         console.print(f"\n[green]✓ Upload complete![/green]")
-
-        sftp.close()
-        ssh.close()
         return True
 
     except Exception as e:
         console.print(f"\n[red]✗ Error: {e}[/red]")
         return False
+    finally:
+        if ssh:
+            release_sftp_connection(ssh, sftp)
 
 
-def get_remote_directory_info(sftp, path):
-    """Calculate total size and file count of a remote directory recursively."""
-    total_size = 0
-    file_count = 0
+# Directories listed at once while walking a remote tree (each on its own session)
+REMOTE_SCAN_WORKERS = 4
 
-    def scan_recursive(remote_path):
-        nonlocal total_size, file_count
-        try:
-            for item in sftp.listdir_attr(remote_path):
-                item_path = f"{remote_path}/{item.filename}"
-                if item.st_mode & 0o40000:
-                    scan_recursive(item_path)
-                else:
-                    total_size += item.st_size
-                    file_count += 1
-        except IOError:
-            pass
 
+def walk_remote_tree(path, sftp=None, workers=None, prune=None, failed=None):
+    """Yield (rel_path, is_dir, size, mtime) for everything under a remote directory.
+
+    Directories are listed by several threads at once, each on its own pooled
+    session (one of them on `sftp` if given), so a deep tree costs about one
+    round trip per level instead of one per directory, and entries are
+    yielded as soon as their directory has been listed; a consumer can start
+    on the first files while the rest of the tree is still being scanned.
+    Order is not deterministic. A missing `path` yields nothing. Any other
+    directory that can't be listed is skipped and its remote path appended to
+    `failed` (if given), so callers can tell an incomplete listing from files
+    that are gone. Subdirectories `prune(rel_path)` returns True for are
+    yielded but not listed.
+    """
+    workers = workers or REMOTE_SCAN_WORKERS
+    pending = queue.Queue()  # (remote dir, rel prefix); None tells a lister to stop
+    found = queue.Queue()  # lists of entries, an exception, or None once the walk is done
+    state = {'outstanding': 1}
+    lock = threading.Lock()
+    stop = threading.Event()
+    pending.put((path, ""))
+
+    def lister(own_sftp):
+        ssh = None
+        try:
+            if own_sftp is None:
+                ssh, own_sftp = ssh_sessions.acquire()
+            while not stop.is_set():
+                item = pending.get()
+                if item is None:
+                    return
+                remote_dir, rel_prefix = item
+                entries = []
+                subdirs = []
+                try:
+                    for attr in own_sftp.listdir_attr(remote_dir):
+                        rel_path = rel_prefix + attr.filename
+                        is_dir = bool(attr.st_mode & 0o40000)
+                        entries.append((rel_path, is_dir, attr.st_size, attr.st_mtime))
+                        if is_dir and not (prune and prune(rel_path)):
+                            subdirs.append((f"{remote_dir}/{attr.filename}", rel_path + "/"))
+                except IOError as e:
+                    if failed is not None and not (rel_prefix == "" and isinstance(e, FileNotFoundError)):
+                        failed.append(remote_dir)
+                with lock:
+                    state['outstanding'] += len(subdirs) - 1
+                    done = state['outstanding'] == 0
+                for subdir in subdirs:
+                    pending.put(subdir)
+                found.put(entries)
+                if done:
+                    found.put(None)
+                    for _ in range(workers):
+                        pending.put(None)
+        except Exception as e:
+            stop.set()
+            found.put(e)
+        finally:
+            if ssh is not None:
+                ssh_sessions.release(ssh, own_sftp)
+
+    threads = [threading.Thread(target=lister, args=(sftp if i == 0 else None,), daemon=True)
+               for i in range(workers)]
+    for thread in threads:
+        thread.start()
     try:
-        sftp.stat(path)
-        scan_recursive(path)
-    except IOError:
-        pass
+        while True:
+            entries = found.get()
+            if entries is None:
+                return
+            if isinstance(entries, Exception):
+                raise entries
+            yield from entries
+    finally:
+        stop.set()
+        for _ in range(workers):
+            pending.put(None)
+
 
-    return file_count, total_size
+def format_remote_dirs(remote_dirs, limit=5):
+    """Short list of remote directories for a message (the first few, then a count)."""
+    shown = ", ".join(sorted(remote_dirs)[:limit])
+    return shown + (f" and {len(remote_dirs) - limit} more" if len(remote_dirs) > limit else "")
 
 
-def download_directory_recursive(sftp, remote_path, local_path, tracker, base_path=None):
-    """Download a remote directory recursively to local path with progress tracking."""
-    if base_path is None:
-        base_path = local_path
+def download_remote_tree(sftp, remote_path, local_path, pool, manifest_files=None, on_found=None, failed=None):
+    """Queue every file under a remote directory on `pool` as the walk finds it.
 
+    Args:
+        manifest_files: Optional dict (or FileTreeOverlay) filled with relative
+            path -> [size, mtime] for every remote file seen. Downloaded
+            files then keep the remote modification time.
+        on_found: Optional callback(size) for each file found, e.g. to grow
+            the progress totals while the scan is still running
+        failed: Optional list that gets the remote directories that couldn't
+            be listed (see walk_remote_tree)
+    """
     os.makedirs(local_path, exist_ok=True)
+    for rel_path, is_dir, size, mtime in walk_remote_tree(remote_path, sftp, failed=failed):
+        local_item = os.path.join(local_path, *rel_path.split("/"))
+        if is_dir:
+            os.makedirs(local_item, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(local_item), exist_ok=True)
+        if manifest_files is not None:
+            manifest_files[rel_path] = [size, mtime]
+        if on_found:
+            on_found(size)
+        pool.get(f"{remote_path}/{rel_path}", local_item, rel_path.replace("/", os.sep), size,
+                 mtime if manifest_files is not None else None)
+
+
+# Files at least this large are copied in resumable chunks, with a checkpoint
+# written to the transfer journal every RESUME_CHECKPOINT_BYTES
+RESUME_MIN_SIZE = 64 * 1024 * 1024
+RESUME_CHECKPOINT_BYTES = 16 * 1024 * 1024
+RESUME_VERIFY_BYTES = 64 * 1024  # tail re-read before resuming, to catch a torn write
+
+# Files at least this large are moved as byte ranges over several connections
+# at once, each range at least RANGE_SPLIT_PART_SIZE
+RANGE_SPLIT_MIN_SIZE = 256 * 1024 * 1024
+RANGE_SPLIT_PART_SIZE = 64 * 1024 * 1024
+
+# Progress of the last world-download, world-upload and staged world-upload,
+# each kept until a run of that kind finishes cleanly so --resume can pick up
+# where an interrupted one stopped; one file each, so a fresh run of one kind
+# doesn't throw away what another needs to resume
+TRANSFER_JOURNAL_FILES = {
+    'download': ".world-download-journal.jsonl",
+    'upload': ".world-upload-journal.jsonl",
+    'staged': ".world-staged-upload-journal.jsonl",
+}
 
-    try:
-        for item in sftp.listdir_attr(remote_path):
-            remote_item = f"{remote_path}/{item.filename}"
-            local_item = os.path.join(local_path, item.filename)
 
-            if item.st_mode & 0o40000:
-                download_directory_recursive(sftp, remote_item, local_item, tracker, base_path)
-            else:
-                try:
-                    rel_path = os.path.relpath(local_item, base_path)
-                    tracker.start_file(rel_path, item.st_size)
-                    sftp.get(remote_item, local_item, callback=progress_callback(tracker))
-                    tracker.file_complete(success=True)
-                except Exception as e:
-                    tracker.file_complete(success=False)
-                    console.print(f"[red]Error downloading {item.filename}: {e}[/red]")
-    except IOError as e:
-        console.print(f"[red]Error accessing {remote_path}: {e}[/red]")
+# How much of a remote zip member is requested (and held in memory) at once;
+# each window is one pipelined readv(), so a round trip per window, not per 32 KiB
+ZIP_READ_WINDOW = 4 * 1024 * 1024
 
 
-def upload_directory_recursive(sftp, local_path, remote_path, tracker, base_path=None, skip_files=None):
-    """Upload a local directory recursively to remote path with progress tracking.
+def read_remote_zip_member(remote_file, info):
+    """Yield the contents of one zip member from a zip opened over SFTP.
 
-    Args:
-        skip_files: List of filenames to skip (for Phase 2 uploads)
+    zipfile on a remote handle would wait a round trip for every 32 KiB it
+    reads, so the member's local header and compressed bytes are requested
+    ZIP_READ_WINDOW at a time with readv() and inflated here; a small member
+    costs one round trip. Stored and deflated members are supported, and the
+    CRC is checked once the member has been read.
+
+    Raises:
+        zipfile.BadZipFile: If the member can't be read or doesn't match its CRC
     """
-    if base_path is None:
-        base_path = local_path
-    if skip_files is None:
-        skip_files = []
+    if info.flag_bits & 0x1:
+        raise zipfile.BadZipFile(f"{info.filename} is encrypted")
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        inflater = zlib.decompressobj(-15)
+    elif info.compress_type == zipfile.ZIP_STORED:
+        inflater = None
+    else:
+        raise zipfile.BadZipFile(f"unsupported compression for {info.filename}")
+
+    # The local header usually repeats the central directory's name and extra
+    # field; if it is longer, `end` moves once it has been read. Reading a few
+    # bytes too many is harmless, the central directory always follows.
+    offset = info.header_offset
+    data_start = None
+    end = offset + 30 + len(info.orig_filename.encode("utf-8")) + len(info.extra) + info.compress_size
+    crc = 0
+    while offset < end:
+        window_end = min(offset + ZIP_READ_WINDOW, end)
+        pieces = [(start, min(32768, window_end - start)) for start in range(offset, window_end, 32768)]
+        for (start, _), data in zip(pieces, remote_file.readv(pieces)):
+            if data_start is None:
+                if len(data) < 30 or data[:4] != b"PK\x03\x04":
+                    raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+                name_length, extra_length = struct.unpack("<HH", data[26:30])
+                data_start = start + 30 + name_length + extra_length
+                end = data_start + info.compress_size
+                if data_start > start + len(data):
+                    raise zipfile.BadZipFile(f"oversized local header for {info.filename}")
+            data = data[max(data_start - start, 0):max(end - start, 0)]
+            if inflater is not None:
+                data = inflater.decompress(data)
+            if data:
+                crc = zlib.crc32(data, crc)
+                yield data
+        offset = window_end
+    if inflater is not None:
+        data = inflater.flush()
+        if data:
+            crc = zlib.crc32(data, crc)
+            yield data
+    if crc != info.CRC:
+        raise zipfile.BadZipFile(f"CRC mismatch for {info.filename}")
 
-    # Ensure remote directory exists
-    try:
-        sftp.mkdir(remote_path)
-    except IOError:
-        pass
 
-    try:
-        for item in os.listdir(local_path):
-            if item in skip_files:
-                continue
+class TransferJournal:
+    """Records per-file transfer progress so interrupted transfers can continue.
 
-            local_item = os.path.join(local_path, item)
-            remote_item = f"{remote_path}/{item}"
+    Entries are keyed by direction and destination path and remember the source
+    size and mtime they were made against, so a changed source starts over.
+    A checkpoint stores the last offset the destination confirmed; a finished
+    file stores the destination's size and mtime so a resumed run can skip it.
 
-            if os.path.isdir(local_item):
-                upload_directory_recursive(sftp, local_item, remote_item, tracker, base_path, skip_files)
-            else:
+    With a path, entries are appended to a JSON-lines file as they happen (an
+    interrupted write only loses its last line). Without `resume`, any journal
+    left over from an earlier run is discarded first. Without a path, progress
+    is only kept in memory, which still lets retries within one run resume.
+    """
+    def __init__(self, path=None, resume=False):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.file = None
+
+        if not path or not os.path.exists(path):
+            return
+        if not resume:
+            os.remove(path)
+            return
+
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self.entries[entry['key']] = entry
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _lookup(self, key, size, mtime):
+        entry = self.entries.get(key)
+        if entry and entry.get('size') == size and entry.get('mtime') == mtime:
+            return entry
+        return None
+
+    def offset(self, key, size, mtime):
+        """Confirmed offset to resume `key` from (0 if unknown or the source changed)"""
+        entry = self._lookup(key, size, mtime)
+        return entry.get('offset', 0) if entry else 0
+
+    def progress(self, key):
+        """Last checkpointed offset of `key`, whatever source it was made against"""
+        return self.entries.get(key, {}).get('offset', 0)
+
+    def finished(self, key, size, mtime):
+        """Destination [size, mtime] recorded when `key` finished, or None"""
+        entry = self._lookup(key, size, mtime)
+        return entry.get('done') if entry else None
+
+    def mark(self, step):
+        """Record that a named step of the run (e.g. an upload phase) finished"""
+        self._record({'key': f"step:{step}", 'done': True})
+
+    def marked(self, step):
+        return bool(self.entries.get(f"step:{step}", {}).get('done'))
+
+    def checkpoint(self, key, size, mtime, offset):
+        self._record({'key': key, 'size': size, 'mtime': mtime, 'offset': offset})
+
+    def done(self, key, size, mtime, dest_stat):
+        self._record({'key': key, 'size': size, 'mtime': mtime, 'done': list(dest_stat)})
+
+    def _record(self, entry):
+        with self.lock:
+            self.entries[entry['key']] = entry
+            if not self.path:
+                return
+            if self.file is None:
+                self.file = open(self.path, 'a')
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def clear(self):
+        """Forget all progress and remove the journal file (after a clean run)"""
+        self.close()
+        with self.lock:
+            self.entries = {}
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class SplitTransfer:
+    """Shared state of one large file being moved as several byte ranges.
+
+    The first range to run prepares the destination (or finds from the journal
+    that it is already done), progress from every range is summed into one
+    tracker task, and the last range to finish reports the file's result.
+    """
+    def __init__(self, size, ranges):
+        self.size = size
+        self.lock = threading.Lock()
+        self.pending = len(ranges)
+        self.progress = {start: 0 for start, end in ranges}
+        self.task_id = None
+        self.prepared = False
+        self.source_stat = None  # [size, mtime] of the source when the first range started
+        self.skip = None  # destination [size, mtime] if the journal says it's already done
+        self.failed = False
+
+    def start(self, tracker, rel_path):
+        with self.lock:
+            if self.task_id is None:
+                self.task_id = tracker.start_file(rel_path, self.size)
+            return self.task_id
+
+    def callback(self, tracker, start):
+        def update(transferred, total):
+            with self.lock:
+                self.progress[start] = transferred
+                tracker.update(sum(self.progress.values()), self.size, self.task_id)
+        return update
+
+    def finish(self, success):
+        """Record one range ending. Returns the file's result once every range has, else None."""
+        with self.lock:
+            self.pending -= 1
+            self.failed = self.failed or not success
+            if self.pending:
+                return None
+            return not self.failed
+
+
+class SFTPTransferPool:
+    """Runs queued file transfers across several SFTP connections at once.
+
+    Each worker thread opens its own SSH connection and pulls jobs from a shared
+    queue, so the link stays busy instead of idling on one channel's round trips.
+    A worker whose connection drops reconnects and retries the file (up to
+    SFTP_RETRIES attempts). Leaving the `with` block waits for every queued
+    transfer to finish; `failed` then holds the destination path of every file
+    that could not be transferred, and `uploaded` the size and mtime the server
+    reported for each uploaded file.
+
+    Region jobs (put_region/get_region) patch only the changed chunks of an
+    existing .mca file and fall back to a full copy when that isn't possible;
+    `region_results` holds the new chunk baseline for each patched file.
+    Block jobs (put_blocks) do the same for large files against their block
+    hashes, leaving the new hashes in `block_results`. put_member() copies a
+    file straight out of a zip on the server (see read_remote_zip_member).
+
+    Files of RESUME_MIN_SIZE or more are copied in chunks with checkpoints in
+    `journal` (a TransferJournal), so a retry after a dropped connection
+    continues from the last confirmed offset rather than from zero, and a retry
+    that made progress doesn't use up an attempt. Files the journal records as
+    finished, whose destination still matches, are skipped.
+
+    Files of RANGE_SPLIT_MIN_SIZE or more are split into byte ranges (one per
+    worker, at least RANGE_SPLIT_PART_SIZE each) that are written in place over
+    separate connections at the same time. Once every range is in, the file is
+    checked for its full size and a source that didn't change meanwhile.
+
+    Usage:
+        with SFTPTransferPool(tracker) as pool:
+            pool.put(local_path, remote_path, rel_path, size)
+            pool.get(remote_path, local_path, rel_path, size)
+    """
+    def __init__(self, tracker, workers=None, retries=None, journal=None):
+        self.tracker = tracker
+        self.journal = journal if journal is not None else TransferJournal()
+        self.workers = max(1, workers or SFTP_WORKERS)
+        self.retries = max(1, retries or SFTP_RETRIES)
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.connected = 0
+        self.failed = set()
+        self.uploaded = {}  # remote path -> [size, mtime] reported after upload
+        self.region_results = {}  # destination path -> region baseline after patching
+        self.block_results = {}  # destination path -> block hashes after patching
+        self.local = threading.local()
+
+    def __enter__(self):
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+
+        # Anything left over had no live worker to run it
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                direction, source, dest, rel_path, size, mtime, extra = job
+                self._finish(None, job, self._start(job), False)
+                console.print(f"[red]Error {direction}ing {rel_path}: no SFTP connection available[/red]")
+
+    def put(self, local_path, remote_path, rel_path, size):
+        """Queue a file upload. The remote parent directory must already exist."""
+        self._queue(("upload", local_path, remote_path, rel_path, size, None, None))
+
+    def get(self, remote_path, local_path, rel_path, size, mtime=None):
+        """Queue a file download. The local parent directory must already exist.
+
+        If `mtime` is given, the local copy's modification time is set to it
+        once the download finishes.
+        """
+        self._queue(("download", remote_path, local_path, rel_path, size, mtime, None))
+
+    def put_region(self, local_path, remote_path, rel_path, size, baseline=None):
+        """Queue a chunk-level upload of a .mca region file (see patch_remote_region)."""
+        self.jobs.put(("upload", local_path, remote_path, rel_path, size, None, {'baseline': baseline}))
+
+    def get_region(self, remote_path, local_path, rel_path, size, mtime=None, baseline=None):
+        """Queue a chunk-level download of a .mca region file (see patch_local_region)."""
+        self.jobs.put(("download", remote_path, local_path, rel_path, size, mtime, {'baseline': baseline}))
+
+    def put_blocks(self, local_path, remote_path, rel_path, size, hashes, remote_stat=None):
+        """Queue a block-level upload of a large file (see patch_remote_blocks)."""
+        self.jobs.put(("upload", local_path, remote_path, rel_path, size, None,
+                       {'blocks': hashes, 'remote': remote_stat}))
+
+    def put_member(self, zip_path, member, remote_path, rel_path):
+        """Queue a copy of one member (a ZipInfo) of a remote zip, streamed without extracting it"""
+        self.jobs.put(("upload", (zip_path, member), remote_path, rel_path, member.file_size, None, None))
+
+    def _queue(self, job):
+        # Large files go out as one job per byte range, next to each other in
+        # the queue so idle workers pick them up together
+        direction, source, dest, rel_path, size, mtime, extra = job
+        parts = min(self.workers, size // RANGE_SPLIT_PART_SIZE) if size >= RANGE_SPLIT_MIN_SIZE else 1
+        if parts < 2:
+            self.jobs.put(job)
+            return
+
+        bounds = [size * i // parts for i in range(parts + 1)]
+        ranges = list(zip(bounds, bounds[1:]))
+        split = SplitTransfer(size, ranges)
+        for start, end in ranges:
+            self.jobs.put((direction, source, dest, rel_path, size, mtime,
+                           {'split': split, 'start': start, 'end': end}))
+
+    def _open_zip(self, sftp, zip_path):
+        # Each worker reads remote zips over a second channel of its own connection
+        # (reopened after a reconnect): read-ahead replies queued on the channel the
+        # members are written to would stall the writes
+        reader = self.local.__dict__.get('zip_reader')
+        if reader is None or reader[0] is not sftp:
+            reader = self.local.zip_reader = (sftp, paramiko.SFTPClient.from_transport(
+                sftp.get_channel().get_transport()), {})
+        _, zip_sftp, zips = reader
+        if zip_path not in zips:
+            zips[zip_path] = zip_sftp.open(zip_path, "rb")
+        return zips[zip_path]
+
+    def _connect(self):
+        try:
+            return get_sftp_connection()
+        except Exception as e:
+            console.print(f"[yellow]Transfer worker could not connect: {e}[/yellow]")
+            return None, None
+
+    def _start(self, job):
+        """Start (or join, for a range) the tracker task for a job"""
+        direction, source, dest, rel_path, size, mtime, extra = job
+        if extra and 'split' in extra:
+            return extra['split'].start(self.tracker, rel_path)
+        return self.tracker.start_file(rel_path, size)
+
+    def _finish(self, sftp, job, task_id, success):
+        """Complete a job's tracker task; a range only completes its file once every range has finished"""
+        direction, source, dest, rel_path, size, mtime, extra = job
+        split = extra.get('split') if extra else None
+        if split is not None:
+            success = split.finish(success)
+            if success is None:
+                return
+            if success and split.skip is None:
                 try:
-                    file_size = os.path.getsize(local_item)
-                    rel_path = os.path.relpath(local_item, base_path)
-                    tracker.start_file(rel_path, file_size)
-                    sftp.put(local_item, remote_item, callback=progress_callback(tracker))
-                    tracker.file_complete(success=True)
+                    self._verify_split(sftp, job, split)
                 except Exception as e:
-                    tracker.file_complete(success=False)
-                    console.print(f"[red]Error uploading {item}: {e}[/red]")
-    except OSError as e:
-        console.print(f"[red]Error accessing {local_path}: {e}[/red]")
+                    console.print(f"[red]Error {direction}ing {rel_path}: {e}[/red]")
+                    success = False
+        if not success:
+            self.failed.add(dest)
+        self.tracker.file_complete(success=success, task_id=task_id)
+
+    def _transfer(self, sftp, job, callback):
+        direction, source, dest, rel_path, size, mtime, extra = job
+
+        if extra and 'split' in extra:
+            self._transfer_range(sftp, job, callback)
+            return
+
+        if extra and 'baseline' in extra:
+            try:
+                if direction == "upload":
+                    self.region_results[dest] = patch_remote_region(sftp, source, dest, extra['baseline'], callback)
+                    attrs = sftp.stat(dest)
+                    self.uploaded[dest] = [attrs.st_size, attrs.st_mtime]
+                else:
+                    self.region_results[dest] = patch_local_region(sftp, source, dest, extra['baseline'], callback)
+                    if mtime is not None:
+                        os.utime(dest, (mtime, mtime))
+                return
+            except RegionPatchError:
+                self.region_results.pop(dest, None)  # Fall through to a full copy
+
+        if extra and 'blocks' in extra:
+            try:
+                self.block_results[dest] = patch_remote_blocks(sftp, source, dest, extra['blocks'], callback,
+                                                               extra.get('remote'))
+                attrs = sftp.stat(dest)
+                self.uploaded[dest] = [attrs.st_size, attrs.st_mtime]
+                return
+            except BlockPatchError:
+                self.block_results.pop(dest, None)  # Fall through to a full copy
+
+        if direction == "upload" and isinstance(source, tuple):
+            zip_path, member = source
+            transferred = 0
+            with sftp.open(dest, "wb") as dst:
+                dst.set_pipelined(True)
+                for chunk in read_remote_zip_member(self._open_zip(sftp, zip_path), member):
+                    dst.write(chunk)
+                    transferred += len(chunk)
+                    callback(transferred, size)
+            attrs = sftp.stat(dest)
+            self.uploaded[dest] = [attrs.st_size, attrs.st_mtime]
+            return
+
+        key = f"{direction}:{dest}"
+        source_size, source_mtime = self._source_id(direction, source, size, mtime)
+
+        finished = self.journal.finished(key, source_size, source_mtime)
+        if finished is not None and self._dest_stat(sftp, direction, dest) == finished:
+            callback(source_size, source_size)
+            if direction == "upload":
+                self.uploaded[dest] = finished
+            return
+
+        # Only files big enough to resume are journalled, so small files cost
+        # no extra round trip or journal line
+        resumable = source_size >= RESUME_MIN_SIZE
+        if direction == "upload":
+            if resumable:
+                self._put_span(sftp, source, dest, key, source_size, source_mtime, 0, source_size, callback, create=True)
+                attrs = sftp.stat(dest)
+            else:
+                attrs = sftp.put(source, dest, callback=callback)
+            self.uploaded[dest] = [attrs.st_size, attrs.st_mtime]
+            dest_stat = [attrs.st_size, int(attrs.st_mtime)]
+        else:
+            if resumable:
+                self._get_span(sftp, source, dest, key, source_size, source_mtime, 0, source_size, callback, create=True)
+            else:
+                sftp.get(source, dest, callback=callback,
+                         max_concurrent_prefetch_requests=TRANSPORT_PROFILE['prefetch'])
+            if mtime is not None:
+                os.utime(dest, (mtime, mtime))
+            dest_stat = self._dest_stat(sftp, direction, dest) if resumable else None
+        if resumable:
+            self.journal.done(key, source_size, source_mtime, dest_stat)
+
+    def _transfer_range(self, sftp, job, callback):
+        direction, source, dest, rel_path, size, mtime, extra = job
+        split, start, end = extra['split'], extra['start'], extra['end']
+        key = f"{direction}:{dest}"
+        source_size, source_mtime = self._source_id(direction, source, size, mtime)
+
+        with split.lock:
+            if split.failed:
+                raise IOError("another part of this file failed")
+            if not split.prepared:
+                split.source_stat = self._source_stat(sftp, direction, source)
+                finished = self.journal.finished(key, source_size, source_mtime)
+                dest_stat = self._dest_stat(sftp, direction, dest)
+                if finished is not None and dest_stat == finished:
+                    split.skip = finished
+                elif dest_stat is None or not any(self.journal.offset(f"{key}@{part}", source_size, source_mtime)
+                                                  for part in split.progress):
+                    # Nothing to resume: create the destination so every range can write in place
+                    if direction == "upload":
+                        sftp.open(dest, "wb").close()
+                    else:
+                        with open(dest, "wb") as f:
+                            f.truncate(size)
+                split.prepared = True
+
+        if split.skip is not None:
+            callback(end - start, end - start)
+            if direction == "upload":
+                self.uploaded[dest] = split.skip
+            return
+
+        if direction == "upload":
+            self._put_span(sftp, source, dest, f"{key}@{start}", source_size, source_mtime, start, end, callback)
+        else:
+            self._get_span(sftp, source, dest, f"{key}@{start}", source_size, source_mtime, start, end, callback)
+
+    def _verify_split(self, sftp, job, split):
+        """Check a file moved in ranges came out whole, from a source that held still"""
+        direction, source, dest, rel_path, size, mtime, extra = job
+        if self._source_stat(sftp, direction, source) != split.source_stat:
+            raise IOError("source changed while it was being transferred")
+        if direction == "download" and mtime is not None:
+            os.utime(dest, (mtime, mtime))
+        dest_stat = self._dest_stat(sftp, direction, dest)
+        if dest_stat is None or dest_stat[0] != size:
+            raise IOError(f"expected {size} bytes, destination has {dest_stat[0] if dest_stat else 0}")
+        if direction == "upload":
+            self.uploaded[dest] = dest_stat
+        source_size, source_mtime = self._source_id(direction, source, size, mtime)
+        self.journal.done(f"{direction}:{dest}", source_size, source_mtime, dest_stat)
+
+    def _source_id(self, direction, source, size, mtime):
+        """(size, mtime) of the source version that journal entries are kept against"""
+        if direction == "upload":
+            stat = os.stat(source)
+            return stat.st_size, int(stat.st_mtime)
+        return size, (int(mtime) if mtime is not None else None)
+
+    def _source_stat(self, sftp, direction, source):
+        stat = os.stat(source) if direction == "upload" else sftp.stat(source)
+        return [stat.st_size, int(stat.st_mtime)]
+
+    def _dest_stat(self, sftp, direction, dest):
+        """[size, mtime] of a transfer's destination, or None if it doesn't exist"""
+        try:
+            stat = sftp.stat(dest) if direction == "upload" else os.stat(dest)
+        except (IOError, OSError):
+            return None
+        return [stat.st_size, int(stat.st_mtime)]
+
+    def _resume_offset(self, sftp, direction, source, dest, key, size, mtime, start=0):
+        """Where to continue `key` from: its checkpoint, if the bytes just before
+        it match on both sides (so a torn write isn't built on), else `start`
+        """
+        offset = self.journal.offset(key, size, mtime)
+        if offset <= start:
+            return start
+        local_path, remote_path = (source, dest) if direction == "upload" else (dest, source)
+        verify_from = max(start, offset - RESUME_VERIFY_BYTES)
+        try:
+            with open(local_path, 'rb') as f:
+                f.seek(verify_from)
+                local_tail = f.read(offset - verify_from)
+            with sftp.open(remote_path, 'rb') as f:
+                f.seek(verify_from)
+                remote_tail = f.read(offset - verify_from)
+        except (IOError, OSError):
+            return start
+        if len(local_tail) != offset - verify_from or local_tail != remote_tail:
+            return start
+        return offset
+
+    def _put_span(self, sftp, source, dest, key, size, mtime, start, end, callback, create=False):
+        """Upload bytes [start, end) of a file in place, checkpointing to the journal.
+
+        With `create`, a transfer with nothing to resume truncates the
+        destination first; otherwise it must already exist.
+        """
+        offset = self._resume_offset(sftp, "upload", source, dest, key, size, mtime, start)
+        mode = "wb" if create and offset == start else "r+b"
+
+        with open(source, 'rb') as src, sftp.open(dest, mode) as dst:
+            dst.set_pipelined(True)
+            src.seek(offset)
+            dst.seek(offset)
+            position = checkpoint = offset
+            callback(position - start, end - start)
+            while position < end:
+                chunk = src.read(min(32768, end - position))
+                if not chunk:
+                    break
+                # A non-pipelined write waits for every outstanding write to be
+                # acknowledged, so everything before it is known to be on disk
+                confirm = position + len(chunk) - checkpoint >= RESUME_CHECKPOINT_BYTES or position + len(chunk) >= end
+                if confirm:
+                    dst.set_pipelined(False)
+                dst.write(chunk)
+                position += len(chunk)
+                if confirm:
+                    dst.set_pipelined(True)
+                    checkpoint = position
+                    self.journal.checkpoint(key, size, mtime, checkpoint)
+                callback(position - start, end - start)
+        if position != end:
+            raise IOError(f"Sent {position - start} of {end - start} bytes")
+
+    def _get_span(self, sftp, source, dest, key, size, mtime, start, end, callback, create=False):
+        """Download bytes [start, end) of a file in place, checkpointing to the journal.
+
+        With `create`, the local file is (re)written from the resume point and
+        cut off there first; otherwise it must already exist.
+        """
+        offset = self._resume_offset(sftp, "download", source, dest, key, size, mtime, start)
+        mode = "wb" if create and offset == start else "r+b"
+
+        with sftp.open(source, 'rb') as src, open(dest, mode) as dst:
+            src.seek(offset)
+            dst.seek(offset)
+            if create:
+                dst.truncate()
+            src.prefetch(end, TRANSPORT_PROFILE['prefetch'])
+            position = checkpoint = offset
+            callback(position - start, end - start)
+            while position < end:
+                chunk = src.read(min(1024 * 1024, end - position))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                position += len(chunk)
+                if position - checkpoint >= RESUME_CHECKPOINT_BYTES or position >= end:
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                    checkpoint = position
+                    self.journal.checkpoint(key, size, mtime, checkpoint)
+                callback(position - start, end - start)
+        if position != end:
+            raise IOError(f"Received {position - start} of {end - start} bytes")
+
+    def _worker(self):
+        ssh, sftp = self._connect()
+        if not sftp:
+            return
+
+        with self.lock:
+            self.connected += 1
+
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+
+                direction, source, dest, rel_path, size, mtime, extra = job
+                task_id = self._start(job)
+                key = f"{direction}:{dest}"
+                if extra and 'split' in extra:
+                    callback = extra['split'].callback(self.tracker, extra['start'])
+                    key = f"{key}@{extra['start']}"
+                else:
+                    callback = progress_callback(self.tracker, task_id)
+
+                attempt = 1
+                while True:
+                    resumed_from = self.journal.progress(key)
+                    try:
+                        self._transfer(sftp, job, callback)
+                        self._finish(sftp, job, task_id, True)
+                        break
+                    except Exception as e:
+                        # Plain file errors (missing, permission) won't fix themselves
+                        transport = ssh.get_transport()
+                        connection_lost = transport is None or not transport.is_active()
+                        retryable = connection_lost or isinstance(e, (paramiko.SSHException, EOFError, socket.timeout))
+                        resume_at = self.journal.progress(key)
+                        if resume_at > resumed_from:
+                            attempt = 1  # It got further this time, so it gets its retries back
+                        if not retryable or attempt == self.retries:
+                            console.print(f"[red]Error {direction}ing {rel_path}: {e}[/red]")
+                            self._finish(sftp, job, task_id, False)
+                            break
+
+                        resuming = f" from {format_size(resume_at)}" if resume_at else ""
+                        console.print(f"[yellow]Retrying {rel_path}{resuming} (attempt {attempt + 1}/{self.retries}): {e}[/yellow]")
+                        time.sleep(2 ** attempt)
+                        attempt += 1
+                        if connection_lost:
+                            ssh.close()
+                            ssh, sftp = self._connect()
+                            if not sftp:
+                                console.print(f"[red]Error {direction}ing {rel_path}: reconnect failed[/red]")
+                                self._finish(None, job, task_id, False)
+                                return
+        finally:
+            reader = self.local.__dict__.get('zip_reader')
+            if reader is not None:
+                try:
+                    reader[1].close()
+                except Exception:
+                    pass  # Its connection may already be gone
+            if sftp:
+                release_sftp_connection(ssh, sftp)
 
 
 # =============================================================================
 # Pterodactyl Server Control
 # =============================================================================
 
-def pterodactyl_request(endpoint, method="GET", data=None):
-    """Make a request to the Pterodactyl API"""
-    if not PTERODACTYL_SERVER_ID or not PTERODACTYL_API_KEY:
-        console.print("[red]Error: Pterodactyl API credentials not configured![/red]")
-        return None
+class PterodactylError(Exception):
+    """An error response from the Pterodactyl API"""
+    def __init__(self, status, reason, body=""):
+        super().__init__(f"API Error {status}: {reason}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class PterodactylClient:
+    """Client for the Pterodactyl client API over persistent HTTP(S) connections.
+
+    Each thread keeps one keep-alive connection, so status polls and file
+    calls don't pay for a new TCP and TLS handshake every time; a connection
+    the server has closed in the meantime is reopened before sending. A
+    request is only resent when it never went out, or when it is a GET:
+    a POST whose response was lost may already have run on the panel.
+    Methods raise PterodactylError for error responses and OSError for
+    network failures.
+    """
+    def __init__(self, api_url, api_key, server_id, timeout=30):
+        parsed = urllib.parse.urlsplit(api_url)
+        self.https = parsed.scheme == "https"
+        self.host = parsed.netloc
+        self.base_path = f"{parsed.path.rstrip('/')}/api/client/servers/{server_id}"
+        self.timeout = timeout
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "User-Agent": "TBA-Server-Config"
+        }
+        self.local = threading.local()
+
+    def _connection(self, timeout):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self.local.conn = conn_class(self.host, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            # An idle keep-alive socket only turns readable when the server closed it
+            if select.select([conn.sock], [], [], 0)[0]:
+                conn.close()
+            else:
+                conn.sock.settimeout(timeout)
+        return conn
 
-    url = f"{PTERODACTYL_API_URL}/api/client/servers/{PTERODACTYL_SERVER_ID}{endpoint}"
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
 
-    headers = {
-        "Authorization": f"Bearer {PTERODACTYL_API_KEY}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "User-Agent": "TBA-Server-Config"
-    }
+    def request(self, endpoint, method="GET", data=None, timeout=None):
+        """Send a request and return the decoded JSON body ({"success": True} if empty)"""
+        body = json.dumps(data).encode('utf-8') if data else None
 
-    try:
-        if data:
-            data_bytes = json.dumps(data).encode('utf-8')
-            req = urllib.request.Request(url, data=data_bytes, headers=headers, method=method)
-        else:
-            req = urllib.request.Request(url, headers=headers, method=method)
-
-        with urllib.request.urlopen(req, timeout=30) as response:
-            if response.status == 204:
-                return {"success": True}
-            return json.loads(response.read().decode('utf-8'))
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8') if e.fp else ""
-        console.print(f"[red]API Error {e.code}: {e.reason}[/red]")
-        if error_body:
-            console.print(f"[dim]{error_body}[/dim]")
-        return None
-    except urllib.error.URLError as e:
-        console.print(f"[red]Connection Error: {e.reason}[/red]")
-        return None
-    except Exception as e:
-        console.print(f"[red]Error: {e}[/red]")
-        return None
+        for attempt in (1, 2):
+            conn = self._connection(timeout or self.timeout)
+            try:
+                conn.request(method, self.base_path + endpoint, body=body, headers=self.headers)
+            except (http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+                # The server dropped the connection before it got the request
+                self.close()
+                if attempt == 2:
+                    raise
+                continue
+            except Exception:
+                self.close()
+                raise
+            try:
+                response = conn.getresponse()
+                payload = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                # The request went out, so only a GET is safe to send again
+                self.close()
+                if method != "GET" or attempt == 2:
+                    raise
+            except Exception:
+                self.close()
+                raise
 
+        if response.status >= 400:
+            raise PterodactylError(response.status, response.reason, payload.decode('utf-8', 'replace'))
+        if response.status == 204 or not payload:
+            return {"success": True}
+        return json.loads(payload.decode('utf-8'))
 
-def get_server_status():
-    """Get current server status"""
-    result = pterodactyl_request("/resources")
-    if result and "attributes" in result:
-        return result["attributes"]["current_state"]
-    return None
+    def resources(self):
+        """Current state and resource usage (the "attributes" of /resources)"""
+        return self.request("/resources")["attributes"]
 
+    def power(self, signal):
+        """Send a power signal: start, stop, restart or kill"""
+        self.request("/power", method="POST", data={"signal": signal})
 
-def send_power_action(action):
-    """Send a power action (start, stop, restart, kill)"""
-    result = pterodactyl_request("/power", method="POST", data={"signal": action})
-    return result is not None
+    def command(self, command):
+        """Run a command on the server console"""
+        self.request("/command", method="POST", data={"command": command})
 
+    def list_files(self, directory="/"):
+        """List a directory; returns the "attributes" of each entry"""
+        result = self.request(f"/files/list?directory={urllib.parse.quote(directory)}")
+        return [item["attributes"] for item in result.get("data", [])]
 
-def server_start():
-    """Start the server"""
-    console.print("[cyan]Starting server...[/cyan]")
-    if send_power_action("start"):
-        console.print("[green]✓ Start signal sent[/green]")
-        return True
+    def delete_files(self, root, files, timeout=300):
+        """Delete files or whole folders (names relative to `root`)"""
+        self.request("/files/delete", method="POST", data={"root": root, "files": files}, timeout=timeout)
+
+    def rename_files(self, root, renames):
+        """Rename/move files; `renames` is a list of {"from": ..., "to": ...} relative to `root`"""
+        self.request("/files/rename", method="PUT", data={"root": root, "files": renames})
+
+    def compress_files(self, root, files, timeout=900):
+        """Compress files into one archive in `root`; returns the archive's attributes"""
+        return self.request("/files/compress", method="POST", data={"root": root, "files": files},
+                            timeout=timeout)["attributes"]
+
+    def websocket(self):
+        """Console websocket credentials: {"token": ..., "socket": "wss://..."}"""
+        return self.request("/websocket")["data"]
+
+    def decompress_file(self, root, file, timeout=900):
+        """Unpack an archive (path relative to `root`) into `root`"""
+        self.request("/files/decompress", method="POST", data={"root": root, "file": file}, timeout=timeout)
+
+
+pterodactyl = PterodactylClient(PTERODACTYL_API_URL, PTERODACTYL_API_KEY, PTERODACTYL_SERVER_ID)
+
+
+def pterodactyl_call(method, *args, **kwargs):
+    """Call a PterodactylClient method, printing any error.
+
+    Returns the method's result ({"success": True} if it has none), or None
+    if the API is not configured or the call failed.
+    """
+    if not PTERODACTYL_SERVER_ID or not PTERODACTYL_API_KEY:
+        console.print("[red]Error: Pterodactyl API credentials not configured![/red]")
+        return None
+
+    try:
+        result = method(*args, **kwargs)
+        return {"success": True} if result is None else result
+    except PterodactylError as e:
+        console.print(f"[red]API Error {e.status}: {e.reason}[/red]")
+        if e.body:
+            console.print(f"[dim]{e.body}[/dim]")
+        return None
+    except OSError as e:
+        console.print(f"[red]Connection Error: {e}[/red]")
+        return None
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return None
+
+
+def pterodactyl_request(endpoint, method="GET", data=None, timeout=30):
+    """Make a request to the Pterodactyl API"""
+    return pterodactyl_call(pterodactyl.request, endpoint, method, data, timeout)
+
+
+def get_server_status():
+    """Get current server status"""
+    resources = pterodactyl_call(pterodactyl.resources)
+    if resources:
+        return resources["current_state"]
+    return None
+
+
+def send_power_action(action):
+    """Send a power action (start, stop, restart, kill)"""
+    return pterodactyl_call(pterodactyl.power, action) is not None
+
+
+# =============================================================================
+# Console Websocket
+# =============================================================================
+
+class WebSocket:
+    """Minimal RFC 6455 websocket client (text messages) for ws:// and wss:// URLs.
+
+    recv() answers pings itself and returns None once the connection closes.
+    send() may be called from another thread while one thread reads.
+    """
+    GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    def __init__(self, url, headers=None, timeout=10):
+        parsed = urllib.parse.urlsplit(url)
+        secure = parsed.scheme == "wss"
+        host = parsed.hostname
+        ws_port = parsed.port or (443 if secure else 80)
+
+        sock = socket.create_connection((host, ws_port), timeout=timeout)
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        self.sock = sock
+        self.buffer = b""
+        self.send_lock = threading.Lock()
+
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        request = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {parsed.netloc}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13",
+        ]
+        request += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        sock.sendall(("\r\n".join(request) + "\r\n\r\n").encode())
+
+        while b"\r\n\r\n" not in self.buffer:
+            data = sock.recv(4096)
+            if not data:
+                raise ConnectionError("Websocket handshake failed: connection closed")
+            self.buffer += data
+        head, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+        lines = head.decode("latin-1").split("\r\n")
+        if len(lines[0].split()) < 2 or lines[0].split()[1] != "101":
+            raise ConnectionError(f"Websocket handshake failed: {lines[0]}")
+        response_headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        expected = base64.b64encode(hashlib.sha1((key + self.GUID).encode()).digest()).decode()
+        if response_headers.get("sec-websocket-accept") != expected:
+            raise ConnectionError("Websocket handshake failed: bad Sec-WebSocket-Accept")
+
+        sock.settimeout(None)
+
+    def _read_exact(self, n):
+        while len(self.buffer) < n:
+            data = self.sock.recv(max(4096, n - len(self.buffer)))
+            if not data:
+                raise ConnectionError("Websocket closed")
+            self.buffer += data
+        data, self.buffer = self.buffer[:n], self.buffer[n:]
+        return data
+
+    def _send_frame(self, opcode, payload):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 65536:
+            header += bytes([0x80 | 126]) + struct.pack(">H", length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack(">Q", length)
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        with self.send_lock:
+            self.sock.sendall(header + mask + masked)
+
+    def send(self, text):
+        self._send_frame(0x1, text.encode("utf-8"))
+
+    def recv(self):
+        """Return the next text message, or None once the connection is closed"""
+        message = b""
+        try:
+            while True:
+                b0, b1 = self._read_exact(2)
+                fin, opcode = b0 & 0x80, b0 & 0x0F
+                length = b1 & 0x7F
+                if length == 126:
+                    length = struct.unpack(">H", self._read_exact(2))[0]
+                elif length == 127:
+                    length = struct.unpack(">Q", self._read_exact(8))[0]
+                mask = self._read_exact(4) if b1 & 0x80 else None
+                payload = self._read_exact(length)
+                if mask:
+                    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+                if opcode == 0x8:  # Close
+                    try:
+                        self._send_frame(0x8, payload[:2])
+                    except OSError:
+                        pass
+                    return None
+                if opcode == 0x9:  # Ping
+                    self._send_frame(0xA, payload)
+                    continue
+                if opcode == 0xA:  # Pong
+                    continue
+
+                message += payload
+                if fin:
+                    return message.decode("utf-8", "replace")
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        try:
+            self._send_frame(0x8, struct.pack(">H", 1000))
+        except OSError:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+# While waiting on the console websocket, /resources is checked this often (in
+# seconds) in case the socket died without closing and the change was missed
+SERVER_EVENTS_CHECK_INTERVAL = 15
+
+
+class ServerEvents:
+    """Live server state and console output from the Pterodactyl console websocket.
+
+    Subscribe before triggering a power action so no event is missed:
+
+        with ServerEvents() as events:
+            server_stop()
+            events.wait_for_state("offline", timeout=60)
+
+    The auth token is renewed when Wings says it is about to expire. If the
+    socket drops or Wings reports an error, `failed` is set, waits return
+    early and callers fall back to polling.
+    """
+    def __init__(self, client=None):
+        self.client = client or pterodactyl
+        self.ws = None
+        self.state = None
+        self.lines = []  # Console lines (ANSI codes stripped) since subscribing
+        self.authenticated = False
+        self.closed = False
+        self.error = None
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def connect(self, timeout=10):
+        credentials = self.client.websocket()
+        self.ws = WebSocket(credentials["socket"], headers={"Origin": PTERODACTYL_API_URL}, timeout=timeout)
+        self.ws.send(json.dumps({"event": "auth", "args": [credentials["token"]]}))
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+        self.thread.start()
+
+        with self.cond:
+            self.cond.wait_for(lambda: self.authenticated or self.closed or self.error, timeout)
+            if not self.authenticated:
+                error = self.error or "no response"
+        if not self.authenticated:
+            self.close()
+            raise ConnectionError(f"Console websocket auth failed: {error}")
+
+    def close(self):
+        if self.ws:
+            self.ws.close()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    @property
+    def failed(self):
+        """True once the socket closed or Wings reported an error; no more events will come"""
+        return self.closed or self.error is not None
+
+    def _reader(self):
+        while True:
+            message = self.ws.recv()
+            if message is None:
+                with self.cond:
+                    self.closed = True
+                    self.cond.notify_all()
+                return
+
+            try:
+                event = json.loads(message)
+            except ValueError:
+                continue
+            name = event.get("event")
+            args = event.get("args") or []
+
+            if name == "token expiring":
+                try:
+                    self.ws.send(json.dumps({"event": "auth", "args": [self.client.websocket()["token"]]}))
+                except Exception:
+                    pass  # Wings closes the socket when it expires; waits then fall back
+                continue
+
+            with self.cond:
+                if name == "auth success":
+                    self.authenticated = True
+                elif name == "status" and args:
+                    self.state = args[0]
+                elif name == "console output":
+                    self.lines.extend(ANSI_ESCAPE.sub("", line) for line in args)
+                elif name in ("jwt error", "token expired", "daemon error"):
+                    self.error = args[0] if args else name
+                self.cond.notify_all()
+
+    def wait_for_state(self, states, timeout):
+        """Wait until the server reports one of `states`; returns False on timeout or disconnect"""
+        states = {states} if isinstance(states, str) else set(states)
+        with self.cond:
+            self.cond.wait_for(lambda: self.state in states or self.failed, timeout)
+            return self.state in states
+
+    def wait_for_console(self, pattern, timeout, start=0):
+        """Wait for a console line matching `pattern` (from line index `start`); returns it or None"""
+        regex = re.compile(pattern)
+        deadline = time.time() + timeout
+        checked = start
+        with self.cond:
+            while True:
+                for line in self.lines[checked:]:
+                    if regex.search(line):
+                        return line
+                checked = len(self.lines)
+                remaining = deadline - time.time()
+                if self.failed or remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
+
+
+def open_server_events():
+    """Subscribe to the console websocket, or return None (callers then poll)"""
+    if not PTERODACTYL_SERVER_ID or not PTERODACTYL_API_KEY:
+        return None
+    try:
+        return ServerEvents().__enter__()
+    except Exception as e:
+        console.print(f"[dim]Console websocket unavailable ({e}), polling instead[/dim]")
+        return None
+
+
+def wait_for_server_state(states, timeout=60, events=None):
+    """Wait until the server reports one of `states`.
+
+    With `events` this returns the moment Wings reports the change, checking
+    /resources every SERVER_EVENTS_CHECK_INTERVAL seconds in case the socket
+    died silently. Without it, or once the socket fails, /resources is polled
+    every 2 seconds for the rest of the timeout.
+    """
+    states = {states} if isinstance(states, str) else set(states)
+    deadline = time.time() + timeout
+    if events is not None:
+        while not events.failed and time.time() < deadline:
+            if events.wait_for_state(states, min(deadline - time.time(), SERVER_EVENTS_CHECK_INTERVAL)):
+                return True
+            if not events.failed and get_server_status() in states:
+                return True
+        if events.failed:
+            console.print("[dim]Console websocket dropped, polling instead[/dim]")
+    while time.time() < deadline:
+        if get_server_status() in states:
+            return True
+        time.sleep(2)
+    return get_server_status() in states
+
+
+def stop_server_and_wait(timeout=60):
+    """Stop the server and wait until it is offline, killing it if it won't stop"""
+    events = open_server_events()
+    try:
+        if not server_stop():
+            return False
+        console.print("[cyan]Waiting for server to stop...[/cyan]")
+        if wait_for_server_state("offline", timeout, events):
+            console.print("[green]✓ Server stopped[/green]")
+            return True
+
+        console.print("[yellow]Server didn't stop gracefully, sending kill signal...[/yellow]")
+        send_power_action("kill")
+        if wait_for_server_state("offline", 20, events):
+            console.print("[green]✓ Server stopped[/green]")
+            return True
+        return False
+    finally:
+        if events:
+            events.close()
+
+
+def start_server_and_wait(timeout=300):
+    """Start the server and wait until it has finished loading ("Done (...)!" or running)"""
+    events = open_server_events()
+    try:
+        if not server_start():
+            return False
+        console.print("[cyan]Waiting for server to finish starting...[/cyan]")
+        deadline = time.time() + timeout
+        if events is not None:
+            # Wings reports "running" once it has seen the same line, so a
+            # /resources check covers a socket that died silently
+            while not events.failed and time.time() < deadline:
+                line = events.wait_for_console(r"Done \([0-9.,]+s\)!",
+                                               min(deadline - time.time(), SERVER_EVENTS_CHECK_INTERVAL))
+                if line:
+                    console.print(f"[green]✓ Server is up[/green] [dim]{line.strip()}[/dim]")
+                    return True
+                if not events.failed and get_server_status() == "running":
+                    console.print("[green]✓ Server is up[/green]")
+                    return True
+            if not events.failed:
+                console.print("[yellow]Server has not finished starting yet[/yellow]")
+                return False
+            console.print("[dim]Console websocket dropped, polling instead[/dim]")
+        if wait_for_server_state("running", max(deadline - time.time(), 0), None):
+            console.print("[green]✓ Server is up[/green]")
+            return True
+        console.print("[yellow]Server has not finished starting yet[/yellow]")
+        return False
+    finally:
+        if events:
+            events.close()
+
+
+def server_start():
+    """Start the server"""
+    console.print("[cyan]Starting server...[/cyan]")
+    if send_power_action("start"):
+        console.print("[green]✓ Start signal sent[/green]")
+        return True
     return False
 
 
@@ -519,27 +2056,15 @@ def server_status():
 
 def send_console_command(command):
     """Send a command to the server console"""
-    url = f"{PTERODACTYL_API_URL}/api/client/servers/{PTERODACTYL_SERVER_ID}/command"
-
-    headers = {
-        "Authorization": f"Bearer {PTERODACTYL_API_KEY}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "User-Agent": "TBA-Server-Config"
-    }
-
     try:
-        data_bytes = json.dumps({"command": command}).encode('utf-8')
-        req = urllib.request.Request(url, data=data_bytes, headers=headers, method="POST")
-
-        with urllib.request.urlopen(req, timeout=30) as response:
-            return True
+        pterodactyl.command(command)
+        return True
 
-    except urllib.error.HTTPError as e:
-        if e.code == 502:
+    except PterodactylError as e:
+        if e.status == 502:
             console.print("[yellow]Server may still be starting (502 error)[/yellow]")
         else:
-            console.print(f"[red]API Error {e.code}: {e.reason}[/red]")
+            console.print(f"[red]API Error {e.status}: {e.reason}[/red]")
         return False
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -596,20 +2121,12 @@ BIOME_PRESETS = {
 
 
 def delete_world_folders():
-    """Delete world folders on the server via SFTP"""
+    """Delete world folders on the server"""
     if not check_credentials():
         return False
 
-    console.print(f"[cyan]Connecting to {hostname}:{port}...[/cyan]")
-
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        console.print("[green]Connected![/green]")
-
-        sftp = ssh.open_sftp()
+        ssh, sftp = get_sftp_connection(announce=True)
 
         # World folders to delete (Fabric stores dimensions inside world/)
         world_folders = ["world"]
@@ -619,17 +2136,20 @@ def delete_world_folders():
             try:
                 # Check if folder exists
                 sftp.stat(f"/{folder}")
-                console.print(f"[yellow]Deleting /{folder}...[/yellow]")
-
-                # Recursively delete folder
-                delete_recursive(sftp, f"/{folder}")
                 deleted.append(folder)
-                console.print(f"[green]✓ Deleted /{folder}[/green]")
             except IOError:
                 console.print(f"[dim]/{folder} does not exist, skipping[/dim]")
 
-        sftp.close()
-        ssh.close()
+        if deleted:
+            console.print(f"[yellow]Deleting {', '.join(f'/{folder}' for folder in deleted)}...[/yellow]")
+            if not remove_remote_paths([f"/{folder}" for folder in deleted], sftp):
+                console.print("[red]Some world folders could not be deleted[/red]")
+                release_sftp_connection(ssh, sftp)
+                return False
+            for folder in deleted:
+                console.print(f"[green]✓ Deleted /{folder}[/green]")
+
+        release_sftp_connection(ssh, sftp)
 
         if deleted:
             console.print(f"\n[green]✓ Deleted {len(deleted)} world folder(s)[/green]")
@@ -656,6 +2176,183 @@ def delete_recursive(sftp, path):
         sftp.rmdir(path)
     except IOError as e:
         console.print(f"[red]Error deleting {path}: {e}[/red]")
+        return False
+    return True
+
+
+def group_remote_paths(paths):
+    """Group absolute remote paths by parent folder ({root: [names]}) for the files API"""
+    groups = {}
+    for path in paths:
+        path = path.rstrip("/")
+        groups.setdefault(posixpath.dirname(path) or "/", []).append(posixpath.basename(path))
+    return groups
+
+
+def delete_remote_paths(paths, sftp=None):
+    """Delete remote files/folders server-side, falling back to SFTP
+
+    Wings deletes whole folder trees in a single /files/delete call per parent
+    folder, which is far quicker than walking the tree over SFTP. Anything the
+    API can't remove is deleted recursively over SFTP instead. Returns True if
+    everything is gone.
+    """
+    paths = list(paths)
+    if not paths:
+        return True
+
+    failed = paths
+    if PTERODACTYL_API_KEY and PTERODACTYL_SERVER_ID:
+        failed = []
+        for root, names in group_remote_paths(paths).items():
+            # Keep request bodies modest when deleting many loose files
+            for i in range(0, len(names), 500):
+                batch = names[i:i + 500]
+                if pterodactyl_call(pterodactyl.delete_files, root, batch) is None:
+                    failed.extend(posixpath.join(root, name) for name in batch)
+        if not failed:
+            return True
+        console.print(f"[yellow]Falling back to SFTP for {len(failed)} path(s)...[/yellow]")
+
+    ssh = None
+    if sftp is None:
+        ssh, sftp = get_sftp_connection()
+        if not sftp:
+            return False
+
+    success = True
+    try:
+        for path in failed:
+            try:
+                attrs = sftp.stat(path)
+            except IOError:
+                continue  # Already gone
+            if attrs.st_mode & 0o40000:
+                success = delete_recursive(sftp, path) and success
+            else:
+                try:
+                    sftp.remove(path)
+                except IOError as e:
+                    console.print(f"[red]Error deleting {path}: {e}[/red]")
+                    success = False
+    finally:
+        if ssh:
+            release_sftp_connection(ssh, sftp)
+    return success
+
+
+def trash_remote_paths(paths, sftp=None):
+    """Move remote files/folders into TRASH_DIR and purge them in the background
+
+    The rename is a single quick call, so the caller can carry on (upload a new
+    world, restart the server) while the old data is deleted. The purge thread
+    is not a daemon, so the script waits for it before exiting. Returns True if
+    everything was moved (or deleted, if moving failed).
+    """
+    paths = list(paths)
+    if not paths:
+        return True
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    trashed = []
+    failed = paths
+    if PTERODACTYL_API_KEY and PTERODACTYL_SERVER_ID:
+        failed = []
+        for root, names in group_remote_paths(paths).items():
+            renames = [{"from": name, "to": posixpath.relpath(f"{TRASH_DIR}/{name}-{stamp}", root)}
+                       for name in names]
+            if pterodactyl_call(pterodactyl.rename_files, root, renames) is None:
+                failed.extend(posixpath.join(root, name) for name in names)
+            else:
+                trashed.extend(f"{TRASH_DIR}/{name}-{stamp}" for name in names)
+
+    if failed:
+        ssh = None
+        if sftp is None:
+            ssh, sftp = get_sftp_connection()
+        if sftp:
+            try:
+                try:
+                    sftp.mkdir(TRASH_DIR)
+                except IOError:
+                    pass
+                for path in list(failed):
+                    target = f"{TRASH_DIR}/{posixpath.basename(path.rstrip('/'))}-{stamp}"
+                    try:
+                        sftp.rename(path, target)
+                        trashed.append(target)
+                        failed.remove(path)
+                    except IOError:
+                        pass
+            finally:
+                if ssh:
+                    release_sftp_connection(ssh, sftp)
+
+    if trashed:
+        console.print(f"[dim]Purging {len(trashed)} trashed path(s) in the background...[/dim]")
+        threading.Thread(target=delete_remote_paths, args=(trashed,), name="trash-purge").start()
+
+    # Whatever couldn't be moved is deleted in the foreground
+    return delete_remote_paths(failed, sftp) if failed else True
+
+
+def remote_path_exists(sftp, path):
+    try:
+        sftp.stat(path)
+        return True
+    except IOError:
+        return False
+
+
+def rename_remote_paths(renames, sftp=None):
+    """Rename remote files/folders through the panel, falling back to SFTP
+
+    `renames` is a list of (from, to) absolute paths. Wings carries out the
+    renames of one call in parallel, so callers that need an order make one
+    call per step. Returns True if everything was renamed.
+    """
+    failed = list(renames)
+    if failed and PTERODACTYL_API_KEY and PTERODACTYL_SERVER_ID:
+        by_root = {}
+        for source, target in failed:
+            by_root.setdefault(posixpath.dirname(source), []).append((source, target))
+        failed = []
+        for root, pairs in by_root.items():
+            body = [{"from": posixpath.basename(source), "to": posixpath.relpath(target, root)}
+                    for source, target in pairs]
+            if pterodactyl_call(pterodactyl.rename_files, root, body) is None:
+                failed.extend(pairs)
+    if not failed:
+        return True
+
+    ssh = None
+    if sftp is None:
+        ssh, sftp = get_sftp_connection()
+        if not sftp:
+            return False
+
+    success = True
+    try:
+        for source, target in failed:
+            try:
+                sftp.rename(source, target)
+            except IOError as e:
+                # The API may have got this one done before it failed
+                if remote_path_exists(sftp, target) and not remote_path_exists(sftp, source):
+                    continue
+                console.print(f"[red]Error renaming {source} to {target}: {e}[/red]")
+                success = False
+    finally:
+        if ssh:
+            release_sftp_connection(ssh, sftp)
+    return success
+
+
+def remove_remote_paths(paths, sftp=None):
+    """Remove remote files/folders according to REMOTE_DELETE_MODE"""
+    if REMOTE_DELETE_MODE == "trash":
+        return trash_remote_paths(paths, sftp)
+    return delete_remote_paths(paths, sftp)
 
 
 def get_server_properties():
@@ -663,18 +2360,13 @@ def get_server_properties():
     if not check_credentials():
         return None
 
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        sftp = ssh.open_sftp()
+        ssh, sftp = get_sftp_connection()
 
         with sftp.open("/server.properties", "r") as f:
             content = f.read().decode('utf-8')
 
-        sftp.close()
-        ssh.close()
+        release_sftp_connection(ssh, sftp)
 
         # Parse properties
         props = {}
@@ -696,12 +2388,8 @@ def update_server_properties(updates):
     if not check_credentials():
         return False
 
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        sftp = ssh.open_sftp()
+        ssh, sftp = get_sftp_connection()
 
         # Read current file
         with sftp.open("/server.properties", "r") as f:
@@ -731,8 +2419,7 @@ def update_server_properties(updates):
         with sftp.open("/server.properties", "w") as f:
             f.write('\n'.join(new_lines).encode('utf-8'))
 
-        sftp.close()
-        ssh.close()
+        release_sftp_connection(ssh, sftp)
 
         console.print("[green]✓ Updated server.properties[/green]")
         return True
@@ -745,7 +2432,6 @@ def update_server_properties(updates):
 def regenerate_world(preset_key=None, custom_seed=None, auto_confirm=False):
     """Regenerate the world with specified settings"""
     from rich.prompt import Prompt, Confirm
-    import time
 
     console.print(Panel(
         "[bold]World Regeneration[/bold]\n\n"
@@ -762,22 +2448,7 @@ def regenerate_world(preset_key=None, custom_seed=None, auto_confirm=False):
         if not auto_confirm and not Confirm.ask("Stop the server first?"):
             console.print("[yellow]Cancelled.[/yellow]")
             return False
-        server_stop()
-        console.print("[cyan]Waiting for server to stop...[/cyan]")
-        for i in range(15):
-            time.sleep(2)
-            status = get_server_status()
-            if status == "offline":
-                break
-        if status != "offline":
-            console.print("[yellow]Server didn't stop gracefully, sending kill signal...[/yellow]")
-            send_power_action("kill")
-            for _ in range(10):
-                time.sleep(2)
-                status = get_server_status()
-                if status == "offline":
-                    break
-        if status != "offline":
+        if not stop_server_and_wait(timeout=30):
             console.print("[red]Server still not offline. Please stop manually.[/red]")
             return False
 
@@ -845,11 +2516,14 @@ def regenerate_world(preset_key=None, custom_seed=None, auto_confirm=False):
         return False
 
     console.print("\n[bold]Step 3/3: Starting server...[/bold]")
-    server_start()
+    started = start_server_and_wait()
 
     console.print("\n" + "="*50)
-    console.print("[bold green]✓ World regeneration initiated![/bold green]")
-    console.print("[yellow]The server will generate a new world on startup.[/yellow]")
+    if started:
+        console.print("[bold green]✓ World regenerated and server is up![/bold green]")
+    else:
+        console.print("[bold green]✓ World regeneration initiated![/bold green]")
+        console.print("[yellow]The server will generate a new world on startup.[/yellow]")
     console.print("="*50)
 
     return True
@@ -1060,14 +2734,8 @@ def update_modpack_info(version, production=False):
 
     if production:
         # Upload to Bloom.host via SFTP
-        console.print(f"[cyan]Connecting to Bloom.host...[/cyan]")
-
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
         try:
-            ssh.connect(hostname, port=port, username=username, password=password)
-            sftp = ssh.open_sftp()
+            ssh, sftp = get_sftp_connection(announce=True)
 
             # 1. Upload modpack-info.json
             console.print(f"[cyan]Uploading modpack-info.json...[/cyan]")
@@ -1081,8 +2749,7 @@ def update_modpack_info(version, production=False):
             else:
                 console.print("[yellow]⚠ Could not read mrpack - skipping stale mod cleanup[/yellow]")
 
-            sftp.close()
-            ssh.close()
+            release_sftp_connection(ssh, sftp)
 
         except Exception as e:
             console.print(f"[red]Error: {e}[/red]")
@@ -1164,90 +2831,1737 @@ def format_size(size_bytes):
         return f"{size_bytes} B"
 
 
-def world_sync_status():
-    """Show status of local world backups."""
-    from datetime import datetime
+class FileTree:
+    """A read-only file listing (relative path -> entry) that stays small at millions of files.
 
-    console.print(Panel(
-        "[bold]Local World Backup Status[/bold]\n\n"
-        "Shows when world data was last downloaded from production.",
-        title="[cyan]World Sync Status[/cyan]",
-        border_style="cyan"
-    ))
+    Reads like the dict of [size, mtime] lists it replaces (get, [], in, len,
+    iteration, items, values), but stores files grouped by directory and
+    sorted by name: directory paths once, file names interned, sizes and
+    mtimes in `array` columns. That is a few dozen bytes per file instead of a
+    path string, a list and two ints. Sync manifest entries that carry an
+    upload's local mtime and sha256 (see load_sync_manifest) keep those in
+    two optional columns.
 
-    local_base = LOCALSERVER_DIR
+    diff() and difference() walk two trees directory by directory and only
+    look at single files where a directory's columns differ, so comparing
+    million-file trees that mostly agree takes a fraction of a second.
+    """
+    __slots__ = ('dirs', 'dir_index', 'starts', 'names', 'sizes', 'mtimes', 'local_mtimes', 'digests')
+
+    NO_LOCAL_MTIME = -(1 << 63)  # local_mtimes value for two-field entries
+
+    def __init__(self, entries=()):
+        """Build from a dict or (relative path, entry) pairs in any order"""
+        if isinstance(entries, dict):
+            entries = entries.items()
+        groups = {}
+        extended = False
+        for rel_path, entry in entries:
+            rel_dir, _, name = rel_path.rpartition("/")
+            group = groups.get(rel_dir)
+            if group is None:
+                group = groups[rel_dir] = []
+            group.append((sys.intern(name), entry))
+            extended = extended or len(entry) > 2
+
+        self.dirs = sorted(groups)
+        self.dir_index = {rel_dir: index for index, rel_dir in enumerate(self.dirs)}
+        self.starts = array('q', [0])
+        self.names = []
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.local_mtimes = array('q') if extended else None
+        self.digests = [] if extended else None
+        for rel_dir in self.dirs:
+            group = groups.pop(rel_dir)
+            group.sort(key=lambda item: item[0])
+            for name, entry in group:
+                self.names.append(name)
+                self.sizes.append(int(entry[0]))
+                self.mtimes.append(int(entry[1]))
+                if extended:
+                    self.local_mtimes.append(int(entry[2]) if len(entry) > 2 else self.NO_LOCAL_MTIME)
+                    self.digests.append(entry[3] if len(entry) > 3 else None)
+            self.starts.append(len(self.names))
+
+    def _find(self, rel_path):
+        rel_dir, _, name = rel_path.rpartition("/")
+        index = self.dir_index.get(rel_dir)
+        if index is None:
+            return -1
+        end = self.starts[index + 1]
+        i = bisect.bisect_left(self.names, name, self.starts[index], end)
+        return i if i < end and self.names[i] == name else -1
+
+    def _entry(self, i):
+        if self.local_mtimes is not None and self.local_mtimes[i] != self.NO_LOCAL_MTIME:
+            return [self.sizes[i], self.mtimes[i], self.local_mtimes[i], self.digests[i]]
+        return [self.sizes[i], self.mtimes[i]]
+
+    def _paths(self):
+        """Yield (index, relative path) for every file, in tree order"""
+        names = self.names
+        for index, rel_dir in enumerate(self.dirs):
+            prefix = rel_dir + "/" if rel_dir else ""
+            for i in range(self.starts[index], self.starts[index + 1]):
+                yield i, prefix + names[i]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, rel_path):
+        return self._find(rel_path) >= 0
+
+    def __getitem__(self, rel_path):
+        i = self._find(rel_path)
+        if i < 0:
+            raise KeyError(rel_path)
+        return self._entry(i)
+
+    def get(self, rel_path, default=None):
+        i = self._find(rel_path)
+        return default if i < 0 else self._entry(i)
+
+    def __iter__(self):
+        return (rel_path for _, rel_path in self._paths())
+
+    keys = __iter__
+
+    def items(self):
+        return ((rel_path, self._entry(i)) for i, rel_path in self._paths())
+
+    def values(self):
+        return (self._entry(i) for i in range(len(self.names)))
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def total_size(self):
+        return sum(self.sizes)
+
+    def local_view(self):
+        """The same tree with each file's local mtime as its mtime (see synced_local_mtime)"""
+        view = object.__new__(FileTree)
+        for slot in FileTree.__slots__:
+            setattr(view, slot, getattr(self, slot))
+        if self.local_mtimes is not None:
+            no_local = self.NO_LOCAL_MTIME
+            view.mtimes = array('q', (mtime if local_mtime == no_local else local_mtime
+                                      for mtime, local_mtime in zip(self.mtimes, self.local_mtimes)))
+        return view
+
+    def _pair_dirs(self, other):
+        """Yield (directory, our range, their range) for every directory in either tree"""
+        empty = (0, 0)
+        for index, rel_dir in enumerate(self.dirs):
+            other_index = other.dir_index.get(rel_dir)
+            theirs = empty if other_index is None else (other.starts[other_index], other.starts[other_index + 1])
+            yield rel_dir, (self.starts[index], self.starts[index + 1]), theirs
+        for other_index, rel_dir in enumerate(other.dirs):
+            if rel_dir not in self.dir_index:
+                yield rel_dir, empty, (other.starts[other_index], other.starts[other_index + 1])
+
+    def difference(self, other):
+        """Relative paths of files in this tree that `other` doesn't have"""
+        missing = []
+        for rel_dir, (start, end), (other_start, other_end) in self._pair_dirs(other):
+            names = self.names[start:end]
+            other_names = other.names[other_start:other_end]
+            if names == other_names:
+                continue
+            prefix = rel_dir + "/" if rel_dir else ""
+            other_names = set(other_names)
+            missing.extend(prefix + name for name in names if name not in other_names)
+        return missing
+
+    def diff(self, other):
+        """Compare with another tree by size and mtime.
+
+        Returns:
+            Tuple of (paths only here, paths only in `other`, paths in both
+            whose size or mtime differ)
+        """
+        added, removed, changed = [], [], []
+        for rel_dir, (start, end), (other_start, other_end) in self._pair_dirs(other):
+            names = self.names[start:end]
+            other_names = other.names[other_start:other_end]
+            same_names = names == other_names
+            if same_names and self.sizes[start:end] == other.sizes[other_start:other_end] \
+                    and self.mtimes[start:end] == other.mtimes[other_start:other_end]:
+                continue
 
-    if not os.path.exists(local_base):
-        console.print(f"\n[red]LocalServer directory not found![/red]")
-        console.print(f"[yellow]Expected: {local_base}[/yellow]")
-        return
+            prefix = rel_dir + "/" if rel_dir else ""
+            if same_names:
+                offset = other_start - start
+                for i in range(start, end):
+                    if self.sizes[i] != other.sizes[i + offset] or self.mtimes[i] != other.mtimes[i + offset]:
+                        changed.append(prefix + self.names[i])
+                continue
 
-    console.print()
+            other_at = {name: other_start + n for n, name in enumerate(other_names)}
+            for i in range(start, end):
+                j = other_at.pop(self.names[i], None)
+                if j is None:
+                    added.append(prefix + self.names[i])
+                elif self.sizes[i] != other.sizes[j] or self.mtimes[i] != other.mtimes[j]:
+                    changed.append(prefix + self.names[i])
+            removed.extend(prefix + name for name in other_at)
+        return added, removed, changed
 
-    # Check main world folder (contains all dimensions in vanilla structure)
-    world_path = os.path.join(local_base, "world-production")
 
-    if os.path.exists(world_path):
-        # Get directory stats
-        size = get_directory_size(world_path)
-        size_str = format_size(size)
+class FileTreeOverlay:
+    """Changes to a FileTree, kept in a small dict on top of it until they are saved.
 
-        # Get most recent modification time
-        latest_mtime = 0
-        for dirpath, dirnames, filenames in os.walk(world_path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                try:
-                    mtime = os.path.getmtime(filepath)
-                    if mtime > latest_mtime:
-                        latest_mtime = mtime
-                except (OSError, IOError):
-                    pass
+    Reads and writes like the dict of entries the sync code updates (get, [],
+    in, pop, assignment) without copying the whole tree into one; a removed
+    file is held as None. tree() builds the updated FileTree.
+    """
+    __slots__ = ('base', 'changes')
 
-        if latest_mtime > 0:
-            dt = datetime.fromtimestamp(latest_mtime)
-            date_str = dt.strftime("%Y-%m-%d %H:%M")
+    def __init__(self, base=None):
+        self.base = base if base is not None else FileTree()
+        self.changes = {}  # relative path -> new entry, or None once removed
 
-            # Calculate age
-            age_seconds = (datetime.now() - dt).total_seconds()
-            if age_seconds < 3600:
-                age_str = f"{int(age_seconds / 60)} min ago"
-            elif age_seconds < 86400:
-                age_str = f"{int(age_seconds / 3600)} hours ago"
-            else:
-                age_str = f"{int(age_seconds / 86400)} days ago"
-        else:
-            date_str = "Unknown"
-            age_str = ""
+    def get(self, rel_path, default=None):
+        if rel_path in self.changes:
+            entry = self.changes[rel_path]
+            return default if entry is None else entry
+        return self.base.get(rel_path, default)
 
-        # Check for dimensions inside world folder
-        dimensions = ["Overworld"]
-        if os.path.exists(os.path.join(world_path, "DIM-1")):
-            dimensions.append("Nether")
-        if os.path.exists(os.path.join(world_path, "DIM1")):
-            dimensions.append("The End")
+    def __contains__(self, rel_path):
+        return self.get(rel_path) is not None
 
-        # Display table
-        table = Table(title="Local World Backup", box=box.ROUNDED)
-        table.add_column("Status", style="white")
-        table.add_column("Size", style="yellow", justify="right")
-        table.add_column("Last Modified", style="green")
-        table.add_column("Age", style="dim")
+    def __getitem__(self, rel_path):
+        entry = self.get(rel_path)
+        if entry is None:
+            raise KeyError(rel_path)
+        return entry
 
-        table.add_row("[green]✓ Downloaded[/green]", size_str, date_str, age_str)
+    def __setitem__(self, rel_path, entry):
+        self.changes[rel_path] = entry
 
-        console.print(table)
-        console.print(f"\n[green]✓ Dimensions:[/green] {', '.join(dimensions)}")
-        console.print(f"[dim]Backup location: {world_path}[/dim]")
-    else:
-        console.print("[yellow]No local backup found.[/yellow]")
-        console.print("[dim]Run 'Download World' to create one.[/dim]")
+    def pop(self, rel_path, default=None):
+        entry = self.get(rel_path, default)
+        self.changes[rel_path] = None
+        return entry
 
+    def tree(self):
+        changes = self.changes
+        if not changes:
+            return self.base
+        kept = ((rel_path, entry) for rel_path, entry in self.base.items() if rel_path not in changes)
+        added = ((rel_path, entry) for rel_path, entry in changes.items() if entry is not None)
+        return FileTree(itertools.chain(kept, added))
 
-def world_download(backup_existing=True, auto_confirm=False):
-    """Download world data from production server to LocalServer."""
-    from rich.prompt import Confirm
-    import shutil
+
+# Records what each local world folder held after its last sync, so the next
+# sync only has to move what changed. Lives in LocalServer, outside the worlds.
+SYNC_MANIFEST_FILE = ".world-sync-manifest.json"
+
+
+def load_sync_manifest():
+    """Load the world sync manifest.
+
+    Returns:
+        Dict of local folder name -> {"synced": iso timestamp,
+        "files": FileTree of relative path -> entry}. Empty if there is none yet.
+
+        An entry is [size, mtime] as reported by the server. Uploads extend it
+        to [size, mtime, local mtime, sha256] since the server assigns its own
+        mtime; downloads copy the remote mtime onto the local file instead.
+    """
+    manifest_path = os.path.join(LOCALSERVER_DIR, SYNC_MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    for folder in manifest.values():
+        folder['files'] = FileTree(folder.get('files', {}))
+    return manifest
+
+
+def save_sync_manifest(manifest):
+    """Write the world sync manifest atomically. File lists may be dicts or FileTrees."""
+    manifest_path = os.path.join(LOCALSERVER_DIR, SYNC_MANIFEST_FILE)
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, default=FileTree.to_dict)
+    os.replace(temp_path, manifest_path)
+
+
+def scan_remote_files(sftp, path, prune=None, failed=None):
+    """List every file under a remote directory with its size and mtime.
+
+    `prune` skips subdirectories and `failed` collects the ones that couldn't
+    be listed, as in walk_remote_tree().
+
+    Returns:
+        FileTree of relative path (forward slashes) -> [size, mtime]. Empty if
+        the directory does not exist.
+    """
+    return FileTree((rel_path, (size, mtime))
+                    for rel_path, is_dir, size, mtime in walk_remote_tree(path, sftp, prune=prune, failed=failed)
+                    if not is_dir)
+
+
+def synced_local_mtime(entry):
+    """Local mtime a manifest entry expects (downloads keep the remote mtime)."""
+    return entry[2] if len(entry) > 2 else entry[1]
+
+
+def scan_local_files(local_path, skip=()):
+    """List every file under a local directory with its size and mtime.
+
+    Args:
+        skip: File names to leave out, wherever they are in the tree
+
+    Returns:
+        FileTree of relative path (forward slashes) -> [size, mtime]
+    """
+    files = []
+    pending = [(local_path, "")]
+    while pending:
+        path, prefix = pending.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():  # os.walk doesn't follow these either
+                                pending.append((entry.path, prefix + entry.name + "/"))
+                            continue
+                        if entry.name in skip:
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((prefix + entry.name, (st.st_size, int(st.st_mtime))))
+        except OSError:
+            continue
+    return FileTree(files)
+
+
+def is_non_critical(rel_path):
+    """Whether a world file can wait for Phase 2 (uploaded with the server online)."""
+    parts = rel_path.split("/")
+    return parts[-1] in NON_CRITICAL_FILES or any(part in NON_CRITICAL_FOLDERS for part in parts[:-1])
+
+
+# Local files never uploaded into the world folders: the server writes its own
+# session.lock and would only find ours stale
+WORLD_UPLOAD_SKIP = ["session.lock"]
+
+
+class TransferPlan:
+    """The local side of an upload, from one scan of the folder.
+
+    Holds every file's size and mtime, which upload phase it belongs to (see
+    is_non_critical) and the file names left out, so the summary, the
+    transfer, the check after it and --dry-run all work from the same listing
+    instead of walking the folder again.
+    """
+    def __init__(self, local_path, skip=()):
+        self.local_path = local_path
+        self.skip = frozenset(skip)
+        self.files = scan_local_files(local_path, self.skip)  # FileTree of relative path -> [size, mtime]
+        # Phases are decided per directory (see is_non_critical), not per file
+        self.non_critical_dirs = {rel_dir for rel_dir in self.files.dirs
+                                  if any(part in NON_CRITICAL_FOLDERS for part in rel_dir.split("/"))}
+
+    def __len__(self):
+        return len(self.files)
+
+    def skips(self, rel_path):
+        """Whether a path is left alone by this plan (not sent, and not deleted on the other side)"""
+        return rel_path.rsplit("/", 1)[-1] in self.skip
+
+    def size(self, rel_paths=None):
+        """Total bytes of the given files (default: all of them)"""
+        if rel_paths is None:
+            return self.files.total_size()
+        return sum(self.files[rel_path][0] for rel_path in rel_paths)
+
+    def phases(self, rel_paths=None):
+        """Split files (default: all of them) into (Phase 1, Phase 2) lists"""
+        phase1, phase2 = [], []
+        for rel_path in (self.files if rel_paths is None else rel_paths):
+            rel_dir, _, name = rel_path.rpartition("/")
+            if name in NON_CRITICAL_FILES or rel_dir in self.non_critical_dirs:
+                phase2.append(rel_path)
+            else:
+                phase1.append(rel_path)
+        return phase1, phase2
+
+    def verify(self, uploaded, remote_path, rel_paths):
+        """Files the server reports at a different size than planned, e.g. because
+        the local copy changed while it was being sent.
+
+        Args:
+            uploaded: Remote path -> [size, mtime] after upload (SFTPTransferPool.uploaded)
+        """
+        mismatched = []
+        for rel_path in rel_paths:
+            remote_stat = uploaded.get(f"{remote_path}/{rel_path}")
+            if remote_stat is not None and remote_stat[0] != self.files[rel_path][0]:
+                mismatched.append(rel_path)
+        return mismatched
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a local file."""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def find_local_changes(local_path, local_files, synced_files):
+    """Hash the local files that may differ from what was last uploaded.
+
+    Files whose size and mtime still match the manifest are taken as unchanged
+    without being read. Everything else is hashed, so a file that was only
+    touched (new mtime, same content) is not uploaded again.
+
+    Args:
+        local_files: FileTree from scan_local_files()
+        synced_files: FileTree of the folder's manifest entries
+
+    Returns:
+        Tuple of (set of changed relative paths, dict of relative path ->
+        sha256 for every file that was hashed)
+    """
+    changed = set()
+    hashes = {}
+    added, _, modified = local_files.diff(synced_files.local_view())
+    for rel_path in added + modified:
+        entry = synced_files.get(rel_path)
+        size = local_files[rel_path][0]
+        digest = file_sha256(os.path.join(local_path, *rel_path.split("/")))
+        hashes[rel_path] = digest
+        if not (entry and entry[0] == size and len(entry) > 3 and entry[3] == digest):
+            changed.add(rel_path)
+
+    return changed, hashes
+
+
+def compute_upload_delta(local_files, local_changed, remote_files, synced_files):
+    """Work out which files a delta upload has to send or delete.
+
+    A file is sent when it changed locally, is missing on the server, or the
+    server copy no longer matches what the last sync recorded (the server
+    rewrote it since). Remote files with no local counterpart are deleted.
+    All three listings are FileTrees.
+
+    Returns:
+        Tuple of (relative paths to upload, remote relative paths to delete)
+    """
+    _, remote_missing, remote_rewritten = remote_files.diff(synced_files)
+    upload = set(local_changed)
+    upload.update(local_files.difference(synced_files))
+    upload.update(rel_path for rel_path in remote_missing + remote_rewritten if rel_path in local_files)
+
+    deleted = remote_files.difference(local_files)
+    return sorted(upload), deleted
+
+
+def record_uploaded_files(synced_files, pool, remote_path, local_files, rel_paths, hashes):
+    """Update manifest entries for files just sent through an upload pool.
+
+    Files that failed to upload are dropped from the manifest so the next
+    delta upload sends them again.
+    """
+    for rel_path in rel_paths:
+        remote_stat = pool.uploaded.get(f"{remote_path}/{rel_path}")
+        previous = synced_files.pop(rel_path, None)
+        if remote_stat is None:
+            continue
+
+        digest = hashes.get(rel_path)
+        if digest is None and previous and len(previous) > 3:
+            digest = previous[3]  # Re-sent because the server copy changed; content is the same
+        synced_files[rel_path] = remote_stat + [local_files[rel_path][1], digest]
+
+
+def compute_download_delta(remote_files, local_files, synced_files):
+    """Work out which files a delta download has to fetch or delete.
+
+    A file is unchanged when the server still reports the size and mtime
+    recorded at the last sync and the local copy still matches them too
+    (downloads keep the remote mtime, so local edits show up as a mismatch).
+
+    Args:
+        remote_files: Current remote listing from scan_remote_files()
+        local_files: Current local listing from scan_local_files()
+        synced_files: FileTree from the manifest entry for this folder
+
+    Returns:
+        Tuple of (changed relative paths, local relative paths to delete)
+    """
+    new, _, rewritten = remote_files.diff(synced_files)
+    _, local_missing, local_edited = local_files.diff(synced_files.local_view())
+    changed = set(new + rewritten)
+    changed.update(rel_path for rel_path in local_missing + local_edited if rel_path in remote_files)
+
+    deleted = local_files.difference(remote_files)
+    return sorted(changed), deleted
+
+
+def remove_local_files(local_path, rel_paths):
+    """Delete files (forward-slash relative paths) under a local folder.
+
+    Directories left empty by the deletions are removed too.
+    """
+    for rel_path in rel_paths:
+        file_path = os.path.join(local_path, *rel_path.split("/"))
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass  # Already moved into a backup
+        except OSError:
+            continue
+
+        parent = os.path.dirname(file_path)
+        while os.path.normpath(parent) != os.path.normpath(local_path):
+            try:
+                os.rmdir(parent)  # Only succeeds once the directory is empty
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
+
+# Devices where copy-on-write clones failed, so clone_file() stops trying them
+clone_unsupported = set()
+
+
+def clone_file(src, dst):
+    """Copy a file, as a copy-on-write clone where the filesystem supports it.
+
+    Clones (FICLONE on Linux for btrfs/XFS, clonefile() on macOS for APFS)
+    share the data blocks until either side is written, so they cost no time
+    or space. Otherwise falls back to a regular copy. Returns True if cloned.
+    """
+    import shutil
+
+    device = os.stat(os.path.dirname(os.path.abspath(dst))).st_dev
+    if device not in clone_unsupported:
+        try:
+            if sys.platform == 'darwin':
+                import ctypes
+                libc = ctypes.CDLL(None, use_errno=True)
+                if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0:
+                    return True
+                raise OSError(ctypes.get_errno(), "clonefile failed")
+            import fcntl
+            with open(src, 'rb') as s, open(dst, 'wb') as d:
+                fcntl.ioctl(d.fileno(), 0x40049409, s.fileno())  # FICLONE
+            shutil.copystat(src, dst)
+            return True
+        except (OSError, ImportError, AttributeError):
+            clone_unsupported.add(device)
+            if os.path.exists(dst):
+                os.remove(dst)
+    shutil.copy2(src, dst)
+    return False
+
+
+def backup_local_world(world_dir, backup_dir, replaced=None, patched=(), mode=None):
+    """Back up a local world folder before a download changes it.
+
+    A full download replaces the whole folder, so it is simply renamed into
+    `backup_dir`. A delta download (`replaced` given) updates it in place:
+    files in `replaced` (about to be re-downloaded or deleted) are renamed
+    into the backup and the download writes new ones, files in `patched`
+    (region files patched in place) are cloned, and every other file is
+    cloned or, in "link" mode, hard-linked. Hard links cost nothing on any
+    filesystem, but the local server writes region files in place, so a
+    linked backup follows along with later local play.
+
+    Args:
+        mode: WORLD_BACKUP_MODE value (defaults to it); "copy" copies the
+            whole folder the old way
+
+    Returns:
+        Dict counting files moved, linked, cloned and copied.
+    """
+    import shutil
+
+    mode = mode or WORLD_BACKUP_MODE
+    counts = {'moved': 0, 'linked': 0, 'cloned': 0, 'copied': 0}
+    if mode == "copy":
+        shutil.copytree(world_dir, backup_dir)
+        counts['copied'] = sum(len(files) for _, _, files in os.walk(backup_dir))
+        return counts
+    if replaced is None:
+        os.rename(world_dir, backup_dir)
+        counts['moved'] = sum(len(files) for _, _, files in os.walk(backup_dir))
+        return counts
+
+    replaced = set(replaced)
+    patched = set(patched)
+    for dirpath, dirnames, filenames in os.walk(world_dir):
+        rel_dir = os.path.relpath(dirpath, world_dir)
+        backup_path = os.path.normpath(os.path.join(backup_dir, rel_dir))
+        os.makedirs(backup_path, exist_ok=True)
+        for filename in filenames:
+            rel_path = filename if rel_dir == "." else f"{rel_dir.replace(os.sep, '/')}/{filename}"
+            src = os.path.join(dirpath, filename)
+            dst = os.path.join(backup_path, filename)
+            if rel_path in replaced:
+                os.rename(src, dst)
+                counts['moved'] += 1
+                continue
+            if mode == "link" and rel_path not in patched:
+                try:
+                    os.link(src, dst)
+                    counts['linked'] += 1
+                    continue
+                except OSError:
+                    pass  # No hard links here (e.g. FAT), clone instead
+            counts['cloned' if clone_file(src, dst) else 'copied'] += 1
+    return counts
+
+
+def restore_failed_from_backup(folder_info, local_base, failed):
+    """Put back the pre-download copy of files a delta download failed to fetch.
+
+    backup_local_world() moves replaced files into the backup before the
+    download, so without this a failed file would be missing (or partly
+    written) locally. The backup keeps its copy, and the file stays out of
+    the manifest so the next delta download fetches it again.
+    """
+    for info in folder_info:
+        backup_dir = info.get('backup_dir')
+        if not backup_dir:
+            continue
+        local_path = os.path.join(local_base, info['local'])
+        restored = 0
+        for rel_path in info['changed']:
+            local_item = os.path.join(local_path, *rel_path.split("/"))
+            backup_item = os.path.join(backup_dir, *rel_path.split("/"))
+            if local_item in failed and os.path.exists(backup_item):
+                try:
+                    if os.path.exists(local_item):
+                        os.remove(local_item)
+                    clone_file(backup_item, local_item)
+                    restored += 1
+                except OSError as e:
+                    console.print(f"[red]Could not restore {rel_path} from the backup: {e}[/red]")
+        if restored:
+            console.print(f"[yellow]Put back {restored} file(s) in {info['local']} from the backup "
+                          f"after their download failed[/yellow]")
+
+
+# Anvil region files (.mca): an 8 KiB header of 1024 chunk locations (3-byte
+# sector offset + 1-byte sector count) and 1024 save timestamps, followed by
+# chunk data in 4 KiB sectors.
+REGION_SECTOR_SIZE = 4096
+REGION_HEADER_SIZE = 8192
+
+# Per-chunk baselines of region files as of the last sync (see
+# pack_region_baseline), kept apart from the main manifest because of size.
+REGION_BASELINE_FILE = ".world-sync-regions.json"
+
+
+class RegionPatchError(Exception):
+    """A region file can't be patched chunk by chunk; copy it whole instead."""
+
+
+def parse_region_header(header):
+    """Parse an 8 KiB .mca header.
+
+    Returns:
+        Tuple of (locations, timestamps): 1024 (sector offset, sector count)
+        pairs and 1024 timestamps, indexed by chunk.
+    """
+    if len(header) < REGION_HEADER_SIZE:
+        raise RegionPatchError("file is smaller than a region header")
+    entries = struct.unpack(">1024I", header[:4096])
+    timestamps = list(struct.unpack(">1024I", header[4096:REGION_HEADER_SIZE]))
+    return [(entry >> 8, entry & 0xFF) for entry in entries], timestamps
+
+
+def region_chunk_crcs(data, locations):
+    """CRC32 of each chunk's sectors (0 for chunks that aren't stored)."""
+    return [
+        zlib.crc32(data[offset * REGION_SECTOR_SIZE:(offset + count) * REGION_SECTOR_SIZE]) if count else 0
+        for offset, count in locations
+    ]
+
+
+def pack_region_baseline(timestamps, crcs):
+    """Encode per-chunk timestamps and CRCs compactly for the baseline file."""
+    return base64.b64encode(zlib.compress(array('I', list(timestamps) + list(crcs)).tobytes())).decode('ascii')
+
+
+def unpack_region_baseline(packed):
+    """Decode pack_region_baseline() output; None if missing or unreadable."""
+    if not packed:
+        return None
+    try:
+        values = array('I')
+        values.frombytes(zlib.decompress(base64.b64decode(packed)))
+    except (ValueError, zlib.error):
+        return None
+    if len(values) != 2048:
+        return None
+    return list(values[:1024]), list(values[1024:])
+
+
+def read_region_baseline(path):
+    """Chunk baseline (timestamps, crcs) of a local region file, or None."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        locations, timestamps = parse_region_header(data)
+    except (OSError, RegionPatchError):
+        return None
+    return timestamps, region_chunk_crcs(data, locations)
+
+
+def region_patch_ranges(src_locations, src_timestamps, dst_locations, dst_timestamps, local_crcs, baseline, src_size):
+    """Byte ranges of the source region that must be copied for dest to match it.
+
+    A chunk is skipped when both sides store it at the same sectors with the
+    same timestamp. With a baseline from the last sync, the local copy's
+    checksum must also still match it and the timestamp must be the one that
+    was synced, which catches edits made by tools that don't bump timestamps.
+
+    Returns:
+        Sorted, merged list of (offset, length) tuples
+    """
+    ranges = []
+    for i, (offset, count) in enumerate(src_locations):
+        if count == 0 or offset * REGION_SECTOR_SIZE < REGION_HEADER_SIZE:
+            continue
+        if dst_locations[i] == (offset, count) and dst_timestamps[i] == src_timestamps[i]:
+            if baseline is None or (baseline[0][i] == src_timestamps[i] and baseline[1][i] == local_crcs[i]):
+                continue
+        start = offset * REGION_SECTOR_SIZE
+        end = min((offset + count) * REGION_SECTOR_SIZE, src_size)
+        if end > start:
+            ranges.append((start, end - start))
+
+    merged = []
+    for start, length in sorted(ranges):
+        if merged and start <= merged[-1][0] + merged[-1][1]:
+            prev_start, prev_length = merged[-1]
+            merged[-1] = (prev_start, max(prev_length, start + length - prev_start))
+        else:
+            merged.append((start, length))
+    return merged
+
+
+def patch_remote_region(sftp, local_path, remote_path, baseline=None, callback=None):
+    """Make a remote .mca file match the local one by rewriting only changed chunks.
+
+    Writes the sectors of every chunk that differs, then the local header, then
+    truncates the remote file to the local size.
+
+    Returns:
+        The new chunk baseline (timestamps, crcs)
+
+    Raises:
+        RegionPatchError: either side isn't a readable region file
+    """
+    with open(local_path, 'rb') as f:
+        data = f.read()
+    locations, timestamps = parse_region_header(data)
+    crcs = region_chunk_crcs(data, locations)
+
+    with sftp.open(remote_path, 'r+b') as remote_file:
+        remote_locations, remote_timestamps = parse_region_header(remote_file.read(REGION_HEADER_SIZE))
+        ranges = region_patch_ranges(locations, timestamps, remote_locations, remote_timestamps,
+                                     crcs, baseline, len(data))
+        total = sum(length for _, length in ranges) + REGION_HEADER_SIZE
+
+        remote_file.set_pipelined(True)
+        sent = 0
+        for offset, length in ranges:
+            remote_file.seek(offset)
+            remote_file.write(data[offset:offset + length])
+            sent += length
+            if callback:
+                callback(sent, total)
+        remote_file.seek(0)
+        remote_file.write(data[:REGION_HEADER_SIZE])
+        remote_file.truncate(len(data))
+
+    if callback:
+        callback(total, total)
+    return timestamps, crcs
+
+
+def patch_local_region(sftp, remote_path, local_path, baseline=None, callback=None):
+    """Make a local .mca file match the remote one by fetching only changed chunks.
+
+    Returns:
+        The new chunk baseline (timestamps, crcs)
+
+    Raises:
+        RegionPatchError: either side isn't a readable region file
+    """
+    try:
+        with open(local_path, 'rb') as f:
+            data = bytearray(f.read())
+    except OSError as e:
+        raise RegionPatchError(str(e))
+    local_locations, local_timestamps = parse_region_header(data)
+    local_crcs = region_chunk_crcs(data, local_locations)
+
+    with sftp.open(remote_path, 'rb') as remote_file:
+        remote_header = remote_file.read(REGION_HEADER_SIZE)
+        remote_locations, remote_timestamps = parse_region_header(remote_header)
+        remote_size = remote_file.stat().st_size
+        ranges = region_patch_ranges(remote_locations, remote_timestamps, local_locations, local_timestamps,
+                                     local_crcs, baseline, remote_size)
+        total = sum(length for _, length in ranges) + REGION_HEADER_SIZE
+
+        if len(data) < remote_size:
+            data.extend(bytes(remote_size - len(data)))
+        del data[remote_size:]
+
+        received = 0
+        for (offset, length), chunk in zip(ranges, remote_file.readv(ranges, TRANSPORT_PROFILE['prefetch'])):
+            data[offset:offset + length] = chunk
+            received += length
+            if callback:
+                callback(received, total)
+        data[:REGION_HEADER_SIZE] = remote_header
+
+    with open(local_path, 'wb') as f:
+        f.write(data)
+
+    if callback:
+        callback(total, total)
+    locations, timestamps = parse_region_header(data)
+    return timestamps, region_chunk_crcs(data, locations)
+
+
+def load_region_baselines():
+    """Load stored region baselines: local folder name -> {relative path: packed}."""
+    try:
+        with open(os.path.join(LOCALSERVER_DIR, REGION_BASELINE_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_region_baselines(baselines):
+    """Write region baselines atomically."""
+    baseline_path = os.path.join(LOCALSERVER_DIR, REGION_BASELINE_FILE)
+    with open(baseline_path + ".tmp", 'w') as f:
+        json.dump(baselines, f)
+    os.replace(baseline_path + ".tmp", baseline_path)
+
+
+def update_region_baselines(folder_baselines, pool, local_path, remote_path, rel_paths, direction):
+    """Refresh stored baselines for region files just transferred through a pool.
+
+    Patched files report their new baseline; region files that were copied
+    whole are read back from the local copy. Failed files lose their baseline.
+    """
+    for rel_path in rel_paths:
+        if not rel_path.endswith(".mca"):
+            continue
+        local_item = os.path.join(local_path, *rel_path.split("/"))
+        remote_item = f"{remote_path}/{rel_path}"
+        dest = remote_item if direction == "upload" else local_item
+        if dest in pool.failed:
+            folder_baselines.pop(rel_path, None)
+            continue
+
+        baseline = pool.region_results.get(dest) or read_region_baseline(local_item)
+        if baseline:
+            folder_baselines[rel_path] = pack_region_baseline(*baseline)
+        else:
+            folder_baselines.pop(rel_path, None)
+
+
+# Large files that change in place (SQLite databases such as
+# DistantHorizons.sqlite and ledger.sqlite) are patched block by block. The
+# baseline is a hash of every block as last synced, together with the remote
+# size and mtime it was synced as, kept apart from the main manifest.
+BLOCK_DELTA_MIN_SIZE = 16 * 1024 * 1024
+BLOCK_DELTA_SIZE = 256 * 1024
+BLOCK_HASH_SIZE = 8
+BLOCK_BASELINE_FILE = ".world-sync-blocks.json"
+
+
+class BlockPatchError(Exception):
+    """A file can't be patched block by block; copy it whole instead."""
+
+
+def block_patchable(rel_path, size):
+    """Whether a file is worth a block baseline (region files have their own)."""
+    return size >= BLOCK_DELTA_MIN_SIZE and not rel_path.endswith(".mca")
+
+
+def file_block_hashes(path):
+    """Hash of each BLOCK_DELTA_SIZE block of a local file, concatenated."""
+    hashes = bytearray()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(BLOCK_DELTA_SIZE)
+            if not block:
+                break
+            hashes += hashlib.blake2b(block, digest_size=BLOCK_HASH_SIZE).digest()
+    return bytes(hashes)
+
+
+def pack_block_baseline(hashes, remote_stat):
+    """Encode block hashes and the remote [size, mtime] they match for the baseline file."""
+    return {
+        'block': BLOCK_DELTA_SIZE,
+        'remote': list(remote_stat),
+        'hashes': base64.b64encode(hashes).decode('ascii'),
+    }
+
+
+def unpack_block_baseline(entry, remote_stat):
+    """Block hashes from a stored baseline, or None if it is missing, unreadable,
+    made with another block size, or the remote file has changed since.
+    """
+    if not entry or entry.get('block') != BLOCK_DELTA_SIZE or entry.get('remote') != list(remote_stat):
+        return None
+    try:
+        return base64.b64decode(entry['hashes'])
+    except (KeyError, ValueError):
+        return None
+
+
+def patch_remote_blocks(sftp, local_path, remote_path, hashes, callback=None, remote_stat=None):
+    """Make a remote file match the local one by rewriting only changed blocks.
+
+    `hashes` must describe the remote file as it is (see unpack_block_baseline).
+    Every block whose hash differs, or that lies past the baseline, is written
+    at its offset, then the remote file is truncated to the local size.
+
+    Args:
+        remote_stat: [size, mtime] the baseline was made against. The open
+            remote file is checked against it, since a running server (Phase 2)
+            may have written to it after the folder was scanned.
+
+    Returns:
+        The local file's block hashes (the new baseline)
+
+    Raises:
+        BlockPatchError: the remote file doesn't match the baseline (size, or
+            size and mtime if `remote_stat` is given)
+    """
+    new_hashes = bytearray()
+    changed = []
+    local_size = 0
+    with open(local_path, 'rb') as f:
+        while True:
+            block = f.read(BLOCK_DELTA_SIZE)
+            if not block:
+                break
+            digest = hashlib.blake2b(block, digest_size=BLOCK_HASH_SIZE).digest()
+            index = len(new_hashes) // BLOCK_HASH_SIZE
+            if hashes[index * BLOCK_HASH_SIZE:(index + 1) * BLOCK_HASH_SIZE] != digest:
+                changed.append((index * BLOCK_DELTA_SIZE, len(block)))
+            new_hashes += digest
+            local_size += len(block)
+
+    total = sum(length for _, length in changed)
+    with open(local_path, 'rb') as f, sftp.open(remote_path, 'r+b') as remote_file:
+        attrs = remote_file.stat()
+        remote_size = attrs.st_size
+        if -(-remote_size // BLOCK_DELTA_SIZE) != len(hashes) // BLOCK_HASH_SIZE:
+            raise BlockPatchError("remote file doesn't match its baseline")
+        if remote_stat is not None and [remote_size, int(attrs.st_mtime)] != list(remote_stat):
+            raise BlockPatchError("remote file changed since its baseline")
+
+        remote_file.set_pipelined(True)
+        sent = 0
+        for offset, length in changed:
+            f.seek(offset)
+            remote_file.seek(offset)
+            remote_file.write(f.read(length))
+            sent += length
+            if callback:
+                callback(sent, total)
+        if remote_size > local_size:
+            remote_file.truncate(local_size)
+
+    if sftp.stat(remote_path).st_size != local_size:
+        raise IOError(f"remote size doesn't match after patching {remote_path}")
+    if callback:
+        callback(total, total)
+    return bytes(new_hashes)
+
+
+def load_block_baselines():
+    """Load stored block baselines: local folder name -> {relative path: entry}."""
+    try:
+        with open(os.path.join(LOCALSERVER_DIR, BLOCK_BASELINE_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_block_baselines(baselines):
+    """Write block baselines atomically."""
+    baseline_path = os.path.join(LOCALSERVER_DIR, BLOCK_BASELINE_FILE)
+    with open(baseline_path + ".tmp", 'w') as f:
+        json.dump(baselines, f)
+    os.replace(baseline_path + ".tmp", baseline_path)
+
+
+def update_block_baselines(folder_baselines, pool, local_path, remote_path, rel_paths, direction, remote_files=None):
+    """Refresh stored block baselines for large files just transferred.
+
+    Patched files report their new hashes; files that were copied whole are
+    hashed from the local copy. The remote [size, mtime] comes from
+    `pool.uploaded` for uploads and from `remote_files` for downloads. `pool`
+    may be None when nothing went through one. Failed files lose their baseline.
+    """
+    for rel_path in rel_paths:
+        local_item = os.path.join(local_path, *rel_path.split("/"))
+        remote_item = f"{remote_path}/{rel_path}"
+        dest = remote_item if direction == "upload" else local_item
+        if pool is not None and dest in pool.failed:
+            folder_baselines.pop(rel_path, None)
+            continue
+
+        if direction == "upload":
+            remote_stat = pool.uploaded.get(remote_item)
+        else:
+            remote_stat = remote_files.get(rel_path)
+        if remote_stat is None or not block_patchable(rel_path, remote_stat[0]):
+            folder_baselines.pop(rel_path, None)
+            continue
+
+        hashes = pool.block_results.get(dest) if pool is not None else None
+        if hashes is None:
+            try:
+                hashes = file_block_hashes(local_item)
+            except OSError:
+                folder_baselines.pop(rel_path, None)
+                continue
+        folder_baselines[rel_path] = pack_block_baseline(hashes, remote_stat[:2])
+
+
+# =============================================================================
+# Local World Snapshots
+# =============================================================================
+
+# Files are cut into chunks at content-defined points, so an edit only changes
+# the chunks around it and everything else is shared between snapshots. Cut
+# points are only considered every 4 KiB (region sectors and SQLite pages move
+# in whole 4 KiB steps): one CRC32 of the preceding 64 bytes per candidate,
+# and a cut where its low bits are zero.
+SNAPSHOT_CHUNK_MIN = 16 * 1024
+SNAPSHOT_CHUNK_MAX = 256 * 1024
+SNAPSHOT_CUT_STEP = 4096
+SNAPSHOT_CUT_WINDOW = 64
+SNAPSHOT_CUT_MASK = 0xF  # one candidate in 16, so chunks average about 80 KiB
+SNAPSHOT_READ_SIZE = 4 * 1024 * 1024
+SNAPSHOT_WORKERS = min(8, os.cpu_count() or 4)
+SNAPSHOT_READ_ATTEMPTS = 3  # reads of a file that keeps changing before it is stored as is
+
+
+class SnapshotError(Exception):
+    """A snapshot or chunk is missing, corrupt or unreadable"""
+
+
+def snapshot_file_chunks(f):
+    """Yield the content-defined chunks of an open binary file, in order."""
+    pending = b""
+    start = 0  # position in `pending` of the next chunk
+    base = 0  # file offset of pending[0]
+    eof = False
+    while True:
+        if not eof and len(pending) - start < SNAPSHOT_CHUNK_MAX:
+            block = f.read(SNAPSHOT_READ_SIZE)
+            eof = not block
+            pending = pending[start:] + block
+            base += start
+            start = 0
+            continue
+        if start >= len(pending):
+            return
+
+        stop = min(start + SNAPSHOT_CHUNK_MAX, len(pending))
+        end = stop
+        candidate = -(-(base + start + SNAPSHOT_CHUNK_MIN) // SNAPSHOT_CUT_STEP) * SNAPSHOT_CUT_STEP - base
+        while candidate < stop:
+            if not zlib.crc32(pending[candidate - SNAPSHOT_CUT_WINDOW:candidate]) & SNAPSHOT_CUT_MASK:
+                end = candidate
+                break
+            candidate += SNAPSHOT_CUT_STEP
+        yield pending[start:end]
+        start = end
+
+
+class SnapshotStore:
+    """Deduplicated, compressed snapshots of the local world folders.
+
+    Layout under `root`:
+        chunks/ab/<hash>         one compressed chunk, named by the BLAKE2b
+                                 hash of its contents (so stored only once)
+        snapshots/<id>.json      summary: created, comment, folders, totals
+        snapshots/<id>.files.gz  every file: size, mtime and its chunk hashes
+
+    Chunks are zstd-compressed when the zstandard module is installed and
+    zlib-compressed otherwise; the first byte of a chunk file records which,
+    so a store can mix both. Snapshots are written and restored by a pool of
+    threads (hashing and compression release the GIL).
+    """
+    def __init__(self, root):
+        self.root = root
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.snapshot_dir = os.path.join(root, "snapshots")
+        self.local = threading.local()
+
+    # --- chunks ---
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def _compress(self, data):
+        if zstandard is not None:
+            compressor = getattr(self.local, 'compressor', None)
+            if compressor is None:
+                compressor = self.local.compressor = zstandard.ZstdCompressor(level=3)
+            packed = b"Z" + compressor.compress(data)
+        else:
+            packed = b"z" + zlib.compress(data, 6)
+        return packed if len(packed) < len(data) + 1 else b"-" + data
+
+    def _decompress(self, packed):
+        codec, payload = packed[:1], packed[1:]
+        if codec == b"-":
+            return payload
+        if codec == b"z":
+            return zlib.decompress(payload)
+        if codec == b"Z":
+            if zstandard is None:
+                raise SnapshotError("this snapshot uses zstd chunks; install zstandard (pip install zstandard)")
+            decompressor = getattr(self.local, 'decompressor', None)
+            if decompressor is None:
+                decompressor = self.local.decompressor = zstandard.ZstdDecompressor()
+            return decompressor.decompress(payload)
+        raise SnapshotError(f"unknown chunk encoding {codec!r}")
+
+    def put_chunk(self, data):
+        """Store a chunk unless it's already there; returns (hash, bytes newly stored)"""
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        packed = self._compress(data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(packed)
+        os.replace(temp_path, path)
+        return digest, len(packed)
+
+    def get_chunk(self, digest):
+        """Read a chunk back, checking it against its hash"""
+        try:
+            with open(self._chunk_path(digest), 'rb') as f:
+                data = self._decompress(f.read())
+        except (OSError, zlib.error) as e:
+            raise SnapshotError(f"chunk {digest} is unreadable: {e}")
+        if hashlib.blake2b(data, digest_size=20).hexdigest() != digest:
+            raise SnapshotError(f"chunk {digest} is corrupt")
+        return data
+
+    # --- snapshots ---
+
+    def list(self):
+        """Snapshot summaries, oldest first"""
+        snapshots = []
+        try:
+            names = os.listdir(self.snapshot_dir)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.snapshot_dir, name), 'r') as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # Half-written; prune or the next snapshot replaces it
+        return sorted(snapshots, key=lambda snapshot: (snapshot['created'], snapshot['id']))
+
+    def files(self, snapshot_id):
+        """{folder: {rel_path: [size, mtime, [chunk hashes]]}} of a snapshot"""
+        try:
+            with gzip.open(os.path.join(self.snapshot_dir, f"{snapshot_id}.files.gz"), 'rt') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"snapshot {snapshot_id} is unreadable: {e}")
+
+    def create(self, folders, comment="", created=None, tracker=None):
+        """Snapshot local folders ({name: path}); returns the new summary.
+
+        Files whose size and mtime match the newest snapshot holding the same
+        folder reuse its chunk list without being read again.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        created = created or datetime.now()
+        snapshot_id = created.strftime("%Y%m%d-%H%M%S")
+        existing = {snapshot['id'] for snapshot in self.list()}
+        suffix = 2
+        while snapshot_id in existing:
+            snapshot_id = f"{created.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+            suffix += 1
+
+        previous = {}
+        for snapshot in reversed(self.list()):
+            missing = [name for name in folders if name in snapshot['folders'] and name not in previous]
+            if missing:
+                files = self.files(snapshot['id'])
+                for name in missing:
+                    previous[name] = files.get(name, {})
+
+        jobs = []
+        for name, path in folders.items():
+            for dirpath, dirnames, filenames in os.walk(path):
+                for filename in filenames:
+                    full_path = os.path.join(dirpath, filename)
+                    rel_path = os.path.relpath(full_path, path).replace(os.sep, "/")
+                    jobs.append((name, rel_path, full_path))
+
+        def snapshot_file(job):
+            name, rel_path, full_path = job
+            task_id = None
+            stored = 0
+            try:
+                stat = os.stat(full_path)
+                entry = previous.get(name, {}).get(rel_path)
+                if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+                    if tracker:
+                        tracker.file_complete(task_id=tracker.start_file(rel_path, stat.st_size))
+                    return name, rel_path, entry, 0
+                if tracker:
+                    task_id = tracker.start_file(rel_path, stat.st_size)
+                for _ in range(SNAPSHOT_READ_ATTEMPTS):
+                    digests = []
+                    done = 0
+                    with open(full_path, 'rb') as f:
+                        for chunk in snapshot_file_chunks(f):
+                            digest, written = self.put_chunk(chunk)
+                            digests.append(digest)
+                            stored += written
+                            done += len(chunk)
+                            if tracker:
+                                tracker.update(done, stat.st_size, task_id)
+                    after = os.stat(full_path)
+                    if done == after.st_size and \
+                            (after.st_size, after.st_mtime) == (stat.st_size, stat.st_mtime):
+                        break
+                    before, stat = stat, after  # Written to while it was read, so read it again
+                else:
+                    # Keep the mtime from before the last read, so the next snapshot reads it again
+                    stat = before
+                    console.print(f"[yellow]{rel_path} kept changing while it was read; "
+                                  f"its snapshot copy may mix old and new data[/yellow]")
+                if tracker:
+                    tracker.file_complete(task_id=task_id)
+                return name, rel_path, [done, stat.st_mtime, digests], stored
+            except FileNotFoundError:
+                # Deleted since the walk (session.lock, a region temp file, ...)
+                if task_id is not None:
+                    tracker.file_complete(success=False, task_id=task_id)
+                console.print(f"[yellow]{rel_path} disappeared before it could be read; "
+                              f"left out of the snapshot[/yellow]")
+                return name, rel_path, None, stored
+
+        files = {name: {} for name in folders}
+        stored = 0
+        with ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS) as executor:
+            for name, rel_path, entry, written in executor.map(snapshot_file, jobs):
+                if entry is not None:
+                    files[name][rel_path] = entry
+                stored += written
+
+        summary = {
+            'id': snapshot_id,
+            'created': created.isoformat(timespec='seconds'),
+            'comment': comment,
+            'folders': sorted(folders),
+            'files': sum(len(entries) for entries in files.values()),
+            'size': sum(entry[0] for entries in files.values() for entry in entries.values()),
+            'stored': stored,
+        }
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        with gzip.open(os.path.join(self.snapshot_dir, f"{snapshot_id}.files.gz"), 'wt') as f:
+            json.dump(files, f, separators=(',', ':'))
+        # The summary goes last: a snapshot without one doesn't exist yet
+        with open(os.path.join(self.snapshot_dir, f"{snapshot_id}.json"), 'w') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+    def restore(self, snapshot_id, folders, tracker=None):
+        """Write a snapshot's folders out to new directories ({name: path})"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        files = self.files(snapshot_id)
+        jobs = []
+        for name, path in folders.items():
+            for rel_path, entry in files.get(name, {}).items():
+                jobs.append((os.path.join(path, *rel_path.split("/")), rel_path, entry))
+
+        def restore_file(job):
+            dest, rel_path, (size, mtime, digests) = job
+            task_id = tracker.start_file(rel_path, size) if tracker else None
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            done = 0
+            with open(dest, 'wb') as f:
+                for digest in digests:
+                    data = self.get_chunk(digest)
+                    f.write(data)
+                    done += len(data)
+                    if tracker:
+                        tracker.update(done, size, task_id)
+            if done != size:
+                raise SnapshotError(f"{rel_path} restored to {done} bytes instead of {size}")
+            os.utime(dest, (mtime, mtime))
+            if tracker:
+                tracker.file_complete(task_id=task_id)
+
+        with ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS) as executor:
+            for _ in executor.map(restore_file, jobs):
+                pass
+
+    def delete(self, snapshot_id):
+        """Remove a snapshot (its chunks stay until collect_garbage())"""
+        for name in (f"{snapshot_id}.json", f"{snapshot_id}.files.gz"):
+            try:
+                os.remove(os.path.join(self.snapshot_dir, name))
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self):
+        """Delete chunks no snapshot refers to; returns (chunks, bytes) freed"""
+        referenced = set()
+        for snapshot in self.list():
+            for entries in self.files(snapshot['id']).values():
+                for entry in entries.values():
+                    referenced.update(entry[2])
+
+        freed_chunks = freed_bytes = 0
+        for dirpath, dirnames, filenames in os.walk(self.chunk_dir):
+            for filename in filenames:
+                if filename not in referenced:
+                    path = os.path.join(dirpath, filename)
+                    freed_bytes += os.path.getsize(path)
+                    os.remove(path)
+                    freed_chunks += 1
+        return freed_chunks, freed_bytes
+
+    def disk_usage(self):
+        return get_directory_size(self.chunk_dir) if os.path.exists(self.chunk_dir) else 0
+
+
+def snapshot_store():
+    """The local world snapshot store (WORLD_SNAPSHOT_DIR or LocalServer/.world-snapshots)"""
+    return SnapshotStore(WORLD_SNAPSHOT_DIR or os.path.join(LOCALSERVER_DIR, ".world-snapshots"))
+
+
+def local_world_folders():
+    """{local folder name: path} of the world folders present in LocalServer"""
+    folders = {}
+    for remote, local in WORLD_FOLDERS:
+        path = os.path.join(LOCALSERVER_DIR, local)
+        if os.path.isdir(path):
+            folders[local] = path
+    return folders
+
+
+def snapshots_to_keep(snapshots, keep_last=None, keep_daily=None, keep_weekly=None):
+    """IDs of the snapshots the retention policy keeps.
+
+    The newest `keep_last` are kept, plus the newest snapshot of each of the
+    `keep_daily` most recent days and `keep_weekly` most recent ISO weeks
+    that have one.
+    """
+    keep_last = SNAPSHOT_KEEP_LAST if keep_last is None else keep_last
+    keep_daily = SNAPSHOT_KEEP_DAILY if keep_daily is None else keep_daily
+    keep_weekly = SNAPSHOT_KEEP_WEEKLY if keep_weekly is None else keep_weekly
+
+    newest_first = sorted(snapshots, key=lambda snapshot: (snapshot['created'], snapshot['id']), reverse=True)
+    keep = {snapshot['id'] for snapshot in newest_first[:keep_last]}
+    for period, limit in ((lambda created: created.date(), keep_daily),
+                          (lambda created: created.isocalendar()[:2], keep_weekly)):
+        seen = set()
+        for snapshot in newest_first:
+            key = period(datetime.fromisoformat(snapshot['created']))
+            if key not in seen and len(seen) < limit:
+                seen.add(key)
+                keep.add(snapshot['id'])
+    return keep
+
+
+def save_world_snapshot(folders, comment=""):
+    """Snapshot local folders into the store with progress; returns the summary or None"""
+    total_files = 0
+    total_size = 0
+    for path in folders.values():
+        for dirpath, dirnames, filenames in os.walk(path):
+            for filename in filenames:
+                total_files += 1
+                total_size += os.path.getsize(os.path.join(dirpath, filename))
+
+    store = snapshot_store()
+    try:
+        with RichProgressTracker(total_files=total_files, total_size=total_size) as tracker:
+            summary = store.create(folders, comment, tracker=tracker)
+    except (OSError, SnapshotError) as e:
+        console.print(f"[red]Snapshot failed: {e}[/red]")
+        return None
+    console.print(f"[green]✓ Snapshot {summary['id']}: {summary['files']} files ({format_size(summary['size'])}), "
+                  f"{format_size(summary['stored'])} of new data stored[/green]")
+    return summary
+
+
+def prune_world_snapshots(store, auto_confirm=True):
+    """Apply the retention policy; returns the number of snapshots deleted"""
+    from rich.prompt import Confirm
+
+    snapshots = store.list()
+    keep = snapshots_to_keep(snapshots)
+    doomed = [snapshot for snapshot in snapshots if snapshot['id'] not in keep]
+    if not doomed:
+        console.print("[green]✓ Nothing to prune[/green]")
+        return 0
+
+    console.print(f"[yellow]Pruning {len(doomed)} snapshot(s): "
+                  f"{', '.join(snapshot['id'] for snapshot in doomed)}[/yellow]")
+    if not auto_confirm and not Confirm.ask("Delete them?"):
+        console.print("[yellow]Cancelled.[/yellow]")
+        return 0
+    for snapshot in doomed:
+        store.delete(snapshot['id'])
+    chunks, freed = store.collect_garbage()
+    console.print(f"[green]✓ Deleted {len(doomed)} snapshot(s), freed {format_size(freed)} ({chunks} chunks)[/green]")
+    return len(doomed)
+
+
+def world_snapshots_list():
+    """Show the local world snapshots and how much the store shares between them"""
+    store = snapshot_store()
+    snapshots = store.list()
+    if not snapshots:
+        console.print(f"[yellow]No snapshots in {store.root}[/yellow]")
+        return []
+
+    keep = snapshots_to_keep(snapshots)
+    table = Table(title="Local World Snapshots", box=box.ROUNDED)
+    table.add_column("ID", style="cyan")
+    table.add_column("Created", style="white")
+    table.add_column("Files", justify="right")
+    table.add_column("Size", style="green", justify="right")
+    table.add_column("New data", style="yellow", justify="right")
+    table.add_column("Comment")
+    for snapshot in reversed(snapshots):
+        marker = "" if snapshot['id'] in keep else " [dim](prunable)[/dim]"
+        table.add_row(snapshot['id'] + marker, snapshot['created'].replace("T", " "), str(snapshot['files']),
+                      format_size(snapshot['size']), format_size(snapshot['stored']), snapshot.get('comment', ""))
+    console.print(table)
+
+    on_disk = store.disk_usage()
+    logical = sum(snapshot['size'] for snapshot in snapshots)
+    ratio = f", {logical / on_disk:.1f}x smaller than separate copies" if on_disk else ""
+    console.print(f"[cyan]{len(snapshots)} snapshot(s) of {format_size(logical)} "
+                  f"take {format_size(on_disk)} on disk{ratio}[/cyan]")
+    console.print(f"[dim]Store: {store.root} "
+                  f"({'zstd' if zstandard is not None else 'zlib; pip install zstandard for zstd'})[/dim]")
+    return snapshots
+
+
+def world_snapshot_create(comment=""):
+    """Snapshot the LocalServer world folders"""
+    folders = local_world_folders()
+    if not folders:
+        console.print(f"[red]No world folders found in {LOCALSERVER_DIR}[/red]")
+        return False
+    console.print(f"[cyan]Snapshotting {', '.join(folders)}...[/cyan]")
+    return save_world_snapshot(folders, comment) is not None
+
+
+def world_snapshot_restore(snapshot_id=None, target=None, auto_confirm=False, backup=True):
+    """Restore a snapshot (default: the newest).
+
+    Into `target` if given, otherwise over the LocalServer world folders:
+    the snapshot is written next to them first, the current folders are
+    snapshotted (unless `backup` is False) and only then swapped out.
+    """
+    import shutil
+    from rich.prompt import Confirm
+
+    store = snapshot_store()
+    snapshots = store.list()
+    if not snapshots:
+        console.print(f"[yellow]No snapshots in {store.root}[/yellow]")
+        return False
+    matches = [snapshot for snapshot in snapshots if snapshot_id is None or snapshot['id'].startswith(snapshot_id)]
+    if not matches:
+        console.print(f"[red]No snapshot matches {snapshot_id}[/red]")
+        return False
+    snapshot = matches[-1]
+
+    dest_base = target or LOCALSERVER_DIR
+    console.print(Panel(
+        f"[bold]Restore snapshot {snapshot['id']}[/bold]\n\n"
+        f"Created: [cyan]{snapshot['created'].replace('T', ' ')}[/cyan]\n"
+        f"Folders: [cyan]{', '.join(snapshot['folders'])}[/cyan] "
+        f"({snapshot['files']} files, {format_size(snapshot['size'])})\n"
+        f"Into: [cyan]{dest_base}[/cyan]"
+        + ("" if target else "\n\n[yellow]The current local world folders will be replaced[/yellow]"),
+        title="[cyan]World Snapshot Restore[/cyan]",
+        border_style="cyan"
+    ))
+    if not auto_confirm and not Confirm.ask("Proceed with restore?"):
+        console.print("[yellow]Cancelled.[/yellow]")
+        return False
+
+    staging = {name: os.path.join(dest_base, f"{name}.restoring") for name in snapshot['folders']}
+    for path in staging.values():
+        shutil.rmtree(path, ignore_errors=True)
+    try:
+        with RichProgressTracker(total_files=snapshot['files'], total_size=snapshot['size']) as tracker:
+            store.restore(snapshot['id'], staging, tracker=tracker)
+    except (OSError, SnapshotError) as e:
+        console.print(f"[red]Restore failed: {e}[/red]")
+        for path in staging.values():
+            shutil.rmtree(path, ignore_errors=True)
+        return False
+
+    current = {name: os.path.join(dest_base, name) for name in snapshot['folders']
+               if os.path.exists(os.path.join(dest_base, name))}
+    if current and backup and not target:
+        console.print("[cyan]Snapshotting the current world first...[/cyan]")
+        if save_world_snapshot(current, f"before restoring {snapshot['id']}") is None:
+            console.print(f"[yellow]Restored copy left in {', '.join(staging.values())}[/yellow]")
+            return False
+    for name, path in staging.items():
+        final_path = os.path.join(dest_base, name)
+        if os.path.exists(final_path):
+            shutil.rmtree(final_path)
+        os.rename(path, final_path)
+
+    console.print(f"[green]✓ Restored snapshot {snapshot['id']} into {dest_base}[/green]")
+    return True
+
+
+def world_snapshots_prune(auto_confirm=False):
+    """Delete snapshots outside the retention policy and the chunks only they used"""
+    console.print(f"[cyan]Keeping the newest {SNAPSHOT_KEEP_LAST}, plus one a day for {SNAPSHOT_KEEP_DAILY} days "
+                  f"and one a week for {SNAPSHOT_KEEP_WEEKLY} weeks[/cyan]")
+    return prune_world_snapshots(snapshot_store(), auto_confirm)
+
+
+def world_snapshots_import(auto_confirm=False):
+    """Move LocalServer/world-backup-<timestamp> folders into the snapshot store"""
+    import shutil
+    from rich.prompt import Confirm
+
+    backups = sorted(name for name in os.listdir(LOCALSERVER_DIR)
+                     if name.startswith("world-backup-") and os.path.isdir(os.path.join(LOCALSERVER_DIR, name)))
+    if not backups:
+        console.print("[yellow]No world-backup-* folders to import[/yellow]")
+        return 0
+    console.print(f"[cyan]Found {len(backups)} backup folder(s): {', '.join(backups)}[/cyan]")
+    if not auto_confirm and not Confirm.ask("Import them as snapshots and delete the folders?"):
+        console.print("[yellow]Cancelled.[/yellow]")
+        return 0
+
+    store = snapshot_store()
+    imported = 0
+    for name in backups:
+        backup_path = os.path.join(LOCALSERVER_DIR, name)
+        try:
+            created = datetime.strptime(name[len("world-backup-"):], "%Y%m%d_%H%M%S")
+        except ValueError:
+            created = datetime.fromtimestamp(os.path.getmtime(backup_path))
+        folders = {folder: os.path.join(backup_path, folder) for folder in sorted(os.listdir(backup_path))
+                   if os.path.isdir(os.path.join(backup_path, folder))}
+        console.print(f"[cyan]Importing {name}...[/cyan]")
+        try:
+            summary = store.create(folders, f"imported {name}", created=created)
+        except (OSError, SnapshotError) as e:
+            console.print(f"[red]Could not import {name}: {e}[/red]")
+            continue
+        shutil.rmtree(backup_path)
+        imported += 1
+        console.print(f"[green]✓ {name} → snapshot {summary['id']} "
+                      f"({format_size(summary['stored'])} of new data)[/green]")
+    return imported
+
+
+def world_sync_status():
+    """Show status of local world backups."""
+    from datetime import datetime
+
+    console.print(Panel(
+        "[bold]Local World Backup Status[/bold]\n\n"
+        "Shows when world data was last downloaded from production.",
+        title="[cyan]World Sync Status[/cyan]",
+        border_style="cyan"
+    ))
+
+    local_base = LOCALSERVER_DIR
+
+    if not os.path.exists(local_base):
+        console.print(f"\n[red]LocalServer directory not found![/red]")
+        console.print(f"[yellow]Expected: {local_base}[/yellow]")
+        return
+
+    console.print()
+
+    # Check main world folder (contains all dimensions in vanilla structure)
+    world_path = os.path.join(local_base, "world-production")
+
+    if os.path.exists(world_path):
+        # Get directory stats
+        size = get_directory_size(world_path)
+        size_str = format_size(size)
+
+        # Get most recent modification time
+        latest_mtime = 0
+        for dirpath, dirnames, filenames in os.walk(world_path):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                try:
+                    mtime = os.path.getmtime(filepath)
+                    if mtime > latest_mtime:
+                        latest_mtime = mtime
+                except (OSError, IOError):
+                    pass
+
+        if latest_mtime > 0:
+            dt = datetime.fromtimestamp(latest_mtime)
+            date_str = dt.strftime("%Y-%m-%d %H:%M")
+
+            # Calculate age
+            age_seconds = (datetime.now() - dt).total_seconds()
+            if age_seconds < 3600:
+                age_str = f"{int(age_seconds / 60)} min ago"
+            elif age_seconds < 86400:
+                age_str = f"{int(age_seconds / 3600)} hours ago"
+            else:
+                age_str = f"{int(age_seconds / 86400)} days ago"
+        else:
+            date_str = "Unknown"
+            age_str = ""
+
+        # Check for dimensions inside world folder
+        dimensions = ["Overworld"]
+        if os.path.exists(os.path.join(world_path, "DIM-1")):
+            dimensions.append("Nether")
+        if os.path.exists(os.path.join(world_path, "DIM1")):
+            dimensions.append("The End")
+
+        # Display table
+        table = Table(title="Local World Backup", box=box.ROUNDED)
+        table.add_column("Status", style="white")
+        table.add_column("Size", style="yellow", justify="right")
+        table.add_column("Last Modified", style="green")
+        table.add_column("Age", style="dim")
+
+        table.add_row("[green]✓ Downloaded[/green]", size_str, date_str, age_str)
+
+        console.print(table)
+        console.print(f"\n[green]✓ Dimensions:[/green] {', '.join(dimensions)}")
+        console.print(f"[dim]Backup location: {world_path}[/dim]")
+    else:
+        console.print("[yellow]No local backup found.[/yellow]")
+        console.print("[dim]Run 'Download World' to create one.[/dim]")
+
+
+def download_archive(sftp, remote_archive, archive_size, folder_map, local_base, tracker):
+    """Stream a server-made tar.gz and unpack it locally while it downloads.
+
+    Members are extracted as they arrive, so the archive never touches local
+    disk. The top-level folder of each member picks the local world folder
+    via `folder_map` (e.g. "world" -> "world-production"); members outside
+    those folders, or with unsafe paths, are skipped.
+
+    Returns:
+        Dict of local folder name -> {relative path: [size, mtime]} of the
+        extracted files, for the sync manifest
+    """
+    extracted = {local_name: {} for local_name in folder_map.values()}
+    task_id = tracker.start_file(posixpath.basename(remote_archive), archive_size)
+    received = 0
+
+    class ProgressReader:
+        def __init__(self, f):
+            self.f = f
+
+        def read(self, size=-1):
+            nonlocal received
+            data = self.f.read(size)
+            received += len(data)
+            tracker.update(received, archive_size, task_id)
+            return data
+
+    try:
+        with sftp.open(remote_archive, "rb") as remote_file:
+            remote_file.prefetch(archive_size, TRANSPORT_PROFILE['prefetch'])
+            with tarfile.open(fileobj=ProgressReader(remote_file), mode="r|gz") as tar:
+                for member in tar:
+                    parts = [part for part in member.name.split("/") if part not in ("", ".")]
+                    if not parts or parts[0] not in folder_map or ".." in parts:
+                        continue
+                    local_name = folder_map[parts[0]]
+                    local_item = os.path.join(local_base, local_name, *parts[1:])
+
+                    if member.isdir():
+                        os.makedirs(local_item, exist_ok=True)
+                    elif member.isfile() and len(parts) > 1:
+                        os.makedirs(os.path.dirname(local_item), exist_ok=True)
+                        with tar.extractfile(member) as src, open(local_item, "wb") as dst:
+                            while True:
+                                chunk = src.read(1024 * 1024)
+                                if not chunk:
+                                    break
+                                dst.write(chunk)
+                        os.utime(local_item, (member.mtime, member.mtime))
+                        extracted[local_name]["/".join(parts[1:])] = [member.size, int(member.mtime)]
+        tracker.file_complete(success=True, task_id=task_id)
+    except Exception:
+        tracker.file_complete(success=False, task_id=task_id)
+        raise
+
+    return extracted
+
+
+def world_download(backup_existing=True, auto_confirm=False, jobs=None, delta=False, regions=False, archive=False,
+                   resume=False):
+    """Download world data from production server to LocalServer.
+
+    Args:
+        jobs: Number of parallel SFTP connections (defaults to SFTP_WORKERS)
+        delta: Only fetch files that changed since the last sync (per the sync
+            manifest) and delete local files the server no longer has, instead
+            of replacing the whole local world
+        regions: Like delta, but changed .mca region files that already exist
+            locally are patched chunk by chunk instead of fetched whole
+        archive: Have the server compress the world folders into one archive
+            (/files/compress) and unpack it locally while it downloads
+        resume: Continue an interrupted download from the transfer journal:
+            local folders are kept, files it finished are skipped and partly
+            downloaded large files continue from their last checkpoint
+    """
+    from rich.prompt import Confirm
+    import shutil
+
+    delta = delta or regions
+    if archive and delta:
+        console.print("[yellow]--archive downloads everything, ignoring it for a delta download[/yellow]")
+        archive = False
+    if archive and resume:
+        console.print("[yellow]--archive downloads are a single stream and can't be resumed, ignoring --resume[/yellow]")
+        resume = False
 
     local_base = LOCALSERVER_DIR
 
@@ -1267,15 +4581,8 @@ def world_download(backup_existing=True, auto_confirm=False):
     if not check_credentials():
         return False
 
-    console.print(f"\n[cyan]Connecting to {hostname}:{port}...[/cyan]")
-
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        console.print("[green]Connected![/green]")
-        sftp = ssh.open_sftp()
+        ssh, sftp = get_sftp_connection(announce=True)
     except Exception as e:
         console.print(f"[red]Error connecting: {e}[/red]")
         return False
@@ -1285,20 +4592,70 @@ def world_download(backup_existing=True, auto_confirm=False):
     folder_info = []
     total_files = 0
     total_size = 0
+    transfer_files = 0
+    transfer_size = 0
     dimensions_in_world = []  # Track dimensions found inside /world
+    manifest = load_sync_manifest()
+    region_baselines = load_region_baselines() if regions else {}
 
     for remote_path, local_name in WORLD_FOLDERS:
-        file_count, size = get_remote_directory_info(sftp, remote_path)
-        if file_count > 0:
-            folder_info.append({
+        if delta:
+            unlisted = []
+            remote_files = scan_remote_files(sftp, remote_path, failed=unlisted)
+            if unlisted:
+                # Files under them would look deleted on the server, so don't sync against this listing
+                console.print(f"[red]Could not list {len(unlisted)} folder(s) in {remote_path}: "
+                              f"{format_remote_dirs(unlisted)}[/red]")
+                console.print("[yellow]Nothing was downloaded or deleted; run the download again[/yellow]")
+                release_sftp_connection(ssh, sftp)
+                return False
+            file_count = len(remote_files)
+            size = remote_files.total_size()
+            # A folder that was synced before but is now empty or gone on the
+            # server still needs a delta, one that deletes the local copy
+            found = file_count > 0 or (local_name in manifest and
+                                       os.path.isdir(os.path.join(local_base, local_name)))
+            if found and not file_count:
+                console.print(f"[yellow]  {remote_path} is empty or gone on the server; "
+                              f"the local {local_name} will be emptied to match[/yellow]")
+        else:
+            # Archive sizes come from the server and a full download scans the
+            # folder while it downloads, so only check the folder is there.
+            # The last sync's manifest gives a full download its estimate.
+            try:
+                found = len(sftp.listdir(remote_path)) > 0
+            except IOError:
+                found = False
+            synced_files = FileTree() if archive else manifest.get(local_name, {}).get('files', FileTree())
+            file_count = len(synced_files)
+            size = synced_files.total_size()
+        if found:
+            info = {
                 'remote': remote_path,
                 'local': local_name,
                 'files': file_count,
                 'size': size
-            })
+            }
             total_files += file_count
             total_size += size
 
+            if delta:
+                synced_files = manifest.get(local_name, {}).get('files', FileTree())
+                changed, deleted = compute_download_delta(
+                    remote_files, scan_local_files(os.path.join(local_base, local_name)), synced_files)
+                info['remote_files'] = remote_files
+                info['synced_files'] = synced_files
+                info['changed'] = changed
+                info['deleted'] = deleted
+                info['changed_size'] = sum(remote_files[rel_path][0] for rel_path in changed)
+                transfer_files += len(changed)
+                transfer_size += info['changed_size']
+            else:
+                transfer_files += file_count
+                transfer_size += size
+
+            folder_info.append(info)
+
             # Check for dimensions inside main world folder (vanilla structure)
             if remote_path == "/world":
                 try:
@@ -1319,26 +4676,47 @@ def world_download(backup_existing=True, auto_confirm=False):
 
     if not folder_info:
         console.print("[red]No world folders found on remote server![/red]")
-        sftp.close()
-        ssh.close()
+        release_sftp_connection(ssh, sftp)
         return False
 
     size_str = f"{total_size/(1024*1024*1024):.2f} GB" if total_size > 1024*1024*1024 else f"{total_size/(1024*1024):.1f} MB"
 
+    transfer_str = format_size(transfer_size)
+
     table = Table(title="Remote World Folders", box=box.ROUNDED)
     table.add_column("Folder", style="cyan")
     table.add_column("Files", style="white", justify="right")
     table.add_column("Size", style="green", justify="right")
+    if delta:
+        table.add_column("Changed", style="yellow", justify="right")
+        table.add_column("Delete", style="red", justify="right")
 
     for info in folder_info:
         folder_size = f"{info['size']/(1024*1024*1024):.2f} GB" if info['size'] > 1024*1024*1024 else f"{info['size']/(1024*1024):.1f} MB"
-        table.add_row(info['remote'], str(info['files']), folder_size)
-
-    table.add_row("", "", "", style="dim")
-    table.add_row("[bold]Total[/bold]", f"[bold]{total_files}[/bold]", f"[bold]{size_str}[/bold]")
+        if archive:
+            table.add_row(info['remote'], "-", "-")
+        elif delta:
+            table.add_row(info['remote'], str(info['files']), folder_size,
+                          f"{len(info['changed'])} ({format_size(info['changed_size'])})", str(len(info['deleted'])))
+        else:
+            table.add_row(info['remote'], f"~{info['files']}" if info['files'] else "?",
+                          f"~{folder_size}" if info['files'] else "?")
+
+    if delta:
+        total_deleted = sum(len(info['deleted']) for info in folder_info)
+        table.add_row("", "", "", "", "", style="dim")
+        table.add_row("[bold]Total[/bold]", f"[bold]{total_files}[/bold]", f"[bold]{size_str}[/bold]",
+                      f"[bold]{transfer_files} ({transfer_str})[/bold]", f"[bold]{total_deleted}[/bold]")
+    elif not archive:
+        table.add_row("", "", "", style="dim")
+        table.add_row("[bold]Total[/bold]", f"[bold]~{total_files}[/bold]", f"[bold]~{size_str}[/bold]")
 
     console.print()
     console.print(table)
+    if archive:
+        console.print("[dim]Sizes are known once the server has built the archive[/dim]")
+    elif not delta:
+        console.print("[dim]Sizes are estimated from the last sync; the folders are scanned as they download[/dim]")
 
     # Show dimensions found inside main world folder
     if dimensions_in_world:
@@ -1351,299 +4729,1098 @@ def world_download(backup_existing=True, auto_confirm=False):
         console.print("\n[yellow]⚠ Warning: Local server may be running (session.lock exists)[/yellow]")
         if not auto_confirm and not Confirm.ask("Continue anyway?"):
             console.print("[yellow]Cancelled.[/yellow]")
-            sftp.close()
-            ssh.close()
+            release_sftp_connection(ssh, sftp)
             return False
 
+    if delta and transfer_files == 0 and total_deleted == 0:
+        console.print("\n[green]✓ Local world is already up to date[/green]")
+        release_sftp_connection(ssh, sftp)
+        return True
+
     if not auto_confirm:
         console.print()
-        if not Confirm.ask(f"Download {size_str} from production server?"):
+        if archive or (not delta and not transfer_size):
+            prompt = "Compress and download the world from production server?" if archive \
+                else "Download the world from production server?"
+        else:
+            prompt = f"Download {'' if delta else '~'}{transfer_str} from production server?"
+        if not Confirm.ask(prompt):
             console.print("[yellow]Cancelled.[/yellow]")
-            sftp.close()
-            ssh.close()
+            release_sftp_connection(ssh, sftp)
             return False
 
-    # Backup existing local world
-    if backup_existing:
+    # Backup existing local world (a resumed download only holds a partial one)
+    if backup_existing and not resume:
         local_world_dirs = [os.path.join(local_base, info['local']) for info in folder_info]
         existing_dirs = [d for d in local_world_dirs if os.path.exists(d)]
-        if existing_dirs:
+        if existing_dirs and WORLD_BACKUP_MODE == "store":
+            console.print("\n[bold]Snapshotting existing world...[/bold]")
+            folders = {os.path.basename(world_dir): world_dir for world_dir in existing_dirs}
+            if save_world_snapshot(folders, "before world-download") is None:
+                console.print("[red]Not downloading without a backup; use --no-backup to skip it[/red]")
+                release_sftp_connection(ssh, sftp)
+                return False
+            prune_world_snapshots(snapshot_store())
+        elif existing_dirs:
             console.print("\n[bold]Backing up existing world...[/bold]")
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_base = os.path.join(local_base, f"world-backup-{timestamp}")
             os.makedirs(backup_base, exist_ok=True)
-            for world_dir in existing_dirs:
-                dir_name = os.path.basename(world_dir)
-                backup_dest = os.path.join(backup_base, dir_name)
-                console.print(f"[cyan]Backing up {dir_name}...[/cyan]")
-                shutil.copytree(world_dir, backup_dest)
-            console.print(f"[green]✓ Backup saved to: {os.path.basename(backup_base)}/[/green]")
+            totals = {}
+            for info in folder_info:
+                world_dir = os.path.join(local_base, info['local'])
+                if world_dir not in existing_dirs:
+                    continue
+                console.print(f"[cyan]Backing up {info['local']}...[/cyan]")
+                replaced = patched = None
+                if delta:
+                    patched = [rel_path for rel_path in info['changed'] if regions and rel_path.endswith(".mca")]
+                    replaced = set(info['changed']).difference(patched) | set(info['deleted'])
+                    info['backup_dir'] = os.path.join(backup_base, info['local'])
+                counts = backup_local_world(world_dir, os.path.join(backup_base, info['local']), replaced,
+                                            patched or ())
+                for kind, count in counts.items():
+                    totals[kind] = totals.get(kind, 0) + count
+            detail = ", ".join(f"{count} {kind}" for kind, count in totals.items() if count)
+            console.print(f"[green]✓ Backup saved to: {os.path.basename(backup_base)}/[/green]"
+                          + (f" [dim]({detail})[/dim]" if detail else ""))
+            if totals.get('copied') and WORLD_BACKUP_MODE != "copy":
+                console.print(f"[yellow]This filesystem can't clone files, so {totals['copied']} file(s) were "
+                              f"copied in full; WORLD_BACKUP_MODE=link hard-links them instead[/yellow]")
+
+    if archive:
+        console.print("\n[bold]Compressing world data on the server...[/bold]")
+        folder_map = {info['remote'].lstrip("/"): info['local'] for info in folder_info}
+        archive_info = pterodactyl_call(pterodactyl.compress_files, "/", list(folder_map))
+        if not archive_info:
+            console.print("[red]Server could not compress the world; try again without --archive[/red]")
+            release_sftp_connection(ssh, sftp)
+            return False
+        remote_archive = f"/{archive_info['name']}"
+        transfer_size = archive_info.get('size', 0)
+        transfer_str = format_size(transfer_size)
+        console.print(f"[green]✓ Created {remote_archive} ({transfer_str})[/green]")
+
+        for info in folder_info:
+            local_path = os.path.join(local_base, info['local'])
+            if os.path.exists(local_path):
+                shutil.rmtree(local_path)
+
+        console.print("\n[bold]Downloading and extracting world data...[/bold]\n")
+        try:
+            with RichProgressTracker(total_files=1, total_size=transfer_size) as tracker:
+                extracted = download_archive(sftp, remote_archive, transfer_size, folder_map, local_base, tracker)
+        except Exception as e:
+            console.print(f"[red]Error downloading {remote_archive}: {e}[/red]")
+            extracted = None
+        finally:
+            try:
+                sftp.remove(remote_archive)
+            except IOError:
+                console.print(f"[yellow]Could not delete {remote_archive} on the server[/yellow]")
+        if extracted is None:
+            release_sftp_connection(ssh, sftp)
+            return False
+
+        for info in folder_info:
+            info['manifest_files'] = FileTreeOverlay(FileTree(extracted[info['local']]))
+        transfer_files = sum(len(files) for files in extracted.values())
+        failed = set()
+
+    else:
+        journal = TransferJournal(os.path.join(local_base, TRANSFER_JOURNAL_FILES['download']), resume=resume)
+        if resume:
+            console.print(f"\n[cyan]Resuming: {len(journal)} file(s) recorded by the interrupted download[/cyan]")
+
+        # Download each folder
+        console.print("\n[bold]Downloading world data...[/bold]\n")
+
+        estimated = (transfer_files, transfer_size)
+        scanned = [0, 0]
+
+        def on_found(size):
+            # Grow the bars past the estimate as the scan finds more than it said
+            scanned[0] += 1
+            scanned[1] += size
+            if scanned[0] % 256 == 0:
+                tracker.set_totals(max(scanned[0], estimated[0]), max(scanned[1], estimated[1]))
+
+        with RichProgressTracker(total_files=transfer_files, total_size=transfer_size) as tracker:
+            with SFTPTransferPool(tracker, workers=jobs, journal=journal) as pool:
+                for info in folder_info:
+                    local_path = os.path.join(local_base, info['local'])
+
+                    if delta:
+                        console.print(f"[cyan]Syncing {info['remote']} ({len(info['changed'])} changed, {len(info['deleted'])} removed)...[/cyan]")
+                        remove_local_files(local_path, info['deleted'])
+                        folder_baselines = region_baselines.get(info['local'], {})
+                        for rel_path in info['changed']:
+                            file_size, mtime = info['remote_files'][rel_path]
+                            local_item = os.path.join(local_path, *rel_path.split("/"))
+                            os.makedirs(os.path.dirname(local_item), exist_ok=True)
+                            if regions and rel_path.endswith(".mca") and os.path.exists(local_item):
+                                pool.get_region(f"{info['remote']}/{rel_path}", local_item, rel_path, file_size, mtime,
+                                                unpack_region_baseline(folder_baselines.get(rel_path)))
+                            else:
+                                pool.get(f"{info['remote']}/{rel_path}", local_item, rel_path, file_size, mtime)
+                        # Unchanged files keep their entry (uploads record extra fields)
+                        manifest_files = info['manifest_files'] = FileTreeOverlay(info['synced_files'])
+                        for rel_path in info['changed']:
+                            manifest_files[rel_path] = info['remote_files'][rel_path]
+                        for rel_path in info['synced_files'].difference(info['remote_files']):
+                            manifest_files.pop(rel_path)
+                    else:
+                        if os.path.exists(local_path) and not resume:
+                            shutil.rmtree(local_path)
+
+                        console.print(f"[cyan]Downloading {info['remote']}...[/cyan]")
+                        info['manifest_files'] = FileTreeOverlay()
+                        info['unlisted'] = []
+                        download_remote_tree(sftp, info['remote'], local_path, pool,
+                                             info['manifest_files'], on_found, info['unlisted'])
+                if not delta:
+                    transfer_files, transfer_size = scanned
+                    tracker.set_totals(transfer_files, transfer_size)
+                    transfer_str = format_size(transfer_size)
+
+        failed = pool.failed
+        if delta and failed:
+            restore_failed_from_backup(folder_info, local_base, failed)
+        unlisted = [remote_dir for info in folder_info for remote_dir in info.get('unlisted', ())]
+        if unlisted:
+            console.print(f"[red]Could not list {len(unlisted)} remote folder(s), so nothing in them was "
+                          f"downloaded: {format_remote_dirs(unlisted)}[/red]")
+        if failed or unlisted:
+            journal.close()
+            if failed:
+                console.print(f"[yellow]{len(failed)} file(s) failed; run world-download --resume to retry them[/yellow]")
+            else:
+                console.print("[yellow]Run world-download --resume to fetch them[/yellow]")
+        else:
+            journal.clear()
+
+    release_sftp_connection(ssh, sftp)
+
+    # Record what we now hold so the next delta download only fetches changes.
+    # Failed files are left out so they are fetched again next time.
+    synced_at = datetime.now().isoformat(timespec='seconds')
+    for info in folder_info:
+        local_path = os.path.join(local_base, info['local'])
+        for local_item in failed:
+            if local_item.startswith(local_path + os.sep):
+                info['manifest_files'].pop(os.path.relpath(local_item, local_path).replace(os.sep, "/"))
+        info['manifest_files'] = info['manifest_files'].tree()
+        if not info['files'] and not info['manifest_files']:
+            # Gone on the server, so stop tracking it
+            manifest.pop(info['local'], None)
+            continue
+        manifest[info['local']] = {'synced': synced_at, 'files': info['manifest_files']}
+    save_sync_manifest(manifest)
+
+    # Hash large files as downloaded, so the next upload only sends changed blocks
+    block_baselines = load_block_baselines()
+    for info in folder_info:
+        if delta:
+            folder_blocks = block_baselines.setdefault(info['local'], {})
+            for rel_path in info['deleted']:
+                folder_blocks.pop(rel_path, None)
+            transferred = info['changed']
+        else:
+            folder_blocks = block_baselines[info['local']] = {}
+            transferred = list(info['manifest_files'])
+        update_block_baselines(folder_blocks, None if archive else pool, os.path.join(local_base, info['local']),
+                               info['remote'], transferred, "download", info['manifest_files'])
+    save_block_baselines(block_baselines)
+
+    if regions:
+        for info in folder_info:
+            folder_baselines = region_baselines.setdefault(info['local'], {})
+            for rel_path in info['deleted']:
+                folder_baselines.pop(rel_path, None)
+            update_region_baselines(folder_baselines, pool, os.path.join(local_base, info['local']),
+                                    info['remote'], info['changed'], "download")
+        save_region_baselines(region_baselines)
+
+    console.print("\n" + "="*50)
+    console.print("[bold green]✓ World download complete![/bold green]")
+    console.print(f"\n[cyan]Downloaded {transfer_files} files ({transfer_str})[/cyan]")
+    console.print(f"[cyan]Location: {local_base}[/cyan]")
+    console.print("="*50)
+
+    return True
+
+
+def world_upload(auto_confirm=False, delta=False, regions=False, resume=False, dry_run=False, staged=False):
+    """Upload world data from LocalServer to production server.
+
+    Two-phase upload:
+    - Phase 1 (blocking): Critical world data, then start server
+    - Phase 2 (background): Non-critical data (DistantHorizons, BlueMap)
+
+    Args:
+        delta: Keep the remote world folders and only upload files that changed
+            since the last sync (size, mtime and content hash against the sync
+            manifest), deleting remote files that no longer exist locally
+        regions: Like delta, but changed .mca region files that already exist
+            on the server are patched chunk by chunk instead of sent whole
+        resume: Continue an interrupted upload from the transfer journal: the
+            remote folders are kept, files it finished are skipped, partly sent
+            large files continue from their last checkpoint, and Phase 1 is
+            skipped entirely if it had completed
+        dry_run: Show what would be uploaded and stop; nothing on production
+            is touched
+        staged: Upload into <folder>.next while the server keeps running,
+            then stop it only to swap the folders (see world_upload_staged)
+    """
+    from rich.prompt import Confirm
+    import shutil
+
+    delta = delta or regions
+
+    WORLD_FOLDERS = [
+        ("world-production", "/world"),
+        ("world-production_nether", "/world_nether"),
+        ("world-production_the_end", "/world_the_end"),
+    ]
+
+    local_base = LOCALSERVER_DIR
+
+    console.print(Panel(
+        "[bold red]Upload World to Production[/bold red]\n\n"
+        "This will upload world data from LocalServer to Bloom.host.\n"
+        "[yellow]⚠ This will OVERWRITE the production world![/yellow]\n\n"
+        "Phase 1: Upload critical data → Start server\n"
+        "Phase 2: Upload non-critical data (background)",
+        title="[red]World Upload[/red]",
+        border_style="red"
+    ))
+
+    if not os.path.exists(local_base):
+        console.print(f"[red]Error: LocalServer directory not found![/red]")
+        console.print(f"[yellow]Expected: {local_base}[/yellow]")
+        return False
+
+    # Check what we're uploading
+    folder_info = []
+    total_files_phase1 = 0
+    total_size_phase1 = 0
+    total_files_phase2 = 0
+    total_size_phase2 = 0
+    changed_files = 0
+    changed_size = 0
+    manifest = load_sync_manifest()
+    # A staged upload moves every folder's baselines along with it, so it loads them either way
+    region_baselines = load_region_baselines() if regions or staged else {}
+    block_baselines = load_block_baselines()
+
+    if delta:
+        console.print("[cyan]Checking local files against the last sync...[/cyan]")
+
+    for local_name, remote_path in WORLD_FOLDERS:
+        local_path = os.path.join(local_base, local_name)
+        if not os.path.exists(local_path):
+            console.print(f"[dim]  {local_name} (not found, skipping)[/dim]")
+            continue
+
+        # One scan of the folder serves the summary, the upload and the checks after it
+        plan = TransferPlan(local_path, WORLD_UPLOAD_SKIP)
+        local_files = plan.files
+        phase1_upload, phase2_upload = plan.phases()
+        phase1_files, phase1_size = len(phase1_upload), plan.size(phase1_upload)
+        phase2_files, phase2_size = len(phase2_upload), plan.size(phase2_upload)
+
+        info = {
+            'local': local_name,
+            'baselines': local_name,  # key of the folder's region and block baselines
+            'remote': remote_path,
+            'local_path': local_path,
+            'plan': plan,
+            'local_files': local_files,
+            'phase1_files': phase1_files,
+            'phase1_size': phase1_size,
+            'phase2_files': phase2_files,
+            'phase2_size': phase2_size,
+        }
+
+        if delta:
+            # Hash before the server goes down so it doesn't add to the downtime
+            # The manifest stays a FileTree for comparisons; synced_files collects the updates on top of it.
+            # A staged upload builds on the folder kept by the last swap, so it compares with that.
+            synced_key = local_name + PREVIOUS_SUFFIX if staged else local_name
+            info['synced_tree'] = manifest.get(synced_key, {}).get('files', FileTree())
+            info['synced_files'] = FileTreeOverlay(info['synced_tree'])
+            info['local_changed'], info['hashes'] = find_local_changes(
+                local_path, local_files, info['synced_tree'])
+            changed_files += len(info['local_changed'])
+            changed_size += plan.size(info['local_changed'])
+
+        folder_info.append(info)
+
+        total_files_phase1 += phase1_files
+        total_size_phase1 += phase1_size
+        total_files_phase2 += phase2_files
+        total_size_phase2 += phase2_size
+
+    if not folder_info:
+        console.print("[red]No world folders found in LocalServer![/red]")
+        return False
+
+    # Display summary
+    size_str_p1 = f"{total_size_phase1/(1024*1024*1024):.2f} GB" if total_size_phase1 > 1024*1024*1024 else f"{total_size_phase1/(1024*1024):.1f} MB"
+    size_str_p2 = f"{total_size_phase2/(1024*1024*1024):.2f} GB" if total_size_phase2 > 1024*1024*1024 else f"{total_size_phase2/(1024*1024):.1f} MB"
+
+    table = Table(title="Upload Summary", box=box.ROUNDED)
+    table.add_column("Phase", style="cyan")
+    table.add_column("Files", style="white", justify="right")
+    table.add_column("Size", style="green", justify="right")
+    table.add_column("Description", style="dim")
+
+    table.add_row("Phase 1", str(total_files_phase1), size_str_p1, "Critical (server offline)")
+    table.add_row("Phase 2", str(total_files_phase2), size_str_p2, "Non-critical (server online)")
+    table.add_row("", "", "", "", style="dim")
+    table.add_row("[bold]Total[/bold]", f"[bold]{total_files_phase1 + total_files_phase2}[/bold]",
+                  f"[bold]{(total_size_phase1 + total_size_phase2)/(1024*1024*1024):.2f} GB[/bold]", "")
+
+    console.print()
+    console.print(table)
+
+    if delta:
+        console.print(f"\n[cyan]Changed locally since the last sync: {changed_files} files ({format_size(changed_size)})[/cyan]")
+        console.print("[dim]Files the server rewrote since then are added once it has stopped.[/dim]")
+
+    if dry_run:
+        for info in folder_info:
+            plan = info['plan']
+            pending = info['local_changed'] if delta else plan.files
+            phase1_upload, phase2_upload = plan.phases(pending)
+            console.print(f"\n[cyan]{info['local']} → {info['remote']}:[/cyan] "
+                          f"Phase 1 {len(phase1_upload)} files ({format_size(plan.size(phase1_upload))}), "
+                          f"Phase 2 {len(phase2_upload)} files ({format_size(plan.size(phase2_upload))})")
+            for rel_path in sorted(pending)[:20]:
+                console.print(f"[dim]  {rel_path} ({format_size(plan.files[rel_path][0])})[/dim]")
+            if len(pending) > 20:
+                console.print(f"[dim]  ... and {len(pending) - 20} more[/dim]")
+        console.print("\n[yellow]Dry run: nothing was uploaded and the server was not stopped[/yellow]")
+        return True
+
+    if not auto_confirm:
+        console.print()
+        console.print("[yellow]This will:[/yellow]")
+        if staged:
+            uploaded = "changed data" if delta else f"{size_str_p1} + {size_str_p2}"
+            console.print(f"  1. Upload {uploaded} into staging folders (*{STAGED_SUFFIX}) while the server runs")
+            console.print(f"  2. Stop the server, keep the current world as *{PREVIOUS_SUFFIX} and swap the new one in")
+            console.print("  3. Start the production server")
+        elif delta:
+            console.print("  1. Stop the production server")
+            console.print("  2. Delete critical files on production that no longer exist locally")
+            console.print("  3. Upload changed critical data")
+            console.print("  4. Start the production server")
+            console.print("  5. Clean up and upload changed non-critical data (background)")
+        else:
+            console.print("  1. Stop the production server")
+            if resume:
+                console.print("  2. Keep the partly uploaded world folders on production")
+            else:
+                console.print("  2. Delete existing world folders on production")
+            console.print(f"  3. Upload {size_str_p1} of critical data")
+            console.print("  4. Start the production server")
+            console.print(f"  5. Upload {size_str_p2} of non-critical data (background)")
+        console.print()
+        if not Confirm.ask("[red]Proceed with world upload?[/red]"):
+            console.print("[yellow]Cancelled.[/yellow]")
+            return False
+
+    if not check_credentials():
+        return False
+
+    if staged:
+        return world_upload_staged(folder_info, manifest, region_baselines, block_baselines, delta, regions, resume)
+
+    journal = TransferJournal(os.path.join(local_base, TRANSFER_JOURNAL_FILES['upload']), resume=resume)
+    phase1_done = resume and journal.marked("upload-phase1")
+    if resume:
+        if not len(journal):
+            console.print("[yellow]No interrupted upload to resume, uploading without wiping production[/yellow]")
+        elif phase1_done:
+            console.print("[cyan]Resuming: Phase 1 already finished, continuing with Phase 2[/cyan]")
+        else:
+            console.print(f"[cyan]Resuming: {len(journal)} file(s) recorded by the interrupted upload[/cyan]")
+
+    # Phase 1: Stop server
+    if not phase1_done:
+        console.print("\n[bold]Phase 1: Stopping server...[/bold]")
+        if not stop_server_and_wait():
+            console.print("[red]Failed to stop server![/red]")
+            return False
+
+    # Connect via SFTP
+    try:
+        ssh, sftp = get_sftp_connection(announce=True)
+    except Exception as e:
+        console.print(f"[red]Error connecting: {e}[/red]")
+        return False
+
+    if delta:
+        # Compare with what production holds now that it has stopped writing. Only the
+        # critical part is listed here; non-critical folders are compared after the restart.
+        if not phase1_done:
+            console.print("\n[bold]Comparing critical data on production with the last sync...[/bold]")
+            total_files_phase1 = total_size_phase1 = 0
+            for info in folder_info:
+                sync_remote_folder(sftp, info, region_baselines, block_baselines, 'phase1_upload')
+                total_files_phase1 += len(info['phase1_upload'])
+                total_size_phase1 += info['plan'].size(info['phase1_upload'])
+            size_str_p1 = format_size(total_size_phase1)
+    else:
+        existing = []
+        if resume:
+            console.print("\n[dim]Keeping the partly uploaded world folders on production[/dim]")
+        else:
+            # Delete existing world folders on remote
+            console.print("\n[bold]Deleting existing world folders on production...[/bold]")
+            for info in folder_info:
+                try:
+                    sftp.stat(info['remote'])
+                    existing.append(info['remote'])
+                except IOError:
+                    pass
+        if existing:
+            console.print(f"[cyan]Deleting {', '.join(existing)}...[/cyan]")
+            if remove_remote_paths(existing, sftp):
+                console.print("[green]✓ Deleted existing world folders[/green]")
+            else:
+                console.print("[yellow]Could not fully delete the existing world folders[/yellow]")
+
+        for info in folder_info:
+            # Remote folder was wiped (or is being refilled), so the manifest starts over too
+            info['remote_files'] = FileTree()
+            info['synced_files'] = FileTreeOverlay()
+            info['hashes'] = {}
+            info['phase1_upload'], info['phase2_upload'] = info['plan'].phases()
+
+    failed = set()
+    if not phase1_done:
+        # Upload Phase 1 (critical files)
+        console.print(f"\n[bold]Uploading critical world data ({size_str_p1})...[/bold]\n")
+
+        with RichProgressTracker(total_files=total_files_phase1, total_size=total_size_phase1) as tracker:
+            with SFTPTransferPool(tracker, journal=journal) as pool:
+                for info in folder_info:
+                    local_path = info['local_path']
+                    remote_path = info['remote']
+
+                    console.print(f"[cyan]Uploading {info['local']} → {remote_path}...[/cyan]")
+
+                    # Create remote directory
+                    try:
+                        sftp.mkdir(remote_path)
+                    except IOError:
+                        pass
+
+                    upload_file_list(sftp, pool, local_path, remote_path, info['phase1_upload'],
+                                     info['local_files'], info['remote_files'],
+                                     region_baselines.setdefault(info['baselines'], {}) if regions else None,
+                                     block_baselines.setdefault(info['baselines'], {}))
+
+        record_upload_phase(pool, folder_info, 'phase1_upload', region_baselines if regions else None,
+                            block_baselines)
+        save_world_upload_manifest(manifest, folder_info)
+        if regions:
+            save_region_baselines(region_baselines)
+        save_block_baselines(block_baselines)
+
+        failed = set(pool.failed)
+        if not failed:
+            journal.mark("upload-phase1")
+        console.print("\n[bold green]✓ Phase 1 complete![/bold green]")
+
+        # Start server
+        console.print("\n[bold]Starting server...[/bold]")
+        if not server_start():
+            console.print("[red]Failed to start server![/red]")
+            # Continue with Phase 2 anyway
+
+    # Phase 2: Upload non-critical files
+    if delta:
+        console.print("\n[bold]Comparing non-critical data on production with the last sync...[/bold]")
+        total_files_phase2 = total_size_phase2 = 0
+        for info in folder_info:
+            sync_remote_folder(sftp, info, region_baselines, block_baselines, 'phase2_upload')
+            total_files_phase2 += len(info['phase2_upload'])
+            total_size_phase2 += info['plan'].size(info['phase2_upload'])
+        size_str_p2 = format_size(total_size_phase2)
+
+    if total_files_phase2 > 0:
+        console.print(f"\n[bold]Phase 2: Uploading non-critical data ({size_str_p2})...[/bold]")
+        console.print("[dim]Server is running while this uploads...[/dim]\n")
+
+        with RichProgressTracker(total_files=total_files_phase2, total_size=total_size_phase2) as tracker:
+            with SFTPTransferPool(tracker, journal=journal) as pool:
+                for info in folder_info:
+                    local_path = info['local_path']
+                    remote_path = info['remote']
+
+                    upload_file_list(sftp, pool, local_path, remote_path, info['phase2_upload'],
+                                     info['local_files'], info['remote_files'],
+                                     region_baselines.setdefault(info['baselines'], {}) if regions else None,
+                                     block_baselines.setdefault(info['baselines'], {}))
+
+        record_upload_phase(pool, folder_info, 'phase2_upload', region_baselines if regions else None,
+                            block_baselines)
+        save_world_upload_manifest(manifest, folder_info)
+        if regions:
+            save_region_baselines(region_baselines)
+        save_block_baselines(block_baselines)
+
+        failed |= pool.failed
+        console.print("\n[bold green]✓ Phase 2 complete![/bold green]")
+
+    release_sftp_connection(ssh, sftp)
+
+    # A clean run leaves nothing to resume; otherwise --resume picks up the failures
+    if failed:
+        journal.close()
+        console.print(f"[yellow]{len(failed)} file(s) failed; run world-upload --resume to retry them[/yellow]")
+    else:
+        journal.clear()
+
+    console.print("\n" + "="*50)
+    console.print("[bold green]✓ World upload complete![/bold green]")
+    console.print("="*50)
+
+    return True
+
+
+# A staged upload fills <folder>.next while the server runs, then swaps it in;
+# the world it replaced stays as <folder>.prev for world-rollback
+STAGED_SUFFIX = ".next"
+PREVIOUS_SUFFIX = ".prev"
+
+
+def world_upload_staged(folder_info, manifest, region_baselines, block_baselines, delta, regions, resume):
+    """Upload world folders into staging copies, then swap them in with a short stop.
+
+    Each folder is filled as <folder>.next with the server still running. A
+    full upload starts it empty. A delta upload starts from what an earlier
+    staged run left: an interrupted <folder>.next, or else <folder>.prev (the
+    world the last swap replaced), and only sends what differs from the
+    manifest entry that world was synced as (kept as "<folder>.prev"). Once
+    every file is in, the server is stopped, <folder> is renamed to
+    <folder>.prev and <folder>.next to <folder>, and the server is started
+    again. If anything fails to upload, production is left untouched.
+
+    Region and block baselines describe a folder's files, so they move with
+    it: kept under "<folder>.next" while it is staged and rotated with the
+    manifest entries on the swap.
+    """
+    local_base = LOCALSERVER_DIR
+    journal = TransferJournal(os.path.join(local_base, TRANSFER_JOURNAL_FILES['staged']), resume=resume)
+    if resume and len(journal):
+        console.print(f"[cyan]Resuming: {len(journal)} file(s) recorded by the interrupted upload[/cyan]")
+
+    try:
+        ssh, sftp = get_sftp_connection(announce=True)
+    except Exception as e:
+        console.print(f"[red]Error connecting: {e}[/red]")
+        return False
+
+    baselines = (region_baselines, block_baselines)
+    console.print("\n[bold]Preparing staging folders (server stays online)...[/bold]")
+    for info in folder_info:
+        info['live'] = info['remote']
+        info['remote'] = staging = info['live'] + STAGED_SUFFIX
+        info['baselines'] = info['local'] + STAGED_SUFFIX
+        previous = info['live'] + PREVIOUS_SUFFIX
+        if remote_path_exists(sftp, staging):
+            if not (delta or resume):
+                console.print(f"[cyan]Clearing {staging} left by an earlier run...[/cyan]")
+                if not remove_remote_paths([staging], sftp):
+                    console.print(f"[red]Could not clear {staging}[/red]")
+                    release_sftp_connection(ssh, sftp)
+                    return False
+                move_folder_entries(baselines, [(None, info['baselines'])])
+        elif delta and remote_path_exists(sftp, previous):
+            console.print(f"[cyan]Starting {staging} from {previous}...[/cyan]")
+            if not rename_remote_paths([(previous, staging)], sftp):
+                console.print(f"[red]Could not rename {previous} to {staging}; production was not touched[/red]")
+                release_sftp_connection(ssh, sftp)
+                return False
+            move_folder_entries(baselines, [(info['local'] + PREVIOUS_SUFFIX, info['baselines'])])
+        else:
+            move_folder_entries(baselines, [(None, info['baselines'])])
+        if not regions:
+            region_baselines.pop(info['baselines'], None)  # Not kept up to date by this run
+        try:
+            sftp.mkdir(staging)
+        except IOError:
+            pass  # Directory exists
+
+    if delta:
+        for info in folder_info:
+            sync_remote_folder(sftp, info, region_baselines, block_baselines)
+    else:
+        for info in folder_info:
+            info['remote_files'] = FileTree()
+            info['synced_files'] = FileTreeOverlay()
+            info['hashes'] = {}
+            info['phase1_upload'], info['phase2_upload'] = info['plan'].phases()
+
+    # Phases only matter while the server is down, so everything goes up at once
+    for info in folder_info:
+        info['staged_upload'] = info['phase1_upload'] + info['phase2_upload']
+    total_files = sum(len(info['staged_upload']) for info in folder_info)
+    total_size = sum(info['plan'].size(info['staged_upload']) for info in folder_info)
+
+    console.print(f"\n[bold]Uploading {total_files} files ({format_size(total_size)}) into staging...[/bold]\n")
+    with RichProgressTracker(total_files=total_files, total_size=total_size) as tracker:
+        with SFTPTransferPool(tracker, journal=journal) as pool:
+            for info in folder_info:
+                upload_file_list(sftp, pool, info['local_path'], info['remote'], info['staged_upload'],
+                                 info['local_files'], info['remote_files'],
+                                 region_baselines.setdefault(info['baselines'], {}) if regions else None,
+                                 block_baselines.setdefault(info['baselines'], {}))
+    record_upload_phase(pool, folder_info, 'staged_upload', region_baselines if regions else None, block_baselines)
+
+    if pool.failed:
+        journal.close()
+        release_sftp_connection(ssh, sftp)
+        save_region_baselines(region_baselines)
+        save_block_baselines(block_baselines)
+        console.print(f"[yellow]{len(pool.failed)} file(s) failed; production was not touched. "
+                      f"Run world-upload --staged --resume to retry them[/yellow]")
+        return False
 
-    # Download each folder
-    console.print("\n[bold]Downloading world data...[/bold]\n")
+    # Make room for the world being replaced before the server goes down
+    stale = [info['live'] + PREVIOUS_SUFFIX for info in folder_info
+             if remote_path_exists(sftp, info['live'] + PREVIOUS_SUFFIX)]
+    if stale and not remove_remote_paths(stale, sftp):
+        journal.close()
+        release_sftp_connection(ssh, sftp)
+        console.print(f"[red]Could not remove {', '.join(stale)}; the staged world was not swapped in[/red]")
+        return False
 
-    with RichProgressTracker(total_files=total_files, total_size=total_size) as tracker:
-        for info in folder_info:
-            local_path = os.path.join(local_base, info['local'])
+    console.print("\n[bold]Swapping in the new world...[/bold]")
+    if not stop_server_and_wait():
+        journal.close()
+        release_sftp_connection(ssh, sftp)
+        console.print("[red]Failed to stop server! The staged world was not swapped in[/red]")
+        return False
 
-            if os.path.exists(local_path):
-                shutil.rmtree(local_path)
+    stopped = time.time()
+    live = [info['live'] for info in folder_info if remote_path_exists(sftp, info['live'])]
+    swapped = rename_remote_paths([(path, path + PREVIOUS_SUFFIX) for path in live], sftp) \
+        and rename_remote_paths([(info['remote'], info['live']) for info in folder_info], sftp)
+    if not swapped:
+        # Put back whatever was moved aside so the server starts on the old world
+        for path in live:
+            if not remote_path_exists(sftp, path):
+                rename_remote_paths([(path + PREVIOUS_SUFFIX, path)], sftp)
+        journal.close()
+        save_region_baselines(region_baselines)
+        save_block_baselines(block_baselines)
+        console.print("[red]Swap failed; starting the server on the previous world[/red]")
+        server_start()
+        release_sftp_connection(ssh, sftp)
+        return False
+    for info in folder_info:
+        info['remote'] = info['live']
+    console.print(f"[green]✓ Swapped {len(folder_info)} world folder(s) in {time.time() - stopped:.1f}s[/green]")
 
-            console.print(f"[cyan]Downloading {info['remote']}...[/cyan]")
-            download_directory_recursive(sftp, info['remote'], local_path, tracker)
+    if not server_start():
+        console.print("[red]Failed to start server![/red]")
 
-    sftp.close()
-    ssh.close()
+    # The replaced world keeps its manifest entry and baselines, for rollbacks and the next staged delta
+    for info in folder_info:
+        local_name = info['local']
+        kept = local_name if info['live'] in live else None
+        move_folder_entries([manifest, *baselines], [(kept, local_name + PREVIOUS_SUFFIX)])
+        move_folder_entries(baselines, [(info['baselines'], local_name)])
+        info['baselines'] = local_name
+    save_world_upload_manifest(manifest, folder_info)
+    save_region_baselines(region_baselines)
+    save_block_baselines(block_baselines)
+    journal.clear()
+    release_sftp_connection(ssh, sftp)
 
     console.print("\n" + "="*50)
-    console.print("[bold green]✓ World download complete![/bold green]")
-    console.print(f"\n[cyan]Downloaded {total_files} files ({size_str})[/cyan]")
-    console.print(f"[cyan]Location: {local_base}[/cyan]")
+    console.print("[bold green]✓ World upload complete![/bold green]")
+    if live:
+        console.print(f"[dim]The replaced world is kept as {', '.join(path + PREVIOUS_SUFFIX for path in live)}; "
+                      f"run world-rollback to swap it back[/dim]")
     console.print("="*50)
-
     return True
 
 
-def world_upload(auto_confirm=False):
-    """Upload world data from LocalServer to production server.
+def world_rollback(auto_confirm=False):
+    """Swap each world folder with the <folder>.prev kept by the last staged upload.
 
-    Two-phase upload:
-    - Phase 1 (blocking): Critical world data, then start server
-    - Phase 2 (background): Non-critical data (DistantHorizons, BlueMap)
+    The server is stopped only for the renames. The world that was live
+    becomes <folder>.prev, so running this again undoes the rollback. The
+    swapped folders' sync manifest entries and region and block baselines are
+    swapped with them.
     """
     from rich.prompt import Confirm
-    import shutil
 
-    WORLD_FOLDERS = [
-        ("world-production", "/world"),
-        ("world-production_nether", "/world_nether"),
-        ("world-production_the_end", "/world_the_end"),
-    ]
+    if not check_credentials():
+        return False
 
-    local_base = LOCALSERVER_DIR
+    try:
+        ssh, sftp = get_sftp_connection(announce=True)
+    except Exception as e:
+        console.print(f"[red]Error connecting: {e}[/red]")
+        return False
 
-    console.print(Panel(
-        "[bold red]Upload World to Production[/bold red]\n\n"
-        "This will upload world data from LocalServer to Bloom.host.\n"
-        "[yellow]⚠ This will OVERWRITE the production world![/yellow]\n\n"
-        "Phase 1: Upload critical data → Start server\n"
-        "Phase 2: Upload non-critical data (background)",
-        title="[red]World Upload[/red]",
-        border_style="red"
-    ))
+    folders = [(remote_path, local_name) for remote_path, local_name in WORLD_FOLDERS
+               if remote_path_exists(sftp, remote_path + PREVIOUS_SUFFIX)]
+    if not folders:
+        console.print("[yellow]No previous world to roll back to (it is kept by world-upload --staged)[/yellow]")
+        release_sftp_connection(ssh, sftp)
+        return False
 
-    if not os.path.exists(local_base):
-        console.print(f"[red]Error: LocalServer directory not found![/red]")
-        console.print(f"[yellow]Expected: {local_base}[/yellow]")
+    for remote_path, local_name in folders:
+        console.print(f"[cyan]{remote_path}{PREVIOUS_SUFFIX} → {remote_path}[/cyan]")
+    if not auto_confirm and not Confirm.ask("[red]Stop the server and swap the previous world back in?[/red]"):
+        console.print("[yellow]Cancelled.[/yellow]")
+        release_sftp_connection(ssh, sftp)
         return False
 
-    # Check what we're uploading
-    folder_info = []
-    total_files_phase1 = 0
-    total_size_phase1 = 0
-    total_files_phase2 = 0
-    total_size_phase2 = 0
+    if not stop_server_and_wait():
+        console.print("[red]Failed to stop server![/red]")
+        release_sftp_connection(ssh, sftp)
+        return False
 
-    for local_name, remote_path in WORLD_FOLDERS:
-        local_path = os.path.join(local_base, local_name)
-        if not os.path.exists(local_path):
-            console.print(f"[dim]  {local_name} (not found, skipping)[/dim]")
-            continue
+    swap = ".rollback"
+    live = [remote_path for remote_path, _ in folders if remote_path_exists(sftp, remote_path)]
+    success = rename_remote_paths([(path, path + swap) for path in live], sftp) \
+        and rename_remote_paths([(path + PREVIOUS_SUFFIX, path) for path, _ in folders], sftp) \
+        and rename_remote_paths([(path + swap, path + PREVIOUS_SUFFIX) for path in live], sftp)
+    if success:
+        console.print(f"[green]✓ Rolled back {len(folders)} world folder(s)[/green]")
+    else:
+        console.print("[red]Rollback did not finish; check the world folders on production[/red]")
 
-        # Count files, separating critical from non-critical
-        phase1_files = 0
-        phase1_size = 0
-        phase2_files = 0
-        phase2_size = 0
+    release_sftp_connection(ssh, sftp)
+    if not server_start():
+        console.print("[red]Failed to start server![/red]")
 
-        for root, dirs, files in os.walk(local_path):
-            # Skip non-critical folders
-            rel_root = os.path.relpath(root, local_path)
-            skip_folder = any(nc in rel_root.split(os.sep) for nc in NON_CRITICAL_FOLDERS)
+    if not success:
+        return False
 
-            for f in files:
-                file_path = os.path.join(root, f)
-                file_size = os.path.getsize(file_path)
+    manifest = load_sync_manifest()
+    region_baselines = load_region_baselines()
+    block_baselines = load_block_baselines()
+    for _, local_name in folders:
+        move_folder_entries([manifest, region_baselines, block_baselines],
+                            [(local_name, local_name + PREVIOUS_SUFFIX), (local_name + PREVIOUS_SUFFIX, local_name)])
+    save_sync_manifest(manifest)
+    save_region_baselines(region_baselines)
+    save_block_baselines(block_baselines)
+    return True
 
-                if skip_folder or f in NON_CRITICAL_FILES:
-                    phase2_files += 1
-                    phase2_size += file_size
-                else:
-                    phase1_files += 1
-                    phase1_size += file_size
 
-        folder_info.append({
-            'local': local_name,
-            'remote': remote_path,
-            'local_path': local_path,
-            'phase1_files': phase1_files,
-            'phase1_size': phase1_size,
-            'phase2_files': phase2_files,
-            'phase2_size': phase2_size,
-        })
+def move_folder_entries(stores, moves):
+    """Move per-folder entries (sync manifest, region or block baselines) after remote renames.
 
-        total_files_phase1 += phase1_files
-        total_size_phase1 += phase1_size
-        total_files_phase2 += phase2_files
-        total_size_phase2 += phase2_size
+    Args:
+        stores: Dicts keyed by folder name
+        moves: (old key, new key) pairs. All old entries are taken out before
+            any is put back, so two folders can swap. A new key whose old key
+            is None or has no entry is removed.
+    """
+    for store in stores:
+        moved = [(new, store.pop(old, None) if old is not None else None) for old, new in moves]
+        for new, entry in moved:
+            if entry is None:
+                store.pop(new, None)
+            else:
+                store[new] = entry
 
-    if not folder_info:
-        console.print("[red]No world folders found in LocalServer![/red]")
-        return False
 
-    # Display summary
-    size_str_p1 = f"{total_size_phase1/(1024*1024*1024):.2f} GB" if total_size_phase1 > 1024*1024*1024 else f"{total_size_phase1/(1024*1024):.1f} MB"
-    size_str_p2 = f"{total_size_phase2/(1024*1024*1024):.2f} GB" if total_size_phase2 > 1024*1024*1024 else f"{total_size_phase2/(1024*1024):.1f} MB"
+def sync_remote_folder(sftp, info, region_baselines, block_baselines, key=None):
+    """Compare a remote world folder with the local plan for a delta upload.
 
-    table = Table(title="Upload Summary", box=box.ROUNDED)
-    table.add_column("Phase", style="cyan")
-    table.add_column("Files", style="white", justify="right")
-    table.add_column("Size", style="green", justify="right")
-    table.add_column("Description", style="dim")
+    With key 'phase1_upload' only the critical part of the folder is listed
+    (non-critical subdirectories are left for later), so the scan done while
+    the server is down stays short; 'phase2_upload' then lists those
+    subdirectories once the server is back. Without a key the whole folder is
+    compared at once. Stale remote files of the part compared are deleted,
+    info[key] (or both phase lists) gets the files to send, and the folder's
+    synced entries are updated for files that are gone or were only touched.
+    """
+    unlisted = []
+    if key == 'phase1_upload':
+        pruned = []
+
+        def prune(rel_dir):
+            if rel_dir.rsplit("/", 1)[-1] in NON_CRITICAL_FOLDERS:
+                pruned.append(rel_dir)
+                return True
+            return False
 
-    table.add_row("Phase 1", str(total_files_phase1), size_str_p1, "Critical (server offline)")
-    table.add_row("Phase 2", str(total_files_phase2), size_str_p2, "Non-critical (server online)")
-    table.add_row("", "", "", "", style="dim")
-    table.add_row("[bold]Total[/bold]", f"[bold]{total_files_phase1 + total_files_phase2}[/bold]",
-                  f"[bold]{(total_size_phase1 + total_size_phase2)/(1024*1024*1024):.2f} GB[/bold]", "")
+        remote_files = scan_remote_files(sftp, info['remote'], prune, unlisted)
+        info['pruned_dirs'] = pruned
+    elif key == 'phase2_upload' and info.get('pruned_dirs') is not None:
+        entries = list(info['remote_files'].items())
+        for rel_dir in info['pruned_dirs']:
+            entries.extend((f"{rel_dir}/{rel_path}", entry)
+                           for rel_path, entry in scan_remote_files(sftp, f"{info['remote']}/{rel_dir}",
+                                                                    failed=unlisted).items())
+        remote_files = FileTree(entries)
+    else:
+        remote_files = scan_remote_files(sftp, info['remote'], failed=unlisted)
+    if unlisted:
+        # Their files look missing, so they are sent again; deleting only ever
+        # touches files that were listed
+        console.print(f"[yellow]Could not list {len(unlisted)} folder(s) in {info['remote']}, "
+                      f"so their files are uploaded again: {format_remote_dirs(unlisted)}[/yellow]")
+
+    upload, deleted = compute_upload_delta(
+        info['local_files'], info['local_changed'], remote_files, info['synced_tree'])
+    deleted = [rel_path for rel_path in deleted if not info['plan'].skips(rel_path)]
+    info['remote_files'] = remote_files
+    phase1_upload, phase2_upload = info['plan'].phases(upload)
+    if key == 'phase1_upload':
+        upload, deleted = phase1_upload, [rel_path for rel_path in deleted if not is_non_critical(rel_path)]
+        info[key] = upload
+    elif key == 'phase2_upload':
+        upload, deleted = phase2_upload, [rel_path for rel_path in deleted if is_non_critical(rel_path)]
+        info[key] = upload
+    else:
+        info['phase1_upload'], info['phase2_upload'] = phase1_upload, phase2_upload
 
-    console.print()
-    console.print(table)
+    console.print(f"[cyan]{info['remote']}: {len(upload)} to upload, {len(deleted)} to delete[/cyan]")
+    if deleted and not delete_remote_paths([f"{info['remote']}/{rel_path}" for rel_path in deleted], sftp):
+        console.print(f"[yellow]Could not delete some stale files in {info['remote']}[/yellow]")
 
-    if not auto_confirm:
-        console.print()
-        console.print("[yellow]This will:[/yellow]")
-        console.print("  1. Stop the production server")
-        console.print("  2. Delete existing world folders on production")
-        console.print(f"  3. Upload {size_str_p1} of critical data")
-        console.print("  4. Start the production server")
-        console.print(f"  5. Upload {size_str_p2} of non-critical data (background)")
-        console.print()
-        if not Confirm.ask("[red]Proceed with world upload?[/red]"):
-            console.print("[yellow]Cancelled.[/yellow]")
-            return False
+    for rel_path in deleted:
+        region_baselines.get(info['baselines'], {}).pop(rel_path, None)
+        block_baselines.get(info['baselines'], {}).pop(rel_path, None)
 
-    if not check_credentials():
-        return False
+    # Forget files that are gone, and remember the new mtime of files
+    # that were only touched so they aren't hashed again next time
+    synced_files = info['synced_files']
+    for rel_path in info['synced_tree'].difference(info['local_files']):
+        synced_files.pop(rel_path, None)
+    for rel_path, digest in info['hashes'].items():
+        if rel_path in synced_files and rel_path not in info['local_changed']:
+            synced_files[rel_path] = synced_files[rel_path][:2] + [info['local_files'][rel_path][1], digest]
 
-    # Phase 1: Stop server
-    console.print("\n[bold]Phase 1: Stopping server...[/bold]")
-    if not server_stop():
-        console.print("[red]Failed to stop server![/red]")
-        return False
 
-    # Wait for server to fully stop
-    import time
-    console.print("[cyan]Waiting for server to stop...[/cyan]")
-    time.sleep(5)
+def record_upload_phase(pool, folder_info, key, region_baselines, block_baselines):
+    """Check and record the files an upload pool just sent (info[key] of each folder).
 
-    # Connect via SFTP
-    console.print(f"\n[cyan]Connecting to {hostname}:{port}...[/cyan]")
+    Updates each folder's synced entries, and the region baselines (if given)
+    and block baselines; the caller saves them.
+    """
+    check_uploaded_files(pool, folder_info, key)
+    for info in folder_info:
+        record_uploaded_files(info['synced_files'], pool, info['remote'], info['local_files'],
+                              info[key], info['hashes'])
+        if region_baselines is not None:
+            update_region_baselines(region_baselines.setdefault(info['baselines'], {}), pool, info['local_path'],
+                                    info['remote'], info[key], "upload")
+        update_block_baselines(block_baselines.setdefault(info['baselines'], {}), pool, info['local_path'],
+                               info['remote'], info[key], "upload")
 
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
-    try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        console.print("[green]Connected![/green]")
-        sftp = ssh.open_sftp()
-    except Exception as e:
-        console.print(f"[red]Error connecting: {e}[/red]")
-        return False
+def check_uploaded_files(pool, folder_info, key):
+    """Compare what the server reports after an upload phase with each folder's plan.
 
-    # Delete existing world folders on remote
-    console.print("\n[bold]Deleting existing world folders on production...[/bold]")
+    Files whose size doesn't match are counted as failed (and left out of the
+    manifest) so --resume or the next delta upload sends them again.
+    """
     for info in folder_info:
-        remote_path = info['remote']
-        console.print(f"[cyan]Deleting {remote_path}...[/cyan]")
-        try:
-            # Recursive delete
-            def rm_recursive(path):
-                try:
-                    for item in sftp.listdir_attr(path):
-                        item_path = f"{path}/{item.filename}"
-                        if item.st_mode & 0o40000:
-                            rm_recursive(item_path)
-                        else:
-                            sftp.remove(item_path)
-                    sftp.rmdir(path)
-                except IOError:
-                    pass
+        mismatched = info['plan'].verify(pool.uploaded, info['remote'], info[key])
+        for rel_path in mismatched:
+            remote_item = f"{info['remote']}/{rel_path}"
+            pool.uploaded.pop(remote_item, None)
+            pool.failed.add(remote_item)
+        if mismatched:
+            console.print(f"[yellow]{len(mismatched)} file(s) in {info['remote']} changed locally while uploading "
+                          f"and don't match the server copy[/yellow]")
 
-            rm_recursive(remote_path)
-            console.print(f"[green]✓ Deleted {remote_path}[/green]")
-        except Exception as e:
-            console.print(f"[yellow]Could not delete {remote_path}: {e}[/yellow]")
 
-    # Upload Phase 1 (critical files)
-    console.print(f"\n[bold]Uploading critical world data ({size_str_p1})...[/bold]\n")
+def split_archive_upload(rel_paths, local_files):
+    """Pick which files to bundle into an archive upload (see UPLOAD_MODE).
 
-    with RichProgressTracker(total_files=total_files_phase1, total_size=total_size_phase1) as tracker:
-        for info in folder_info:
-            local_path = info['local_path']
-            remote_path = info['remote']
+    Many small files are bound by per-file round trips, so in auto mode files
+    up to ARCHIVE_MAX_FILE_SIZE are bundled once there are ARCHIVE_MIN_FILES of
+    them; big files still go through the pool in parallel. Archives need the
+    Pterodactyl API to unpack them.
 
-            console.print(f"[cyan]Uploading {info['local']} → {remote_path}...[/cyan]")
+    Returns:
+        Tuple of (relative paths to archive, relative paths to send one by one)
+    """
+    if UPLOAD_MODE == "files" or not PTERODACTYL_API_KEY or not PTERODACTYL_SERVER_ID:
+        return [], list(rel_paths)
+    if UPLOAD_MODE == "archive":
+        return list(rel_paths), []
+
+    small = [rel_path for rel_path in rel_paths if local_files[rel_path][0] <= ARCHIVE_MAX_FILE_SIZE]
+    if len(small) < ARCHIVE_MIN_FILES:
+        return [], list(rel_paths)
+    small_set = set(small)
+    return small, [rel_path for rel_path in rel_paths if rel_path not in small_set]
+
+
+def upload_archive(sftp, pool, local_path, remote_path, rel_paths, local_files):
+    """Upload files as one tar.gz and have the server unpack it in place.
+
+    The archive is compressed straight into the remote file as it is written,
+    so nothing is staged on local disk. After /files/decompress the archive is
+    deleted and the folders that received files are listed with
+    walk_remote_tree() to fill `pool.uploaded`. Returns False if the server could not unpack it, in which
+    case the caller should send the files one by one instead.
+    """
+    total_size = sum(local_files[rel_path][0] for rel_path in rel_paths)
+    archive_name = f".upload-{datetime.now().strftime('%Y%m%d_%H%M%S')}.tar.gz"
+    remote_archive = f"{remote_path}/{archive_name}"
+    tracker = pool.tracker
+    task_id = tracker.start_file(f"{archive_name} ({len(rel_paths)} files)", total_size)
 
-            # Create remote directory
-            try:
-                sftp.mkdir(remote_path)
-            except IOError:
-                pass
+    sent = 0
 
-            # Upload recursively, skipping non-critical files
-            skip_list = NON_CRITICAL_FILES + NON_CRITICAL_FOLDERS
-            upload_directory_recursive(sftp, local_path, remote_path, tracker, skip_files=skip_list)
+    class ProgressReader:
+        def __init__(self, f):
+            self.f = f
 
-    console.print("\n[bold green]✓ Phase 1 complete![/bold green]")
+        def read(self, size=-1):
+            nonlocal sent
+            data = self.f.read(size)
+            sent += len(data)
+            tracker.update(sent, total_size, task_id)
+            return data
 
-    # Start server
-    console.print("\n[bold]Starting server...[/bold]")
-    if not server_start():
-        console.print("[red]Failed to start server![/red]")
-        # Continue with Phase 2 anyway
+    try:
+        with sftp.open(remote_archive, "wb", bufsize=32768) as remote_file:
+            remote_file.set_pipelined(True)
+            with gzip.GzipFile(fileobj=remote_file, mode="wb", compresslevel=6) as gz:
+                with tarfile.open(fileobj=gz, mode="w|") as tar:
+                    for rel_path in rel_paths:
+                        local_item = os.path.join(local_path, *rel_path.split("/"))
+                        tarinfo = tar.gettarinfo(local_item, arcname=rel_path)
+                        with open(local_item, "rb") as f:
+                            tar.addfile(tarinfo, ProgressReader(f))
+    except Exception as e:
+        console.print(f"[yellow]Archive upload failed, sending files one by one: {e}[/yellow]")
+        tracker.discard(task_id)
+        try:
+            sftp.remove(remote_archive)
+        except IOError:
+            pass
+        return False
 
-    # Phase 2: Upload non-critical files
-    if total_files_phase2 > 0:
-        console.print(f"\n[bold]Phase 2: Uploading non-critical data ({size_str_p2})...[/bold]")
-        console.print("[dim]Server is running while this uploads...[/dim]\n")
+    result = pterodactyl_call(pterodactyl.decompress_file, remote_path, archive_name)
+    try:
+        sftp.remove(remote_archive)
+    except IOError:
+        pass
+    if result is None:
+        console.print("[yellow]Server could not unpack the archive, sending files one by one[/yellow]")
+        tracker.discard(task_id)
+        return False
 
-        with RichProgressTracker(total_files=total_files_phase2, total_size=total_size_phase2) as tracker:
-            for info in folder_info:
-                local_path = info['local_path']
-                remote_path = info['remote']
-
-                # Upload only non-critical files
-                for nc_file in NON_CRITICAL_FILES:
-                    nc_local = os.path.join(local_path, nc_file)
-                    if os.path.exists(nc_local):
-                        nc_remote = f"{remote_path}/{nc_file}"
-                        file_size = os.path.getsize(nc_local)
-                        tracker.start_file(nc_file, file_size)
-                        try:
-                            sftp.put(nc_local, nc_remote, callback=progress_callback(tracker))
-                            tracker.file_complete(success=True)
-                        except Exception as e:
-                            tracker.file_complete(success=False)
-                            console.print(f"[red]Error uploading {nc_file}: {e}[/red]")
-
-                # Upload non-critical folders
-                for nc_folder in NON_CRITICAL_FOLDERS:
-                    nc_local = os.path.join(local_path, nc_folder)
-                    if os.path.exists(nc_local):
-                        nc_remote = f"{remote_path}/{nc_folder}"
-                        upload_directory_recursive(sftp, nc_local, nc_remote, tracker)
+    # Confirm what landed, walking only the folders that received files;
+    # anything missing (or in a folder that couldn't be listed) is re-sent
+    archived_dirs = set()
+    for rel_path in rel_paths:
+        parts = rel_path.split("/")[:-1]
+        archived_dirs.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+    wanted = set(rel_paths)
+    landed = set()
+    unlisted = []
+    for rel_path, is_dir, size, mtime in walk_remote_tree(remote_path, sftp,
+                                                          prune=lambda rel_dir: rel_dir not in archived_dirs,
+                                                          failed=unlisted):
+        if not is_dir and rel_path in wanted and size == local_files[rel_path][0]:
+            pool.uploaded[f"{remote_path}/{rel_path}"] = [size, mtime]
+            landed.add(rel_path)
+    missing = [rel_path for rel_path in rel_paths if rel_path not in landed]
+    if unlisted:
+        console.print(f"[yellow]Could not list {len(unlisted)} folder(s) after unpacking {archive_name}, so "
+                      f"their files are sent again: {format_remote_dirs(unlisted)}[/yellow]")
+
+    tracker.file_complete(success=True, task_id=task_id, count=len(rel_paths) - len(missing))
+    if missing:
+        console.print(f"[yellow]{len(missing)} file(s) missing after unpacking {archive_name}, re-sending[/yellow]")
+        for rel_path in missing:
+            pool.put(os.path.join(local_path, *rel_path.split("/")), f"{remote_path}/{rel_path}",
+                     rel_path, local_files[rel_path][0])
+    return True
 
-        console.print("\n[bold green]✓ Phase 2 complete![/bold green]")
 
-    sftp.close()
-    ssh.close()
+def upload_file_list(sftp, pool, local_path, remote_path, rel_paths, local_files, remote_files, region_baselines=None,
+                     block_baselines=None):
+    """Queue a list of files (relative paths) from a local folder on an upload pool.
 
-    console.print("\n" + "="*50)
-    console.print("[bold green]✓ World upload complete![/bold green]")
-    console.print("="*50)
+    Remote directories that don't already hold files (per `remote_files`) are
+    created first, parents before children. If `region_baselines` (relative
+    path -> packed baseline) is given, .mca files that already exist on the
+    server are patched chunk by chunk instead of sent whole. Likewise, large
+    files with a block baseline (relative path -> entry) that still matches the
+    remote copy only have their changed blocks written. Files picked by
+    split_archive_upload() are sent as one archive on `sftp` while the pool
+    works through the rest.
+    """
+    def parent_dirs(paths):
+        dirs = set()
+        for rel_path in paths:
+            parts = rel_path.split("/")[:-1]
+            for i in range(1, len(parts) + 1):
+                dirs.add("/".join(parts[:i]))
+        return dirs
+
+    existing_dirs = parent_dirs(remote_files)
+    needed_dirs = parent_dirs(rel_paths)
+
+    for rel_dir in sorted(needed_dirs - existing_dirs, key=lambda d: d.count("/")):
+        try:
+            sftp.mkdir(f"{remote_path}/{rel_dir}")
+        except IOError:
+            pass  # Directory exists
+
+    block_hashes = {}
+    if block_baselines:
+        for rel_path in rel_paths:
+            if rel_path in remote_files:
+                hashes = unpack_block_baseline(block_baselines.get(rel_path), remote_files[rel_path][:2])
+                if hashes is not None:
+                    block_hashes[rel_path] = hashes
+
+    def patchable(rel_path):
+        if rel_path in block_hashes:
+            return True
+        return region_baselines is not None and rel_path.endswith(".mca") and rel_path in remote_files
+
+    archived, one_by_one = split_archive_upload([rel_path for rel_path in rel_paths if not patchable(rel_path)],
+                                                local_files)
+    one_by_one += [rel_path for rel_path in rel_paths if patchable(rel_path)]
+
+    for rel_path in one_by_one:
+        local_item = os.path.join(local_path, *rel_path.split("/"))
+        remote_item = f"{remote_path}/{rel_path}"
+        if rel_path in block_hashes:
+            pool.put_blocks(local_item, remote_item, rel_path, local_files[rel_path][0], block_hashes[rel_path],
+                            remote_files[rel_path][:2])
+        elif patchable(rel_path):
+            pool.put_region(local_item, remote_item, rel_path, local_files[rel_path][0],
+                            unpack_region_baseline(region_baselines.get(rel_path)))
+        else:
+            pool.put(local_item, remote_item, rel_path, local_files[rel_path][0])
+
+    if archived and not upload_archive(sftp, pool, local_path, remote_path, archived, local_files):
+        for rel_path in archived:
+            pool.put(os.path.join(local_path, *rel_path.split("/")), f"{remote_path}/{rel_path}",
+                     rel_path, local_files[rel_path][0])
 
-    return True
+
+def save_world_upload_manifest(manifest, folder_info):
+    """Store the synced file entries of each uploaded world folder in the manifest."""
+    synced_at = datetime.now().isoformat(timespec='seconds')
+    for info in folder_info:
+        manifest[info['local']] = {'synced': synced_at, 'files': info['synced_files'].tree()}
+    save_sync_manifest(manifest)
 
 
 def deploy_configs():
@@ -1662,16 +5839,8 @@ def list_remote_files():
     if not check_credentials():
         return
 
-    console.print(f"[cyan]Connecting to {hostname}:{port}...[/cyan]")
-
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
     try:
-        ssh.connect(hostname, port=port, username=username, password=password)
-        console.print("[green]Connected![/green]\n")
-
-        sftp = ssh.open_sftp()
+        ssh, sftp = get_sftp_connection(announce=True)
 
         files = sftp.listdir_attr("/")
 
@@ -1687,8 +5856,7 @@ def list_remote_files():
 
         console.print(table)
 
-        sftp.close()
-        ssh.close()
+        release_sftp_connection(ssh, sftp)
 
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -1858,18 +6026,6 @@ def backup_menu():
 # Backup Management Functions
 # =============================================================================
 
-def get_sftp_connection():
-    """Create and return an SFTP connection"""
-    if not check_credentials():
-        return None, None
-
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(hostname, port=port, username=username, password=password)
-    sftp = ssh.open_sftp()
-    return ssh, sftp
-
-
 def backup_list():
     """List all available backups"""
     console.print("[cyan]Fetching backup list...[/cyan]\n")
@@ -1924,8 +6080,7 @@ def backup_list():
         except IOError:
             pass
 
-        sftp.close()
-        ssh.close()
+        release_sftp_connection(ssh, sftp)
 
         if not backups:
             console.print("[yellow]No backups found.[/yellow]")
@@ -1959,8 +6114,7 @@ def backup_list():
 
     except Exception as e:
         console.print(f"[red]Error listing backups: {e}[/red]")
-        sftp.close()
-        ssh.close()
+        release_sftp_connection(ssh, sftp)
         return None
 
 
@@ -1999,12 +6153,13 @@ def backup_snapshot(comment=""):
     return False
 
 
-def backup_restore(backup_index=None, auto_confirm=False):
-    """Restore from a backup"""
-    import tempfile
-    import zipfile
-    import time
+def backup_restore(backup_index=None, auto_confirm=False, local=False):
+    """Restore from a backup
 
+    The backup zips are unpacked on the server through the Pterodactyl API
+    when possible; otherwise (or with `local`) they are downloaded, extracted
+    and uploaded again.
+    """
     # List backups first
     backups = backup_list()
     if not backups:
@@ -2043,13 +6198,16 @@ def backup_restore(backup_index=None, auto_confirm=False):
         console.print(f"  1. {full_backup['name']} (full)")
         console.print(f"  2. {selected['name']} (partial)")
 
+    server_side = not local and bool(PTERODACTYL_API_KEY and PTERODACTYL_SERVER_ID)
+    steps = 3 if server_side else 4
+
     # Calculate total download size
     total_size = sum(b['size'] for b in restore_chain)
     size_str = f"{total_size/(1024*1024*1024):.2f} GB" if total_size > 1024*1024*1024 else f"{total_size/(1024*1024):.1f} MB"
 
     console.print(Panel(
         f"[bold]Restore: {selected['name']}[/bold]\n\n"
-        f"Download size: [cyan]{size_str}[/cyan]\n"
+        f"{'Backup size (unpacked on the server)' if server_side else 'Download size'}: [cyan]{size_str}[/cyan]\n"
         f"Backups in chain: [cyan]{len(restore_chain)}[/cyan]\n\n"
         "[red]WARNING: This will replace the current world![/red]",
         title="[yellow]⚠ Backup Restore[/yellow]",
@@ -2063,139 +6221,166 @@ def backup_restore(backup_index=None, auto_confirm=False):
             return False
 
     # Step 1: Stop server
-    console.print("\n[bold]Step 1/5: Stopping server...[/bold]")
+    console.print(f"\n[bold]Step 1/{steps}: Stopping server...[/bold]")
     status = get_server_status()
     if status == "running" or status == "starting":
-        server_stop()
-        console.print("[cyan]Waiting for server to stop...[/cyan]")
-        for i in range(30):
-            time.sleep(2)
-            status = get_server_status()
-            if status == "offline":
-                break
-        if status != "offline":
-            console.print("[yellow]Server didn't stop gracefully, sending kill signal...[/yellow]")
-            send_power_action("kill")
-            time.sleep(5)
-
-    console.print("[green]✓ Server stopped[/green]")
-
-    # Step 2: Download backups
-    console.print("\n[bold]Step 2/5: Downloading backup(s)...[/bold]")
+        if not stop_server_and_wait():
+            console.print("[red]Server still not offline. Please stop manually.[/red]")
+            return False
+    else:
+        console.print("[green]✓ Server stopped[/green]")
 
     ssh, sftp = get_sftp_connection()
     if not sftp:
         return False
 
-    temp_dir = tempfile.mkdtemp(prefix="mc_restore_")
-    downloaded_files = []
-
+    restored = False
     try:
-        for backup in restore_chain:
-            local_path = os.path.join(temp_dir, backup['name'])
-            console.print(f"[cyan]Downloading {backup['name']}...[/cyan]")
-
-            with RichProgressTracker(total_files=1, total_size=backup['size']) as tracker:
-                tracker.start_file(backup['name'], backup['size'])
-                sftp.get(backup['path'], local_path, callback=progress_callback(tracker))
-                tracker.file_complete(success=True)
-
-            downloaded_files.append(local_path)
-            console.print(f"[green]✓ Downloaded {backup['name']}[/green]")
-
-        # Step 3: Extract backups
-        console.print("\n[bold]Step 3/5: Extracting backup(s)...[/bold]")
-        extract_dir = os.path.join(temp_dir, "world")
-        os.makedirs(extract_dir, exist_ok=True)
-
-        for zip_path in downloaded_files:
-            console.print(f"[cyan]Extracting {os.path.basename(zip_path)}...[/cyan]")
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                zf.extractall(extract_dir)
-            console.print(f"[green]✓ Extracted[/green]")
-
-        # Step 4: Delete remote world folder
-        console.print("\n[bold]Step 4/5: Clearing remote world folder...[/bold]")
-        delete_world_folders()
-
-        # Recreate world folder
-        try:
-            sftp.mkdir("/world")
-        except IOError:
-            pass
+        if server_side:
+            console.print(f"\n[bold]Step 2/{steps}: Clearing remote world folder...[/bold]")
+            delete_world_folders()
+            try:
+                sftp.mkdir("/world")
+            except IOError:
+                pass
 
-        # Step 5: Upload restored files
-        console.print("\n[bold]Step 5/5: Uploading restored world...[/bold]")
+            console.print(f"\n[bold]Step 3/{steps}: Unpacking backup(s) on the server...[/bold]")
+            restored = restore_backup_on_server(restore_chain)
+            if not restored:
+                console.print("[yellow]Server-side restore failed, restoring through this machine instead...[/yellow]")
+                steps = 4
 
-        # Count files for progress
-        file_count = 0
-        total_upload_size = 0
-        for root, dirs, files in os.walk(extract_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_count += 1
-                total_upload_size += os.path.getsize(file_path)
+        if not restored:
+            restored = restore_backup_through_local(sftp, restore_chain, steps)
+    except Exception as e:
+        console.print(f"[red]Error during restore: {e}[/red]")
+        restored = False
+    finally:
+        release_sftp_connection(ssh, sftp)
+
+    if not restored:
+        # By now the world folder may already have been cleared
+        console.print("[red]Restore failed. The server is still stopped and /world may be empty or "
+                      "partly restored; run `backup restore` again before starting it.[/red]")
+        return False
 
-        console.print(f"[cyan]Uploading {file_count} files ({total_upload_size/(1024*1024):.1f} MB)...[/cyan]")
+    console.print("[green]✓ World restored[/green]")
 
-        with RichProgressTracker(total_files=file_count, total_size=total_upload_size) as tracker:
-            def upload_recursive(local_path, remote_path):
-                for item in os.listdir(local_path):
-                    local_item = os.path.join(local_path, item)
-                    remote_item = remote_path + "/" + item
+    # Start server
+    console.print("\n[bold]Starting server...[/bold]")
+    server_start()
 
-                    if os.path.isfile(local_item):
-                        try:
-                            file_size = os.path.getsize(local_item)
-                            rel_path = os.path.relpath(local_item, extract_dir)
-                            tracker.start_file(rel_path, file_size)
-                            sftp.put(local_item, remote_item, callback=progress_callback(tracker))
-                            tracker.file_complete(success=True)
-                        except Exception as e:
-                            tracker.file_complete(success=False)
-                            console.print(f"[red]Error uploading {item}: {e}[/red]")
-                    elif os.path.isdir(local_item):
-                        try:
-                            sftp.mkdir(remote_item)
-                        except IOError:
-                            pass
-                        upload_recursive(local_item, remote_item)
+    console.print("\n" + "="*50)
+    console.print("[bold green]✓ Backup restore complete![/bold green]")
+    console.print(f"[cyan]Restored from: {selected['name']}[/cyan]")
+    console.print("="*50)
 
-            upload_recursive(extract_dir, "/world")
+    return True
 
-        console.print("[green]✓ World restored[/green]")
 
-        sftp.close()
-        ssh.close()
+def restore_backup_on_server(restore_chain):
+    """Unpack a backup chain into /world on the server itself.
 
-        # Cleanup temp files
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    The AdvancedBackups zips already live under /backups on the server, so
+    Wings can unpack them in place (/files/decompress, full backup first and
+    the partial on top) without any data crossing the network. Returns False
+    as soon as one of them fails.
+    """
+    for i, backup in enumerate(restore_chain, 1):
+        console.print(f"[cyan]Unpacking {backup['name']} ({i}/{len(restore_chain)})...[/cyan]")
+        if pterodactyl_call(pterodactyl.decompress_file, "/world",
+                            posixpath.relpath(backup['path'], "/world")) is None:
+            return False
+        console.print(f"[green]✓ Unpacked {backup['name']}[/green]")
+    return True
 
-        # Start server
-        console.print("\n[bold]Starting server...[/bold]")
-        server_start()
 
-        console.print("\n" + "="*50)
-        console.print("[bold green]✓ Backup restore complete![/bold green]")
-        console.print(f"[cyan]Restored from: {selected['name']}[/cyan]")
-        console.print("="*50)
+def restore_backup_through_local(sftp, restore_chain, steps=4):
+    """Restore a backup chain into /world by streaming it through this machine.
 
-        return True
+    The zips are read where they are: each transfer worker opens them over
+    its own connection and copies members straight into /world (see
+    read_remote_zip_member), so nothing is written to local disk and the
+    upload starts as soon as the zip indexes have been read. The chain is
+    applied newest first, skipping files a later backup already wrote, so
+    each file is uploaded once, and all of it goes through one pool.
+    """
+    console.print(f"\n[bold]Step 2/{steps}: Reading backup index(es)...[/bold]")
+    members = []  # (zip path, ZipInfo, rel_path)
+    written = set()
+    for backup in reversed(restore_chain):
+        console.print(f"[cyan]Reading {backup['name']}...[/cyan]")
+        try:
+            with sftp.open(backup['path'], "rb") as remote_zip:
+                if backup['size'] <= ZIP_READ_WINDOW:
+                    # zipfile probes before the start of tiny files, which SFTP can't seek to
+                    remote_zip = io.BytesIO(b"".join(remote_zip.readv([(0, backup['size'])])))
+                with zipfile.ZipFile(remote_zip) as zf:
+                    infos = zf.infolist()
+        except Exception as e:
+            console.print(f"[red]Could not read {backup['name']}: {e}[/red]")
+            return False
+        for info in infos:
+            parts = [part for part in info.filename.split("/") if part not in ("", ".")]
+            if info.is_dir() or not parts or ".." in parts:
+                continue
+            rel_path = "/".join(parts)
+            if rel_path not in written:
+                members.append((backup['path'], info, rel_path))
+                written.add(rel_path)
+
+    # Nothing on the server is touched until every zip could be read
+    console.print(f"\n[bold]Step 3/{steps}: Clearing remote world folder...[/bold]")
+    delete_world_folders()
+    try:
+        sftp.mkdir("/world")
+    except IOError:
+        pass
 
-    except Exception as e:
-        console.print(f"[red]Error during restore: {e}[/red]")
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        sftp.close()
-        ssh.close()
+    made_dirs = set()
+    for rel_dir in sorted({rel_path.rpartition("/")[0] for _, _, rel_path in members} - {""},
+                          key=lambda d: d.count("/")):
+        parts = rel_dir.split("/")
+        for depth in range(1, len(parts) + 1):
+            parent = "/".join(parts[:depth])
+            if parent not in made_dirs:
+                try:
+                    sftp.mkdir(f"/world/{parent}")
+                except IOError:
+                    pass  # Directory exists
+                made_dirs.add(parent)
+
+    total_size = sum(info.file_size for _, info, _ in members)
+    console.print(f"\n[bold]Step 4/{steps}: Streaming {len(members)} files ({format_size(total_size)}) "
+                  f"into /world...[/bold]")
+    with RichProgressTracker(total_files=len(members), total_size=total_size) as tracker:
+        with SFTPTransferPool(tracker) as pool:
+            for zip_path, info, rel_path in members:
+                pool.put_member(zip_path, info, f"/world/{rel_path}", rel_path)
+
+    if pool.failed:
+        console.print(f"[red]{len(pool.failed)} file(s) failed to upload[/red]")
         return False
+    for backup in restore_chain:
+        console.print(f"[green]✓ Restored {backup['name']}[/green]")
+    return True
 
 
 # =============================================================================
 # Main
 # =============================================================================
 
+def get_arg_value(args, *names):
+    """Return the value of a `--name value` or `--name=value` option, or None."""
+    for i, arg in enumerate(args):
+        for name in names:
+            if arg == name and i + 1 < len(args):
+                return args[i + 1]
+            if arg.startswith(name + "="):
+                return arg.split("=", 1)[1]
+    return None
+
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         command = sys.argv[1]
@@ -2249,7 +6434,7 @@ if __name__ == "__main__":
                 console.print("  python server-config.py backup list              # List all backups")
                 console.print("  python server-config.py backup create [comment]  # Create manual backup")
                 console.print("  python server-config.py backup snapshot [comment] # Create snapshot (immune to purge)")
-                console.print("  python server-config.py backup restore [number]  # Restore from backup")
+                console.print("  python server-config.py backup restore [number] [--local]  # Restore from backup")
             else:
                 subcmd = sys.argv[2]
                 if subcmd == "list":
@@ -2263,29 +6448,82 @@ if __name__ == "__main__":
                 elif subcmd == "restore":
                     backup_index = None
                     auto_confirm = "-y" in sys.argv or "--yes" in sys.argv
-                    args = [a for a in sys.argv[3:] if a not in ("-y", "--yes")]
+                    local = "--local" in sys.argv
+                    args = [a for a in sys.argv[3:] if a not in ("-y", "--yes", "--local")]
                     if args:
                         try:
                             backup_index = int(args[0])
                         except ValueError:
                             console.print(f"[red]Invalid backup number: {args[0]}[/red]")
                             sys.exit(1)
-                    backup_restore(backup_index, auto_confirm)
+                    backup_restore(backup_index, auto_confirm, local)
                 else:
                     console.print(f"[red]Unknown backup command: {subcmd}[/red]")
+        elif command == "calibrate":
+            # Parse args: calibrate [--size MB] [-y]
+            args = sys.argv[2:] if len(sys.argv) > 2 else []
+            auto_confirm = "-y" in args or "--yes" in args
+            size_mb = get_arg_value(args, "--size")
+            try:
+                size_mb = int(size_mb) if size_mb else 16
+            except ValueError:
+                console.print(f"[red]Invalid --size value: {size_mb}[/red]")
+                sys.exit(1)
+            calibrate_transport(size_mb=size_mb, auto_confirm=auto_confirm)
         elif command == "world-status":
             world_sync_status()
         elif command == "world-download":
-            # Parse args: world-download [--no-backup] [-y]
+            # Parse args: world-download [--no-backup] [--delta] [--regions] [--archive] [--resume] [--jobs N] [-y]
             args = sys.argv[2:] if len(sys.argv) > 2 else []
             auto_confirm = "-y" in args or "--yes" in args
             backup_existing = "--no-backup" not in args
-            world_download(backup_existing=backup_existing, auto_confirm=auto_confirm)
+            delta = "--delta" in args
+            regions = "--regions" in args
+            archive = "--archive" in args
+            resume = "--resume" in args
+            jobs = get_arg_value(args, "--jobs", "-j")
+            try:
+                jobs = int(jobs) if jobs else None
+            except ValueError:
+                console.print(f"[red]Invalid --jobs value: {jobs}[/red]")
+                sys.exit(1)
+            world_download(backup_existing=backup_existing, auto_confirm=auto_confirm, jobs=jobs, delta=delta, regions=regions,
+                           archive=archive, resume=resume)
+        elif command == "world-snapshots":
+            # Parse args: world-snapshots <list|create|restore|prune|import> [...]
+            args = sys.argv[3:] if len(sys.argv) > 3 else []
+            auto_confirm = "-y" in args or "--yes" in args
+            subcmd = sys.argv[2] if len(sys.argv) > 2 else "list"
+            if subcmd == "list":
+                world_snapshots_list()
+            elif subcmd == "create":
+                world_snapshot_create(" ".join(a for a in args if a not in ("-y", "--yes")))
+            elif subcmd == "restore":
+                target = get_arg_value(args, "--to")
+                positional = [a for i, a in enumerate(args)
+                              if not a.startswith("-") and (i == 0 or args[i - 1] != "--to")]
+                world_snapshot_restore(positional[0] if positional else None, target=target,
+                                       auto_confirm=auto_confirm, backup="--no-backup" not in args)
+            elif subcmd == "prune":
+                world_snapshots_prune(auto_confirm=auto_confirm)
+            elif subcmd == "import":
+                world_snapshots_import(auto_confirm=auto_confirm)
+            else:
+                console.print(f"[red]Unknown world-snapshots command: {subcmd}[/red]")
         elif command == "world-upload":
-            # Parse args: world-upload [-y]
+            # Parse args: world-upload [--delta] [--regions] [--resume] [--dry-run] [--staged] [-y]
             args = sys.argv[2:] if len(sys.argv) > 2 else []
             auto_confirm = "-y" in args or "--yes" in args
-            world_upload(auto_confirm=auto_confirm)
+            delta = "--delta" in args
+            regions = "--regions" in args
+            resume = "--resume" in args
+            dry_run = "--dry-run" in args
+            staged = "--staged" in args
+            world_upload(auto_confirm=auto_confirm, delta=delta, regions=regions, resume=resume, dry_run=dry_run,
+                         staged=staged)
+        elif command == "world-rollback":
+            args = sys.argv[2:] if len(sys.argv) > 2 else []
+            world_rollback(auto_confirm="-y" in args or "--yes" in args)
         else:
             console.print("[yellow]Usage:[/yellow]")
             console.print("  python server-config.py              # Interactive menu")
@@ -2300,17 +6538,24 @@ if __name__ == "__main__":
             console.print("  python server-config.py update-pack <version> -p    # Update production (Bloom.host)")
             console.print("  python server-config.py configs      # Upload config directory to production")
             console.print("  python server-config.py list         # List production server files")
+            console.print("  python server-config.py calibrate [--size MB] [-y]  # Find and save the fastest SFTP settings")
             console.print("")
             console.print("[yellow]World Sync (Primary Backup):[/yellow]")
             console.print("  python server-config.py world-status                       # View local backup status")
-            console.print("  python server-config.py world-download [--no-backup] [-y]  # Download production → LocalServer")
-            console.print("  python server-config.py world-upload [-y]                  # Upload LocalServer → production")
+            console.print("  python server-config.py world-download [--no-backup] [--delta] [--regions] [--archive] [--resume] [--jobs N] [-y]  # Download production → LocalServer")
+            console.print("  python server-config.py world-upload [--delta] [--regions] [--resume] [--dry-run] [--staged] [-y]  # Upload LocalServer → production")
+            console.print("  python server-config.py world-rollback [-y]  # Swap the world a staged upload replaced back in")
+            console.print("  python server-config.py world-snapshots list                 # Local world snapshots")
+            console.print("  python server-config.py world-snapshots create [comment]     # Snapshot the LocalServer world")
+            console.print("  python server-config.py world-snapshots restore [id] [--to DIR] [--no-backup] [-y]  # Restore a snapshot")
+            console.print("  python server-config.py world-snapshots prune [-y]           # Apply the retention policy")
+            console.print("  python server-config.py world-snapshots import [-y]          # Move world-backup-* folders into the store")
             console.print("")
             console.print("[yellow]Advanced Backups (Secondary):[/yellow]")
             console.print("  python server-config.py backup list              # List server backups")
             console.print("  python server-config.py backup create [comment]  # Create manual backup")
             console.print("  python server-config.py backup snapshot [comment] # Create snapshot (immune to purge)")
-            console.print("  python server-config.py backup restore [number]  # Restore from server backup")
+            console.print("  python server-config.py backup restore [number] [--local]  # Restore from server backup")
             console.print("")
             console.print("[yellow]World Management:[/yellow]")
             console.print("  python server-config.py regenerate [preset] [seed] [-y]  # Regenerate world")